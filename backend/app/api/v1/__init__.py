@@ -22,8 +22,6 @@ from .module_generator import GeneratorRouter
 router = APIRouter()
 
 # 注册各模块路由
-router.include_router(SystemRouter)
-router.include_router(MonitorRouter)
-router.include_router(CommonRouter)
-router.include_router(ApplicationRouter)
-router.include_router(GeneratorRouter)
\ No newline at end of file
+# 主路由没有前缀和依赖, 各模块路由已是最终路径, 直接复用路由对象(include_router 会逐个重建路由, 启动耗时翻倍)
+for module_router in (SystemRouter, MonitorRouter, CommonRouter, ApplicationRouter, GeneratorRouter):
+    router.routes.extend(module_router.routes)
\ No newline at end of file
@@ -3,6 +3,7 @@
 from typing import List, Dict, Optional, Any
 
 from app.core.exceptions import CustomException
+from app.core.serialize import Serialize
 from app.api.v1.module_system.auth.schema import AuthSchema
 from app.utils.ai_util import AIClient
 from .schema import McpCreateSchema, McpUpdateSchema, McpOutSchema, ChatQuerySchema
@@ -46,7 +47,7 @@ class McpService:
         if order_by:
             order_by = eval(str(order_by))
         obj_list = await McpCRUD(auth).get_list_crud(search=search.__dict__ if search else {}, order_by=order_by)
-        return [McpOutSchema.model_validate(obj).model_dump() for obj in obj_list]
+        return Serialize.dump_list(McpOutSchema, obj_list)
     
     @classmethod
     async def create_service(cls, auth: AuthSchema, data: McpCreateSchema) -> Dict[str, Any]:
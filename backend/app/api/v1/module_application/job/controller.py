@@ -1,16 +1,18 @@
 # -*- coding: utf-8 -*-
 
 from fastapi import APIRouter, Body, Depends, Path, Query
-from fastapi.responses import JSONResponse, StreamingResponse
+from fastapi.responses import JSONResponse, Response
+from redis.asyncio.client import Redis
 
 from app.common.response import StreamResponse, SuccessResponse
 from app.common.request import PaginationService
-from app.utils.common_util import bytes2file_response
-from app.core.base_params import PaginationQueryParam
-from app.core.dependencies import AuthPermission
+from app.utils.common_util import file2stream_response
+from app.core.base_params import ExportQueryParam, PaginationQueryParam
+from app.core.dependencies import AuthPermission, redis_getter
 from app.core.router_class import OperationLogRoute
 from app.core.logger import logger
 from app.api.v1.module_system.auth.schema import AuthSchema
+from app.api.v1.module_common.task.service import TaskService
 from .param import JobQueryParam, JobLogQueryParam
 from .service import JobService, JobLogService
 from .schema import (
@@ -125,27 +127,40 @@ async def delete_obj_controller(
 @JobRouter.post('/export', summary="导出定时任务", description="导出定时任务")
 async def export_obj_list_controller(
     search: JobQueryParam = Depends(),
+    export: ExportQueryParam = Depends(),
+    redis: Redis = Depends(redis_getter),
     auth: AuthSchema = Depends(AuthPermission(["app:job:export"]))
-) -> StreamingResponse:
+) -> Response:
     """
     导出定时任务
     
     参数:
     - search (JobQueryParam): 查询参数模型
+    - export (ExportQueryParam): 导出参数
+    - redis (Redis): Redis 客户端
     - auth (AuthSchema): 认证信息模型
     
     返回:
-    - StreamingResponse: 包含导出定时任务结果的流式响应
+    - Response: 包含导出定时任务结果的流式响应, 后台导出时为任务信息的JSON响应
     """
-    result_dict_list = await JobService.get_job_list_service(search=search, auth=auth)
-    export_result = await JobService.export_job_service(data_list=result_dict_list)
+    if export.background:
+        task = await TaskService.submit_export_service(
+            redis=redis,
+            auth=auth,
+            name="导出定时任务",
+            file_name=export.filename("job"),
+            export_func=lambda task_auth, progress: JobService.export_job_service(auth=task_auth, search=search, file_format=export.file_format, progress=progress)
+        )
+        return SuccessResponse(data=task, msg="导出任务已提交")
+
+    export_result = await JobService.export_job_service(auth=auth, search=search, file_format=export.file_format)
     logger.info('导出定时任务成功')
 
     return StreamResponse(
-        data=bytes2file_response(export_result),
-        media_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+        data=file2stream_response(export_result),
+        media_type=export.media_type,
         headers = {
-            'Content-Disposition': 'attachment; filename=job.xlsx'
+            'Content-Disposition': f'attachment; filename={export.filename("job")}'
         }
     )
 
@@ -303,26 +318,39 @@ async def clear_job_log_controller(
 @JobRouter.post('/log/export', summary="导出定时任务日志", description="导出定时任务日志")
 async def export_job_log_list_controller(
     search: JobLogQueryParam = Depends(),
+    export: ExportQueryParam = Depends(),
+    redis: Redis = Depends(redis_getter),
     auth: AuthSchema = Depends(AuthPermission(["app:job:export"]))
-) -> StreamingResponse:
+) -> Response:
     """
     导出定时任务日志
     
     参数:
     - search (JobLogQueryParam): 查询参数模型
+    - export (ExportQueryParam): 导出参数
+    - redis (Redis): Redis 客户端
     - auth (AuthSchema): 认证信息模型
     
     返回:
-    - StreamingResponse: 包含导出定时任务日志结果的流式响应
+    - Response: 包含导出定时任务日志结果的流式响应, 后台导出时为任务信息的JSON响应
     """
-    result_dict_list = await JobLogService.get_job_log_list_service(search=search, auth=auth)
-    export_result = await JobLogService.export_job_log_service(data_list=result_dict_list)
+    if export.background:
+        task = await TaskService.submit_export_service(
+            redis=redis,
+            auth=auth,
+            name="导出定时任务日志",
+            file_name=export.filename("job_log"),
+            export_func=lambda task_auth, progress: JobLogService.export_job_log_service(auth=task_auth, search=search, file_format=export.file_format, progress=progress)
+        )
+        return SuccessResponse(data=task, msg="导出任务已提交")
+
+    export_result = await JobLogService.export_job_log_service(auth=auth, search=search, file_format=export.file_format)
     logger.info('导出定时任务日志成功')
 
     return StreamResponse(
-        data=bytes2file_response(export_result),
-        media_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+        data=file2stream_response(export_result),
+        media_type=export.media_type,
         headers={
-            'Content-Disposition': 'attachment; filename=job_log.xlsx'
+            'Content-Disposition': f'attachment; filename={export.filename("job_log")}'
         }
     )
@@ -145,4 +145,13 @@ class JobLogCRUD(CRUDBase[JobLogModel, JobLogCreateSchema, JobLogUpdateSchema]):
         参数:
         - ids (List[int]): 定时任务日志ID列表
         """
-        return await self.delete(ids=ids)
\ No newline at end of file
+        return await self.delete(ids=ids)
+    
+    async def clear_obj_log_crud(self) -> None:
+        """
+        清空定时任务日志
+        
+        注意:
+        - 此操作会删除所有定时任务日志,请谨慎操作
+        """
+        return await self.clear()
@@ -1,9 +1,10 @@
 # -*- coding: utf-8 -*-
 
-from typing import Any, List, Dict, Optional
+from typing import Any, List, Dict, Optional, Awaitable, Callable
 
 from app.core.ap_scheduler import SchedulerUtil
 from app.core.exceptions import CustomException
+from app.core.serialize import Serialize
 from app.utils.cron_util import CronUtil
 from app.utils.excel_util import ExcelUtil
 from app.api.v1.module_system.auth.schema import AuthSchema
@@ -46,7 +47,7 @@ class JobService:
         - List[Dict]: 定时任务详情字典列表
         """
         obj_list = await JobCRUD(auth).get_obj_list_crud(search=search.__dict__, order_by=order_by)
-        return [JobOutSchema.model_validate(obj).model_dump() for obj in obj_list]
+        return Serialize.dump_list(JobOutSchema, obj_list)
     
     @classmethod
     async def create_job_service(cls, auth: AuthSchema, data: JobCreateSchema) -> Dict:
@@ -149,15 +150,19 @@ class JobService:
         #     await JobCRUD(auth).set_obj_field_crud(ids=[id], status=False)
 
     @classmethod
-    async def export_job_service(cls, data_list: List[Dict[str, Any]]) -> bytes:
+    async def export_job_service(cls, auth: AuthSchema, search: Optional[JobQueryParam] = None, order_by: Optional[List[Dict[str, str]]] = None, file_format: str = 'xlsx', progress: Optional[Callable[[int], Awaitable[None]]] = None) -> str:
         """
         导出定时任务列表
         
         参数:
-        - data_list (List[Dict[str, Any]]): 定时任务列表
+        - auth (AuthSchema): 认证信息模型
+        - search (Optional[JobQueryParam]): 查询参数
+        - order_by (Optional[List[Dict[str, str]]]): 排序参数
+        - file_format (str): 导出格式, xlsx 或 csv
+        - progress (Callable[[int], Awaitable[None]] | None): 后台任务的进度回调
         
         返回:
-        - bytes: Excel文件字节流
+        - str: 导出文件路径
         """
         mapping_dict = {
             'id': '编号',
@@ -180,14 +185,20 @@ class JobService:
             'creator': '创建者',
         }
 
-        # 复制数据并转换状态
-        data = data_list.copy()
-        for item in data:
+        def format_row(obj: Any) -> Dict[str, Any]:
+            item = JobOutSchema.model_validate(obj).model_dump()
             item['status'] = '已完成' if item['status'] == 0 else '运行中' if item['status'] == 1 else '暂停'
             item['creator'] = item.get('creator', {}).get('name', '未知') if isinstance(item.get('creator'), dict) else '未知'
+            return item
 
-        return ExcelUtil.export_list2excel(list_data=data, mapping_dict=mapping_dict)
-
+        # 按排序键分块读取并逐行写入导出文件, 内存占用与导出行数无关
+        return await ExcelUtil.export_rows2file(
+            rows=JobCRUD(auth).scan(search=search.__dict__ if search else None, order_by=order_by),
+            mapping_dict=mapping_dict,
+            formatter=format_row,
+            file_format=file_format,
+            progress=progress
+        )
 
 class JobLogService:
     """
@@ -223,7 +234,7 @@ class JobLogService:
         - List[Dict]: 定时任务日志详情字典列表
         """
         obj_list = await JobLogCRUD(auth).get_obj_log_list_crud(search=search.__dict__, order_by=order_by)
-        return [JobLogOutSchema.model_validate(obj).model_dump() for obj in obj_list]
+        return Serialize.dump_list(JobLogOutSchema, obj_list)
     
     @classmethod
     async def delete_job_log_service(cls, auth: AuthSchema, ids: list[int]) -> None:
@@ -250,22 +261,23 @@ class JobLogService:
         参数:
         - auth (AuthSchema): 认证信息模型
         """
-        # 获取所有日志ID并批量删除
-        all_logs = await JobLogCRUD(auth).get_obj_log_list_crud()
-        if all_logs:
-            ids = [log.id for log in all_logs]
-            await JobLogCRUD(auth).delete_obj_log_crud(ids=ids)
+        # 日志表没有数据权限字段, 直接整表删除, 无需先加载全部日志
+        await JobLogCRUD(auth).clear_obj_log_crud()
 
     @classmethod
-    async def export_job_log_service(cls, data_list: List[Dict[str, Any]]) -> bytes:
+    async def export_job_log_service(cls, auth: AuthSchema, search: Optional[JobLogQueryParam] = None, order_by: Optional[List[Dict[str, str]]] = None, file_format: str = 'xlsx', progress: Optional[Callable[[int], Awaitable[None]]] = None) -> str:
         """
         导出定时任务日志列表
         
         参数:
-        - data_list (List[Dict[str, Any]]): 定时任务日志列表
+        - auth (AuthSchema): 认证信息模型
+        - search (Optional[JobLogQueryParam]): 查询参数
+        - order_by (Optional[List[Dict[str, str]]]): 排序参数
+        - file_format (str): 导出格式, xlsx 或 csv
+        - progress (Callable[[int], Awaitable[None]] | None): 后台任务的进度回调
         
         返回:
-        - bytes: Excel文件字节流
+        - str: 导出文件路径
         """
         mapping_dict = {
             'id': '编号',
@@ -282,10 +294,16 @@ class JobLogService:
             'create_time': '创建时间',
         }
 
-        # 复制数据并转换状态
-        data = data_list.copy()
-        for item in data:
+        def format_row(obj: Any) -> Dict[str, Any]:
+            item = JobLogOutSchema.model_validate(obj).model_dump()
             item['status'] = '成功' if item.get('status') else '失败'
+            return item
 
-        return ExcelUtil.export_list2excel(list_data=data, mapping_dict=mapping_dict)
-    
\ No newline at end of file
+        # 按排序键分块读取并逐行写入导出文件, 内存占用与导出行数无关
+        return await ExcelUtil.export_rows2file(
+            rows=JobLogCRUD(auth).scan(search=search.__dict__ if search else None, order_by=order_by),
+            mapping_dict=mapping_dict,
+            formatter=format_row,
+            file_format=file_format,
+            progress=progress
+        )
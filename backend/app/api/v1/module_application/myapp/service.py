@@ -5,6 +5,7 @@ from typing import List, Dict, Optional
 from app.core.base_schema import BatchSetAvailable
 from app.core.exceptions import CustomException
 from app.core.logger import logger
+from app.core.serialize import Serialize
 from app.api.v1.module_system.auth.schema import AuthSchema
 from .schema import ApplicationCreateSchema, ApplicationUpdateSchema, ApplicationOutSchema
 from .param import ApplicationQueryParam
@@ -52,7 +53,7 @@ class ApplicationService:
         # 过滤空值
         search_dict = {k: v for k, v in search.__dict__.items() if v is not None} if search else {}
         obj_list = await ApplicationCRUD(auth).list_crud(search=search_dict, order_by=order_by)
-        return [ApplicationOutSchema.model_validate(obj).model_dump() for obj in obj_list]
+        return Serialize.dump_list(ApplicationOutSchema, obj_list)
     
     @classmethod
     async def create_service(cls, auth: AuthSchema, data: ApplicationCreateSchema) -> Dict:
@@ -3,9 +3,11 @@
 from fastapi import APIRouter
 
 from .file.controller import FileRouter
+from .task.controller import TaskRouter
 
 
 CommonRouter = APIRouter(prefix="/common")
 
 # 包含所有子路由
-CommonRouter.include_router(FileRouter)
\ No newline at end of file
+CommonRouter.include_router(FileRouter)
+CommonRouter.include_router(TaskRouter)
\ No newline at end of file
@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+
+from fastapi import APIRouter, Depends, Path
+from fastapi.responses import JSONResponse, FileResponse
+from redis.asyncio.client import Redis
+
+from app.common.response import SuccessResponse, UploadFileResponse
+from app.core.dependencies import get_current_user, redis_getter
+from app.core.router_class import OperationLogRoute
+from app.api.v1.module_system.auth.schema import AuthSchema
+from .service import TaskService
+
+TaskRouter = APIRouter(route_class=OperationLogRoute, prefix="/task", tags=["后台任务"])
+
+
+@TaskRouter.get("/detail/{task_id}", summary="获取后台任务状态", description="获取后台任务状态")
+async def get_task_detail_controller(
+    task_id: str = Path(..., description="任务ID"),
+    redis: Redis = Depends(redis_getter),
+    auth: AuthSchema = Depends(get_current_user)
+) -> JSONResponse:
+    """
+    获取后台任务状态
+
+    参数:
+    - task_id (str): 任务ID
+    - redis (Redis): Redis 客户端
+    - auth (AuthSchema): 认证信息模型
+
+    返回:
+    - JSONResponse: 包含任务状态及进度的JSON响应
+    """
+    result_dict = await TaskService.get_task_detail_service(redis=redis, auth=auth, task_id=task_id)
+    return SuccessResponse(data=result_dict, msg="获取任务状态成功")
+
+
+@TaskRouter.get("/download/{task_id}", summary="下载后台任务结果", description="下载后台任务结果")
+async def download_task_file_controller(
+    task_id: str = Path(..., description="任务ID"),
+    redis: Redis = Depends(redis_getter),
+    auth: AuthSchema = Depends(get_current_user)
+) -> FileResponse:
+    """
+    下载后台导出任务的结果文件
+
+    参数:
+    - task_id (str): 任务ID
+    - redis (Redis): Redis 客户端
+    - auth (AuthSchema): 认证信息模型
+
+    返回:
+    - FileResponse: 结果文件响应
+    """
+    file_path = await TaskService.get_task_file_service(redis=redis, auth=auth, task_id=task_id)
+    return UploadFileResponse(file_path=str(file_path), filename=file_path.name)
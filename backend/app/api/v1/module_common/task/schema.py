@@ -0,0 +1,20 @@
+# -*- coding: utf-8 -*-
+
+from typing import Any, Dict, Literal, Optional
+from pydantic import BaseModel, Field
+
+
+class TaskOutSchema(BaseModel):
+    """后台任务状态模型"""
+
+    id: str = Field(..., description='任务ID')
+    task_type: Literal['export', 'import'] = Field(..., description='任务类型')
+    name: str = Field(..., description='任务名称')
+    status: Literal['pending', 'running', 'success', 'failed'] = Field(default='pending', description='任务状态')
+    processed: int = Field(default=0, description='已处理行数')
+    message: str = Field(default='', description='失败原因')
+    file_name: Optional[str] = Field(default=None, description='导出文件名或导入源文件名')
+    result: Optional[Dict[str, Any]] = Field(default=None, description='导入结果')
+    user_id: Optional[int] = Field(default=None, description='提交人ID')
+    created_at: str = Field(..., description='提交时间')
+    finished_at: Optional[str] = Field(default=None, description='结束时间')
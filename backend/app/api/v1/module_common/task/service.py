@@ -0,0 +1,289 @@
+# -*- coding: utf-8 -*-
+
+import asyncio
+import shutil
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Awaitable, Callable, Dict
+from fastapi import UploadFile
+from fastapi.concurrency import run_in_threadpool
+from redis.asyncio.client import Redis
+from apscheduler.triggers.date import DateTrigger
+
+from app.config.setting import settings
+from app.common.enums import RedisInitKeyConfig
+from app.core.ap_scheduler import scheduler
+from app.core.database import AsyncSessionLocal
+from app.core.exceptions import CustomException
+from app.core.logger import logger
+from app.core.redis_crud import RedisCURD
+from app.api.v1.module_system.auth.schema import AuthSchema
+from .schema import TaskOutSchema
+
+# 进度回调: 参数为已处理行数
+ProgressCallback = Callable[[int], Awaitable[None]]
+
+
+class TaskService:
+    """
+    后台任务服务层
+
+    导入导出等耗时任务提交到调度器的 task 任务存储中在请求之外执行, 每个进程同时执行的任务数
+    受 TASK_MAX_CONCURRENCY 限制; 任务状态保存在 Redis 中, 结果文件写入任务目录, 均在 TASK_EXPIRE_SECONDS 后过期。
+    """
+
+    __semaphore = asyncio.Semaphore(settings.TASK_MAX_CONCURRENCY)
+
+    @classmethod
+    async def get_task_detail_service(cls, redis: Redis, auth: AuthSchema, task_id: str) -> Dict:
+        """
+        获取任务状态
+
+        参数:
+        - redis (Redis): Redis 客户端
+        - auth (AuthSchema): 认证信息模型
+        - task_id (str): 任务ID
+
+        返回:
+        - Dict: 任务状态字典
+
+        异常:
+        - CustomException: 任务不存在、已过期或不属于当前用户时抛出
+        """
+        task = await cls.__get_task(redis=redis, task_id=task_id)
+        if not task or not auth.user or (task.user_id != auth.user.id and not auth.user.is_superuser):
+            raise CustomException(msg="任务不存在或已过期")
+        return task.model_dump()
+
+    @classmethod
+    async def get_task_file_service(cls, redis: Redis, auth: AuthSchema, task_id: str) -> Path:
+        """
+        获取导出任务的结果文件
+
+        参数:
+        - redis (Redis): Redis 客户端
+        - auth (AuthSchema): 认证信息模型
+        - task_id (str): 任务ID
+
+        返回:
+        - Path: 结果文件路径
+
+        异常:
+        - CustomException: 任务未完成或结果文件不存在时抛出
+        """
+        task = TaskOutSchema(**await cls.get_task_detail_service(redis=redis, auth=auth, task_id=task_id))
+        if task.task_type != 'export' or task.status != 'success' or not task.file_name:
+            raise CustomException(msg="任务尚未完成")
+        file_path = settings.TASK_FILE_PATH.joinpath(task.id, task.file_name)
+        if not file_path.is_file():
+            raise CustomException(msg="结果文件不存在或已过期")
+        return file_path
+
+    @classmethod
+    async def submit_export_service(
+        cls,
+        redis: Redis,
+        auth: AuthSchema,
+        name: str,
+        file_name: str,
+        export_func: Callable[[AuthSchema, ProgressCallback], Awaitable[str]]
+    ) -> Dict:
+        """
+        提交后台导出任务
+
+        参数:
+        - redis (Redis): Redis 客户端
+        - auth (AuthSchema): 认证信息模型
+        - name (str): 任务名称
+        - file_name (str): 导出文件名
+        - export_func (Callable): 导出函数, 接收任务自己的认证信息和进度回调, 返回导出的临时文件路径
+
+        返回:
+        - Dict: 任务状态字典
+        """
+        task = await cls.__create_task(redis=redis, auth=auth, task_type='export', name=name, file_name=file_name)
+
+        async def work(task_auth: AuthSchema, progress: ProgressCallback) -> None:
+            file_path = await export_func(task_auth, progress)
+            await run_in_threadpool(shutil.move, file_path, settings.TASK_FILE_PATH.joinpath(task.id, file_name))
+
+        cls.__schedule(redis=redis, auth=auth, task=task, work=work)
+        return task.model_dump()
+
+    @classmethod
+    async def submit_import_service(
+        cls,
+        redis: Redis,
+        auth: AuthSchema,
+        name: str,
+        file: UploadFile,
+        import_func: Callable[[AuthSchema, UploadFile, ProgressCallback], Awaitable[Dict]]
+    ) -> Dict:
+        """
+        提交后台导入任务
+
+        参数:
+        - redis (Redis): Redis 客户端
+        - auth (AuthSchema): 认证信息模型
+        - name (str): 任务名称
+        - file (UploadFile): 上传的导入文件
+        - import_func (Callable): 导入函数, 接收任务自己的认证信息、导入文件和进度回调, 返回导入结果
+
+        返回:
+        - Dict: 任务状态字典
+        """
+        task = await cls.__create_task(redis=redis, auth=auth, task_type='import', name=name, file_name=file.filename)
+        # 请求结束后上传文件即被关闭, 先保存到任务目录
+        source_path = settings.TASK_FILE_PATH.joinpath(task.id, f'source{Path(file.filename or "").suffix}')
+        try:
+            await run_in_threadpool(cls.__save_upload, file, source_path)
+        finally:
+            await file.close()
+
+        async def work(task_auth: AuthSchema, progress: ProgressCallback) -> None:
+            upload = UploadFile(file=open(source_path, 'rb'), filename=file.filename)
+            try:
+                task.result = await import_func(task_auth, upload, progress)
+            finally:
+                await upload.close()
+                source_path.unlink(missing_ok=True)
+
+        cls.__schedule(redis=redis, auth=auth, task=task, work=work)
+        return task.model_dump()
+
+    @classmethod
+    def __schedule(cls, redis: Redis, auth: AuthSchema, task: TaskOutSchema, work: Callable[[AuthSchema, ProgressCallback], Awaitable[None]]) -> None:
+        """
+        将任务提交到调度器立即执行
+
+        参数:
+        - redis (Redis): Redis 客户端
+        - auth (AuthSchema): 认证信息模型
+        - task (TaskOutSchema): 任务状态
+        - work (Callable): 任务函数
+        """
+        scheduler.add_job(
+            cls.__run,
+            trigger=DateTrigger(),
+            args=[redis, auth, task, work],
+            id=task.id,
+            name=task.name,
+            jobstore='task',
+            misfire_grace_time=None
+        )
+
+    @classmethod
+    async def __run(cls, redis: Redis, auth: AuthSchema, task: TaskOutSchema, work: Callable[[AuthSchema, ProgressCallback], Awaitable[None]]) -> None:
+        """
+        执行任务并更新状态, 使用独立的数据库会话(请求的会话在响应后即关闭)
+
+        参数:
+        - redis (Redis): Redis 客户端
+        - auth (AuthSchema): 提交任务时的认证信息
+        - task (TaskOutSchema): 任务状态
+        - work (Callable): 任务函数
+        """
+        async with cls.__semaphore:
+            task.status = 'running'
+            await cls.__save_task(redis=redis, task=task)
+
+            async def progress(processed: int) -> None:
+                task.processed = processed
+                await cls.__save_task(redis=redis, task=task)
+
+            try:
+                async with AsyncSessionLocal() as session:
+                    async with session.begin():
+                        task_auth = AuthSchema(db=session, user=auth.user, check_data_scope=auth.check_data_scope)
+                        await work(task_auth, progress)
+                task.status = 'success'
+            except Exception as e:
+                logger.error(f"后台任务 {task.name}({task.id}) 执行失败: {str(e)}")
+                task.status = 'failed'
+                task.message = str(e)
+            finally:
+                task.finished_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+                await cls.__save_task(redis=redis, task=task)
+
+    @classmethod
+    async def __create_task(cls, redis: Redis, auth: AuthSchema, task_type: str, name: str, file_name: str | None) -> TaskOutSchema:
+        """
+        创建任务状态及任务目录, 并顺带清理过期的任务目录
+
+        参数:
+        - redis (Redis): Redis 客户端
+        - auth (AuthSchema): 认证信息模型
+        - task_type (str): 任务类型
+        - name (str): 任务名称
+        - file_name (str | None): 文件名
+
+        返回:
+        - TaskOutSchema: 任务状态
+        """
+        task = TaskOutSchema(
+            id=uuid.uuid4().hex,
+            task_type=task_type,
+            name=name,
+            file_name=file_name,
+            user_id=auth.user.id if auth.user else None,
+            created_at=datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        )
+        await run_in_threadpool(cls.__clear_expired_dirs)
+        settings.TASK_FILE_PATH.joinpath(task.id).mkdir(parents=True, exist_ok=True)
+        await cls.__save_task(redis=redis, task=task)
+        return task
+
+    @classmethod
+    async def __get_task(cls, redis: Redis, task_id: str) -> TaskOutSchema | None:
+        """
+        从 Redis 读取任务状态
+
+        参数:
+        - redis (Redis): Redis 客户端
+        - task_id (str): 任务ID
+
+        返回:
+        - TaskOutSchema | None: 任务状态, 不存在时为 None
+        """
+        data = await RedisCURD(redis).get(f'{RedisInitKeyConfig.BACKGROUND_TASK.key}:{task_id}')
+        return TaskOutSchema.model_validate_json(data) if data else None
+
+    @classmethod
+    async def __save_task(cls, redis: Redis, task: TaskOutSchema) -> None:
+        """
+        保存任务状态到 Redis
+
+        参数:
+        - redis (Redis): Redis 客户端
+        - task (TaskOutSchema): 任务状态
+        """
+        await RedisCURD(redis).set(
+            key=f'{RedisInitKeyConfig.BACKGROUND_TASK.key}:{task.id}',
+            value=task.model_dump_json(),
+            expire=settings.TASK_EXPIRE_SECONDS
+        )
+
+    @staticmethod
+    def __save_upload(file: UploadFile, path: Path) -> None:
+        """
+        分块保存上传文件
+
+        参数:
+        - file (UploadFile): 上传文件
+        - path (Path): 保存路径
+        """
+        file.file.seek(0)
+        with open(path, 'wb') as f:
+            shutil.copyfileobj(file.file, f)
+
+    @staticmethod
+    def __clear_expired_dirs() -> None:
+        """删除超过保留时间的任务目录"""
+        if not settings.TASK_FILE_PATH.is_dir():
+            return
+        deadline = time.time() - settings.TASK_EXPIRE_SECONDS
+        for task_dir in settings.TASK_FILE_PATH.iterdir():
+            if task_dir.is_dir() and task_dir.stat().st_mtime < deadline:
+                shutil.rmtree(task_dir, ignore_errors=True)
@@ -1,18 +1,20 @@
 # -*- coding: utf-8 -*-
 
-from fastapi import APIRouter, Body, Depends, Path, UploadFile
-from fastapi.responses import JSONResponse, StreamingResponse
+from fastapi import APIRouter, Body, Depends, Path, Query, UploadFile
+from fastapi.responses import JSONResponse, StreamingResponse, Response
+from redis.asyncio.client import Redis
 import urllib.parse
 
 from app.common.response import StreamResponse, SuccessResponse
 from app.common.request import PaginationService
-from app.utils.common_util import bytes2file_response
-from app.core.base_params import PaginationQueryParam
-from app.core.dependencies import AuthPermission
+from app.utils.common_util import bytes2file_response, file2stream_response
+from app.core.base_params import ExportQueryParam, PaginationQueryParam
+from app.core.dependencies import AuthPermission, redis_getter
 from app.core.router_class import OperationLogRoute
 from app.core.base_schema import BatchSetAvailable
 from app.core.logger import logger
 from app.api.v1.module_system.auth.schema import AuthSchema
+from app.api.v1.module_common.task.service import TaskService
 from .param import DemoQueryParam
 from .service import DemoService
 from .schema import (
@@ -145,33 +147,48 @@ async def batch_set_available_obj_controller(
 @DemoRouter.post('/export', summary="导出示例", description="导出示例")
 async def export_obj_list_controller(
     search: DemoQueryParam = Depends(),
+    export: ExportQueryParam = Depends(),
+    redis: Redis = Depends(redis_getter),
     auth: AuthSchema = Depends(AuthPermission(["generator:demo:export"]))
-) -> StreamingResponse:
+) -> Response:
     """
     导出示例
     
     参数:
     - search (DemoQueryParam): 查询参数
+    - export (ExportQueryParam): 导出参数
+    - redis (Redis): Redis 客户端
     - auth (AuthSchema): 认证信息模型
     
     返回:
-    - StreamingResponse: 包含示例列表的Excel文件流响应
-    """
-    result_dict_list = await DemoService.list_service(search=search, auth=auth)
-    export_result = await DemoService.batch_export_service(obj_list=result_dict_list)
+    - Response: 包含示例列表的Excel文件流响应, 后台导出时为任务信息的JSON响应
+    """
+    if export.background:
+        task = await TaskService.submit_export_service(
+            redis=redis,
+            auth=auth,
+            name="导出示例",
+            file_name=export.filename("example"),
+            export_func=lambda task_auth, progress: DemoService.batch_export_service(auth=task_auth, search=search, file_format=export.file_format, progress=progress)
+        )
+        return SuccessResponse(data=task, msg="导出任务已提交")
+
+    export_result = await DemoService.batch_export_service(auth=auth, search=search, file_format=export.file_format)
     logger.info('导出示例成功')
 
     return StreamResponse(
-        data=bytes2file_response(export_result),
-        media_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+        data=file2stream_response(export_result),
+        media_type=export.media_type,
         headers={
-            'Content-Disposition': 'attachment; filename=example.xlsx'
+            'Content-Disposition': f'attachment; filename={export.filename("example")}'
         }
     )
 
 @DemoRouter.post('/import', summary="导入示例", description="导入示例")
 async def import_obj_list_controller(
     file: UploadFile,
+    background: bool = Query(default=False, description="是否作为后台任务导入, 为真时返回任务信息"),
+    redis: Redis = Depends(redis_getter),
     auth: AuthSchema = Depends(AuthPermission(["generator:demo:import"]))
 ) -> JSONResponse:
     """
@@ -179,11 +196,23 @@ async def import_obj_list_controller(
     
     参数:
     - file (UploadFile): 导入的Excel文件
+    - background (bool): 是否作为后台任务导入
+    - redis (Redis): Redis 客户端
     - auth (AuthSchema): 认证信息模型
     
     返回:
-    - JSONResponse: 包含导入示例详情的JSON响应
-    """
+    - JSONResponse: 包含导入示例详情的JSON响应, 后台导入时为任务信息
+    """
+    if background:
+        task = await TaskService.submit_import_service(
+            redis=redis,
+            auth=auth,
+            name="导入示例",
+            file=file,
+            import_func=lambda task_auth, upload, progress: DemoService.batch_import_service(file=upload, auth=task_auth, update_support=True, progress=progress)
+        )
+        return SuccessResponse(data=task, msg="导入任务已提交")
+
     batch_import_result = await DemoService.batch_import_service(file=file, auth=auth, update_support=True)
     logger.info(f"导入示例成功: {batch_import_result}")
     return SuccessResponse(data=batch_import_result, msg="导入示例成功")
@@ -1,14 +1,13 @@
 # -*- coding: utf-8 -*-
 
-import io
-from typing import Any, List, Dict, Optional
+from typing import Any, List, Dict, Optional, Awaitable, Callable
 from fastapi import UploadFile
-import pandas as pd
 
 from app.core.base_schema import BatchSetAvailable
 from app.core.exceptions import CustomException
-from app.utils.excel_util import ExcelUtil
+from app.utils.excel_util import ExcelUtil, ImportResult
 from app.core.logger import logger
+from app.core.serialize import Serialize
 from app.api.v1.module_system.auth.schema import AuthSchema
 from .schema import DemoCreateSchema, DemoUpdateSchema, DemoOutSchema
 from .param import DemoQueryParam
@@ -52,7 +51,7 @@ class DemoService:
         """
         search_dict = search.__dict__ if search else None
         obj_list = await DemoCRUD(auth).list_crud(search=search_dict, order_by=order_by)
-        return [DemoOutSchema.model_validate(obj).model_dump() for obj in obj_list]
+        return Serialize.dump_list(DemoOutSchema, obj_list)
     
     @classmethod
     async def create_service(cls, auth: AuthSchema, data: DemoCreateSchema) -> Dict:
@@ -136,15 +135,19 @@ class DemoService:
         await DemoCRUD(auth).set_available_crud(ids=data.ids, status=data.status)
     
     @classmethod
-    async def batch_export_service(cls, obj_list: List[Dict[str, Any]]) -> bytes:
+    async def batch_export_service(cls, auth: AuthSchema, search: Optional[DemoQueryParam] = None, order_by: Optional[List[Dict[str, str]]] = None, file_format: str = 'xlsx', progress: Optional[Callable[[int], Awaitable[None]]] = None) -> str:
         """
         批量导出
         
         参数:
-        - obj_list (List[Dict[str, Any]]): 示例模型实例字典列表
+        - auth (AuthSchema): 认证信息模型
+        - search (Optional[DemoQueryParam]): 查询参数
+        - order_by (Optional[List[Dict[str, str]]]): 排序参数
+        - file_format (str): 导出格式, xlsx 或 csv
+        - progress (Callable[[int], Awaitable[None]] | None): 后台任务的进度回调
         
         返回:
-        - bytes: Excel文件字节流
+        - str: 导出文件路径
         """
         mapping_dict = {
             'id': '编号',
@@ -156,9 +159,8 @@ class DemoService:
             'creator': '创建者',
         }
 
-        # 复制数据并转换状态
-        data = obj_list.copy()
-        for item in data:
+        def format_row(obj: Any) -> Dict[str, Any]:
+            item = DemoOutSchema.model_validate(obj).model_dump()
             # 处理状态
             item['status'] = '正常' if item.get('status') else '停用'
             # 处理创建者
@@ -167,99 +169,90 @@ class DemoService:
                 item['creator'] = creator_info.get('name', '未知')
             else:
                 item['creator'] = '未知'
+            return item
 
-        return ExcelUtil.export_list2excel(list_data=data, mapping_dict=mapping_dict)
+        # 按排序键分块读取并逐行写入导出文件, 内存占用与导出行数无关
+        return await ExcelUtil.export_rows2file(
+            rows=DemoCRUD(auth).scan(search=search.__dict__ if search else None, order_by=order_by),
+            mapping_dict=mapping_dict,
+            formatter=format_row,
+            file_format=file_format,
+            progress=progress
+        )
 
     @classmethod
-    async def batch_import_service(cls, auth: AuthSchema, file: UploadFile, update_support: bool = False) -> str:
+    async def batch_import_service(cls, auth: AuthSchema, file: UploadFile, update_support: bool = False, progress: Optional[Callable[[int], Awaitable[None]]] = None) -> Dict:
         """
         批量导入
+
+        以只读模式分块读取Excel, 每块向量化校验, 用一次IN查询匹配已存在的数据后批量写入。
         
         参数:
         - auth (AuthSchema): 认证信息模型
         - file (UploadFile): 上传的Excel文件
         - update_support (bool): 是否支持更新存在数据
+        - progress (Callable[[int], Awaitable[None]] | None): 后台任务的进度回调, 以已读取行数调用
         
         返回:
-        - str: 导入结果信息
+        - Dict: 导入结果, 包含成功数、失败数及逐行错误明细
         """
-        
         header_dict = {
             '名称': 'name',
             '状态': 'status',
             '描述': 'description'
         }
+        status_options = {'正常': True, '启用': True, '停用': False}
 
+        result = ImportResult()
+        seen_names: set[str] = set()
         try:
-            # 读取Excel文件
-            contents = await file.read()
-            df = pd.read_excel(io.BytesIO(contents))
-            await file.close()
-            
-            if df.empty:
-                raise CustomException(msg="导入文件为空")
-            
-            # 检查表头是否完整
-            missing_headers = [header for header in header_dict.keys() if header not in df.columns]
-            if missing_headers:
-                raise CustomException(msg=f"导入文件缺少必要的列: {', '.join(missing_headers)}")
-            
-            # 重命名列名
-            df.rename(columns=header_dict, inplace=True)
-            
-            # 验证必填字段
-            required_fields = ['name', 'status']
-            for field in required_fields:
-                missing_rows = df[df[field].isnull()].index.tolist()
-                raise CustomException(msg=f"{[k for k,v in header_dict.items() if v == field][0]}不能为空，第{[i+1 for i in missing_rows]}行")
-            
-            error_msgs = []
-            success_count = 0
-            count = 0
-            
-            # 处理每一行数据
-            for index, row in df.iterrows():
-                count += 1
-                try:
-                    # 数据转换前的类型检查
-                    try:
-                        status = True if row['status'] == '正常' else False
-                    except ValueError:
-                        error_msgs.append(f"第{count}行: 状态必须是'正常'或'停用'")
-                        continue
-                    
-                    # 构建用户数据
-                    data = {
-                        "name": str(row['name']),
-                        "status": status,
-                        "description": str(row['description']),
-                    }
+            async for chunk in ExcelUtil.aiter_excel_chunks(file=file.file, header_dict=header_dict):
+                if progress:
+                    await progress(int(chunk.index[-1]) - 1)
+                df, errors = ExcelUtil.check_import_chunk(
+                    df=chunk,
+                    header_dict=header_dict,
+                    required_fields=['name', 'status'],
+                    option_dict={'status': status_options}
+                )
+                result.add_errors(errors)
 
-                    # 处理用户导入
-                    exists_obj = await DemoCRUD(auth).get(name=data["name"])
-                    if exists_obj:
-                        if update_support:
-                            await DemoCRUD(auth).update(id=exists_obj.id, data=data)
-                            success_count += 1
-                        else:
-                            error_msgs.append(f"第{count}行: 对象 {data['name']} 已存在")
-                    else:
-                        await DemoCRUD(auth).create(data=data)
-                        success_count += 1
-                        
-                except Exception as e:
-                    error_msgs.append(f"第{count}行: {str(e)}")
+                # 文件内重复的名称只导入第一条
+                duplicated = df['name'].duplicated() | df['name'].isin(seen_names)
+                result.add_errors([{'row': int(row), 'msg': f"对象 {name} 在文件中重复"} for row, name in df.loc[duplicated, 'name'].items()])
+                seen_names.update(df['name'])
+                df = df[~duplicated]
+                if df.empty:
                     continue
 
-            # 返回详细的导入结果
-            result = f"成功导入 {success_count} 条数据"
-            if error_msgs:
-                result += "\n错误信息:\n" + "\n".join(error_msgs)
-            return result
-            
+                # 一次IN查询匹配已存在的数据
+                id_map = await DemoCRUD(auth).get_id_map(field='name', values=df['name'].tolist())
+                exists = df['name'].isin(id_map.keys())
+                if not update_support:
+                    result.add_errors([{'row': int(row), 'msg': f"对象 {name} 已存在"} for row, name in df.loc[exists, 'name'].items()])
+                    df, exists = df[~exists], exists[~exists]
+                # 已存在的数据按数据权限过滤, 无权限的行不更新
+                existing_ids = df['name'].map(id_map)
+                visible_ids = await DemoCRUD(auth).visible_ids(ids=existing_ids[exists].astype(int).tolist())
+                forbidden = exists & ~existing_ids.isin(visible_ids)
+                result.add_errors([{'row': int(row), 'msg': f"无权限更新对象 {name}"} for row, name in df.loc[forbidden, 'name'].items()])
+                df, exists = df[~forbidden], exists[~forbidden]
+
+                df = df.astype(object).where(df.notna(), None)
+                create_rows = df[~exists].to_dict('records')
+                update_rows = [{**row, 'id': id_map[row['name']]} for row in df[exists].to_dict('records')]
+
+                await DemoCRUD(auth).bulk_create(data=create_rows)
+                await DemoCRUD(auth).bulk_update(data=update_rows)
+                result.success_count += len(create_rows) + len(update_rows)
+
+            return result.to_dict()
+
         except Exception as e:
-            logger.error(f"批量导入用户失败: {str(e)}")
+            logger.error(f"批量导入失败: {str(e)}")
             raise CustomException(msg=f"导入失败: {str(e)}")
+        finally:
+            await file.close()
 
     @classmethod
     async def import_template_download_service(cls) -> bytes:
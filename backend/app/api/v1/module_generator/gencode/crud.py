@@ -3,7 +3,6 @@
 from sqlalchemy.engine.row import Row
 from sqlalchemy import and_, delete, select, text, update
 from sqlalchemy.orm import selectinload
-from sqlglot.expressions import Expression
 from typing import List, Optional, Sequence, Dict
 
 from app.core.logger import logger
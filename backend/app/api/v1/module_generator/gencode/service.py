@@ -4,12 +4,11 @@ import io
 import json
 import os
 import zipfile
-from typing import Any, List, Dict, Literal, Optional
-from sqlglot.expressions import Add, Alter, Create, Delete, Drop, Expression, Insert, Table, TruncateTable, Update
-from sqlglot import parse as sqlglot_parse
+from typing import TYPE_CHECKING, Any, List, Dict, Literal, Optional
 
 from app.config.setting import settings
 from app.core.exceptions import CustomException
+from app.core.serialize import Serialize
 from app.common.constant import GenConstant
 from app.common.response import SuccessResponse
 from app.api.v1.module_system.auth.schema import AuthSchema
@@ -19,6 +18,8 @@ from .schema import GenTableOptionSchema, GenTableSchema, GenTableOutSchema, Gen
 from .param import GenTableQueryParam
 from .crud import GenTableColumnCRUD, GenTableCRUD
 
+if TYPE_CHECKING:
+    from sqlglot.expressions import Expression
 
 # 定义默认的GenConfig值
 GEN_PATH = "generated_code"  # 默认生成路径
@@ -60,7 +61,7 @@ class GenTableService:
         - List[Dict]: 包含业务表列表信息的字典列表。
         """
         gen_table_list_result = await GenTableCRUD(auth=auth).get_gen_table_list(search)
-        return [GenTableOutSchema.model_validate(obj).model_dump() for obj in gen_table_list_result]
+        return Serialize.dump_list(GenTableOutSchema, gen_table_list_result)
 
     @classmethod
     async def get_gen_db_table_list_service(cls, auth: AuthSchema, search: GenTableQueryParam, order_by: Optional[List[Dict[str, str]]] = None) -> list[Any]:
@@ -183,6 +184,9 @@ class GenTableService:
         异常:
         - CustomException: 当SQL语句不是合法的建表语句、创建表失败或导入表结构失败时抛出。
         """
+        # sqlglot 导入较慢, 仅在建表时加载
+        from sqlglot import parse as sqlglot_parse
+
         try:
             sql_statements = sqlglot_parse(sql, dialect=settings.DATABASE_TYPE)
             # 校验sql语句是否为合法的建表语句
@@ -200,7 +204,7 @@ class GenTableService:
             raise CustomException(msg=f'创建表结构失败: {str(e)}')
     
     @classmethod
-    def __is_valid_create_table(cls, sql_statements: List[Expression | None]) -> bool:
+    def __is_valid_create_table(cls, sql_statements: List["Expression | None"]) -> bool:
         """
         校验SQL语句是否为合法的建表语句。
     
@@ -210,6 +214,8 @@ class GenTableService:
         返回:
         - bool: 校验结果。
         """
+        from sqlglot.expressions import Add, Alter, Create, Delete, Drop, Insert, TruncateTable, Update
+
         validate_create = [isinstance(sql_statement, Create) for sql_statement in sql_statements]
         validate_forbidden_keywords = [
             isinstance(
@@ -223,7 +229,7 @@ class GenTableService:
         return True
     
     @classmethod
-    def __get_table_names(cls, sql_statements: List[Expression | None]) -> List[str]:
+    def __get_table_names(cls, sql_statements: List["Expression | None"]) -> List[str]:
         """
         获取SQL语句中所有的建表表名。
     
@@ -233,6 +239,8 @@ class GenTableService:
         返回:
         - List[str]: 建表表名列表。
         """
+        from sqlglot.expressions import Create, Table
+
         table_names = []
         for sql_statement in sql_statements:
             if isinstance(sql_statement, Create):
@@ -359,7 +367,7 @@ class GenTableService:
         - List[GenTableOutSchema]: 包含所有业务表详细信息的模型列表。
         """
         gen_table_all = await GenTableCRUD(auth=auth).get_gen_table_all()
-        gen_table_all_dict = [GenTableOutSchema.model_validate(gen_table).model_dump() for gen_table in gen_table_all]
+        gen_table_all_dict = Serialize.dump_list(GenTableOutSchema, gen_table_all)
         result = [GenTableOutSchema(**gen_table) for gen_table in gen_table_all_dict]
         return result
 
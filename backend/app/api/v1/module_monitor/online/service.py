@@ -1,101 +1,434 @@
 # -*- coding: utf-8 -*-
 
+import asyncio
 import json
-from typing import Dict, List, Optional
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
 from redis.asyncio.client import Redis
+from sqlalchemy import update
 
+from app.common.constant import RET
 from app.common.enums import RedisInitKeyConfig
+from app.core.exceptions import CustomException
 from app.core.redis_crud import RedisCURD
-from app.core.security import decode_access_token
 from app.core.logger import logger
+from app.config.setting import settings
 from .param import OnlineQueryParam
 
 
+# 续期会话: 刷新令牌仍为当前令牌时写入新的访问令牌、刷新令牌并更新会话过期时间
+RENEW_SESSION_SCRIPT = """
+if redis.call('GET', KEYS[2]) ~= ARGV[7] then
+    return 0
+end
+redis.call('SET', KEYS[1], ARGV[1], 'EX', ARGV[2])
+redis.call('SET', KEYS[2], ARGV[3], 'EX', ARGV[4])
+redis.call('ZADD', KEYS[3], 'XX', ARGV[6], ARGV[5])
+return 1
+"""
+
+# 清理过期会话: 只删除会话索引和元数据, 不删除令牌(令牌由自身 TTL 过期), 查询与删除在同一脚本中执行,
+# 避免与续期并发时误删刚续期的会话
+PRUNE_SESSION_SCRIPT = """
+local ids = redis.call('ZRANGEBYSCORE', KEYS[2], '-inf', ARGV[1])
+for _, id in ipairs(ids) do
+    redis.call('ZREM', KEYS[1], id)
+    redis.call('ZREM', KEYS[2], id)
+    redis.call('HDEL', KEYS[3], id)
+    redis.call('ZREM', KEYS[4], id)
+end
+return #ids
+"""
+
 class OnlineService:
     """在线用户管理模块服务层"""
 
+    # 在线会话索引: 按登录时间排序的有序集合、按过期时间(刷新令牌过期时间)排序的有序集合、会话元数据哈希表、按最后活跃时间排序的有序集合
+    INDEX_KEY = f"{RedisInitKeyConfig.ONLINE_SESSION.key}:index"
+    EXPIRE_KEY = f"{RedisInitKeyConfig.ONLINE_SESSION.key}:expire"
+    INFO_KEY = f"{RedisInitKeyConfig.ONLINE_SESSION.key}:info"
+    ACTIVE_KEY = f"{RedisInitKeyConfig.ONLINE_SESSION.key}:active"
+
+    # 进程内会话活跃时间缓冲区: {session_id: (活跃时间戳, 用户ID)}, 由后台任务批量写入Redis
+    _activity_buffer: Dict[str, Tuple[float, int]] = {}
+
     @classmethod
-    async def get_online_list_service(cls, redis: Redis, search: Optional[OnlineQueryParam] = None) ->  List[Dict]:
+    async def get_online_list_service(cls, redis: Redis, search: Optional[OnlineQueryParam] = None, page_no: Optional[int] = None, page_size: Optional[int] = None) -> Dict[str, Any]:
         """
         获取在线用户列表信息（支持分页和搜索）
-        
+
+        直接从会话索引中按登录时间倒序分页, 无需解析令牌。
+
         参数:
         - redis (Redis): Redis异步客户端实例。
         - search (Optional[OnlineQueryParam]): 查询参数模型。
-        
+        - page_no (Optional[int]): 当前页码, 为None时返回全部数据。
+        - page_size (Optional[int]): 每页数据量, 为None时返回全部数据。
+
         返回:
-        - List[Dict]: 在线用户详情字典列表。
+        - Dict[str, Any]: 在线用户分页数据。
         """
+        await cls._prune_expired_sessions(redis)
 
-        keys = await RedisCURD(redis).get_keys(f"{RedisInitKeyConfig.ACCESS_TOKEN.key}:*")
-        tokens = await RedisCURD(redis).mget(keys)
+        paginate = page_no is not None and page_size is not None
+        if paginate and (page_no < 1 or page_size < 1):
+            raise CustomException(code=RET.ERROR.code, msg="分页参数不合法")
+        start = (page_no - 1) * page_size if paginate else 0
+        end = start + page_size if paginate else None
 
-        online_users = []
-        for token in tokens:
-            if not token:
-                continue
-            try:
-                payload = decode_access_token(token=token)
-                session_info = json.loads(payload.sub)  
-                if cls._match_search_conditions(session_info, search):
-                    online_users.append(session_info)
-            except Exception as e:
-                logger.error(f"解析在线用户数据失败: {e}")
-                continue
-        # 按照 login_time 倒序排序
-        online_users.sort(key=lambda x: x.get('login_time', ''), reverse=True)
-        
-        return online_users
+        if not cls._has_search_conditions(search):
+            # 无搜索条件: 仅读取当前页的会话
+            async with redis.pipeline(transaction=False) as pipe:
+                pipe.zcard(cls.INDEX_KEY)
+                pipe.zrevrange(cls.INDEX_KEY, start, end - 1 if end is not None else -1)
+                total, session_ids = await pipe.execute()
+            items = await cls._get_session_infos(redis, session_ids)
+        else:
+            # 有搜索条件: 按登录时间倒序过滤会话元数据
+            session_ids = await redis.zrevrange(cls.INDEX_KEY, 0, -1)
+            online_users = [
+                info for info in await cls._get_session_infos(redis, session_ids)
+                if cls._match_search_conditions(info, search)
+            ]
+            total = len(online_users)
+            items = online_users[start:end]
+
+        await cls._attach_activity(redis, items)
+
+        return {
+            "items": items,
+            "total": total,
+            "page_no": page_no if paginate else None,
+            "page_size": page_size if paginate else None,
+            "has_next": paginate and start + page_size < total
+        }
+
+    @classmethod
+    async def add_online_session_service(
+        cls,
+        redis: Redis,
+        session_info: Dict[str, Any],
+        login_at: float,
+        access_token: str,
+        access_expire: int,
+        refresh_token: str,
+        refresh_expire: int
+    ) -> None:
+        """
+        写入访问令牌、刷新令牌并登记会话索引(MULTI事务, 一次往返)
 
+        参数:
+        - redis (Redis): Redis异步客户端实例。
+        - session_info (Dict[str, Any]): 会话元数据。
+        - login_at (float): 登录时间戳(秒)。
+        - access_token (str): 访问令牌。
+        - access_expire (int): 访问令牌有效期(秒)。
+        - refresh_token (str): 刷新令牌。
+        - refresh_expire (int): 刷新令牌有效期(秒)。
+
+        返回:
+        - None
+        """
+        session_id = session_info["session_id"]
+        async with redis.pipeline(transaction=True) as pipe:
+            pipe.set(f"{RedisInitKeyConfig.ACCESS_TOKEN.key}:{session_id}", access_token, ex=access_expire)
+            pipe.set(f"{RedisInitKeyConfig.REFRESH_TOKEN.key}:{session_id}", refresh_token, ex=refresh_expire)
+            pipe.zadd(cls.INDEX_KEY, {session_id: login_at})
+            # 会话在刷新令牌过期前都可以续期, 按刷新令牌的过期时间清理
+            pipe.zadd(cls.EXPIRE_KEY, {session_id: time.time() + refresh_expire})
+            pipe.hset(cls.INFO_KEY, session_id, json.dumps(session_info, ensure_ascii=False))
+            pipe.zadd(cls.ACTIVE_KEY, {session_id: login_at})
+            await pipe.execute()
+
+    @classmethod
+    async def renew_online_session_service(
+        cls,
+        redis: Redis,
+        session_id: str,
+        old_refresh_token: str,
+        access_token: str,
+        access_expire: int,
+        refresh_token: str,
+        refresh_expire: int
+    ) -> bool:
+        """
+        续期在线会话(刷新令牌时调用, Lua脚本原子执行)
+
+        仅当Redis中的刷新令牌与传入的刷新令牌一致(会话未退出、未被强制下线且令牌未被轮换)时才写入新令牌。
+
+        参数:
+        - redis (Redis): Redis异步客户端实例。
+        - session_id (str): 在线用户会话ID。
+        - old_refresh_token (str): 客户端提交的刷新令牌。
+        - access_token (str): 新的访问令牌。
+        - access_expire (int): 访问令牌有效期(秒)。
+        - refresh_token (str): 新的刷新令牌。
+        - refresh_expire (int): 刷新令牌有效期(秒)。
+
+        返回:
+        - bool: 续期成功返回True, 会话已失效返回False。
+        """
+        result = await RedisCURD(redis).eval_script(
+            script=RENEW_SESSION_SCRIPT,
+            keys=[
+                f"{RedisInitKeyConfig.ACCESS_TOKEN.key}:{session_id}",
+                f"{RedisInitKeyConfig.REFRESH_TOKEN.key}:{session_id}",
+                cls.EXPIRE_KEY,
+            ],
+            args=[access_token, access_expire, refresh_token, refresh_expire, session_id, time.time() + refresh_expire, old_refresh_token]
+        )
+        return bool(result)
 
     @classmethod
     async def delete_online_service(cls, redis: Redis, session_id: str) -> bool:
         """
         强制下线指定在线用户
-        
+
         参数:
         - redis (Redis): Redis异步客户端实例。
         - session_id (str): 在线用户会话ID。
-        
+
         返回:
         - bool: 如果操作成功则返回True，否则返回False。
         """
-        # 删除 token
-        await RedisCURD(redis).delete(f"{RedisInitKeyConfig.ACCESS_TOKEN.key}:{session_id}")
-        await RedisCURD(redis).delete(f"{RedisInitKeyConfig.REFRESH_TOKEN.key}:{session_id}")
-
+        # 删除 token 及会话索引
+        await cls.remove_online_session_service(redis, [session_id])
 
         logger.info(f"强制下线用户会话: {session_id}")
         return True
-    
+
     @classmethod
     async def clear_online_service(cls, redis: Redis) -> bool:
         """
         强制下线所有在线用户
-        
+
         参数:
         - redis (Redis): Redis异步客户端实例。
-        
+
         返回:
         - bool: 如果操作成功则返回True，否则返回False。
         """
         # 删除 token
         await RedisCURD(redis).clear(f"{RedisInitKeyConfig.ACCESS_TOKEN.key}:*")
         await RedisCURD(redis).clear(f"{RedisInitKeyConfig.REFRESH_TOKEN.key}:*")
+        await RedisCURD(redis).delete(cls.INDEX_KEY, cls.EXPIRE_KEY, cls.INFO_KEY, cls.ACTIVE_KEY)
+        cls._activity_buffer.clear()
 
         logger.info(f"清除所有在线用户会话成功")
         return True
 
-    
+    @classmethod
+    def record_activity_service(cls, session_id: str, user_id: int) -> None:
+        """
+        记录会话活跃时间到进程内缓冲区(不产生任何IO)
+
+        参数:
+        - session_id (str): 在线用户会话ID。
+        - user_id (int): 用户ID。
+
+        返回:
+        - None
+        """
+        cls._activity_buffer[session_id] = (time.time(), user_id)
+
+    @classmethod
+    async def flush_activity_service(cls, redis: Redis) -> int:
+        """
+        将缓冲区中的会话活跃时间批量写入Redis(可选同步到用户最后登录时间)
+
+        参数:
+        - redis (Redis): Redis异步客户端实例。
+
+        返回:
+        - int: 本次写入的会话数量。
+        """
+        if not cls._activity_buffer:
+            return 0
+        buffer, cls._activity_buffer = cls._activity_buffer, {}
+
+        # xx=True: 只更新仍在线的会话, 避免已下线会话被重新写入
+        await redis.zadd(cls.ACTIVE_KEY, {session_id: ts for session_id, (ts, _) in buffer.items()}, xx=True)
+
+        if settings.SESSION_ACTIVITY_SYNC_LAST_LOGIN:
+            # 延迟导入避免循环导入
+            from app.core.database import AsyncSessionLocal
+            from app.api.v1.module_system.user.model import UserModel
+
+            last_active: Dict[int, float] = {}
+            for ts, user_id in buffer.values():
+                last_active[user_id] = max(ts, last_active.get(user_id, 0))
+            async with AsyncSessionLocal() as session:
+                async with session.begin():
+                    await session.execute(
+                        update(UserModel),
+                        [{"id": user_id, "last_login": datetime.fromtimestamp(ts)} for user_id, ts in last_active.items()]
+                    )
+        return len(buffer)
+
+    @classmethod
+    async def expire_idle_sessions_service(cls, redis: Redis) -> int:
+        """
+        下线空闲超时的会话
+
+        参数:
+        - redis (Redis): Redis异步客户端实例。
+
+        返回:
+        - int: 下线的会话数量。
+        """
+        if settings.SESSION_IDLE_TIMEOUT <= 0:
+            return 0
+        idle_ids = await redis.zrangebyscore(cls.ACTIVE_KEY, "-inf", time.time() - settings.SESSION_IDLE_TIMEOUT)
+        if not idle_ids:
+            return 0
+        await cls.remove_online_session_service(redis, idle_ids)
+        logger.info(f"空闲超时下线会话: {idle_ids}")
+        return len(idle_ids)
+
+    @classmethod
+    async def run_activity_flusher_service(cls, redis: Redis) -> None:
+        """
+        后台任务: 定时批量写入会话活跃时间并下线空闲会话
+
+        参数:
+        - redis (Redis): Redis异步客户端实例。
+
+        返回:
+        - None
+        """
+        try:
+            while True:
+                await asyncio.sleep(settings.SESSION_ACTIVITY_FLUSH_SECONDS)
+                try:
+                    await cls.flush_activity_service(redis)
+                    await cls.expire_idle_sessions_service(redis)
+                except Exception as e:
+                    logger.error(f"写入会话活跃时间失败: {e}")
+        except asyncio.CancelledError:
+            # 退出前写入剩余的活跃时间
+            await cls.flush_activity_service(redis)
+            raise
+
+    @classmethod
+    async def _attach_activity(cls, redis: Redis, items: List[Dict]) -> None:
+        """
+        为会话元数据附加最后活跃时间和空闲时长
+
+        参数:
+        - redis (Redis): Redis异步客户端实例。
+        - items (List[Dict]): 会话元数据字典列表。
+
+        返回:
+        - None
+        """
+        if not items:
+            return
+        now = time.time()
+        async with redis.pipeline(transaction=False) as pipe:
+            for item in items:
+                pipe.zscore(cls.ACTIVE_KEY, item["session_id"])
+            scores = await pipe.execute()
+        for item, score in zip(items, scores):
+            # 优先使用本进程尚未写入的活跃时间
+            buffered = cls._activity_buffer.get(item["session_id"])
+            if buffered:
+                score = max(score or 0, buffered[0])
+            item["last_active"] = datetime.fromtimestamp(score).strftime('%Y-%m-%d %H:%M:%S') if score else None
+            item["idle_seconds"] = int(now - score) if score else None
+
+    @classmethod
+    async def _get_session_infos(cls, redis: Redis, session_ids: List[str]) -> List[Dict]:
+        """
+        批量获取会话元数据
+
+        参数:
+        - redis (Redis): Redis异步客户端实例。
+        - session_ids (List[str]): 会话ID列表。
+
+        返回:
+        - List[Dict]: 会话元数据字典列表, 保持传入顺序。
+        """
+        if not session_ids:
+            return []
+        infos = []
+        for info in await redis.hmget(cls.INFO_KEY, session_ids):
+            if not info:
+                continue
+            try:
+                infos.append(json.loads(info))
+            except Exception as e:
+                logger.error(f"解析在线用户数据失败: {e}")
+        return infos
+
+    @classmethod
+    async def remove_online_session_service(cls, redis: Redis, session_ids: List[str]) -> None:
+        """
+        删除会话的访问令牌、刷新令牌及会话索引(MULTI事务, 一次往返)
+
+        参数:
+        - redis (Redis): Redis异步客户端实例。
+        - session_ids (List[str]): 会话ID列表。
+
+        返回:
+        - None
+        """
+        if not session_ids:
+            return
+        async with redis.pipeline(transaction=True) as pipe:
+            pipe.delete(
+                *[f"{RedisInitKeyConfig.ACCESS_TOKEN.key}:{session_id}" for session_id in session_ids],
+                *[f"{RedisInitKeyConfig.REFRESH_TOKEN.key}:{session_id}" for session_id in session_ids]
+            )
+            pipe.zrem(cls.INDEX_KEY, *session_ids)
+            pipe.zrem(cls.EXPIRE_KEY, *session_ids)
+            pipe.hdel(cls.INFO_KEY, *session_ids)
+            pipe.zrem(cls.ACTIVE_KEY, *session_ids)
+            await pipe.execute()
+
+    @classmethod
+    async def _prune_expired_sessions(cls, redis: Redis) -> None:
+        """
+        清理会话索引中已过期(刷新令牌已过期)的会话
+
+        只删除会话索引和元数据, 不删除令牌: 查询接口不应使任何会话下线。
+
+        参数:
+        - redis (Redis): Redis异步客户端实例。
+
+        返回:
+        - None
+        """
+        await RedisCURD(redis).eval_script(
+            script=PRUNE_SESSION_SCRIPT,
+            keys=[cls.INDEX_KEY, cls.EXPIRE_KEY, cls.INFO_KEY, cls.ACTIVE_KEY],
+            args=[time.time()]
+        )
+
+    @staticmethod
+    def _has_search_conditions(search: Optional[OnlineQueryParam]) -> bool:
+        """
+        检查是否存在有效的搜索条件
+
+        参数:
+        - search (Optional[OnlineQueryParam]): 查询参数模型。
+
+        返回:
+        - bool: 如果存在搜索条件则返回True，否则返回False。
+        """
+        if not search:
+            return False
+        return any(cond and cond[1] for cond in (search.name, search.ipaddr, search.login_location))
+
     @staticmethod
     def _match_search_conditions(online_info: Dict, search: Optional[OnlineQueryParam]) -> bool:
         """
         检查是否匹配搜索条件
-        
+
         参数:
         - online_info (Dict): 在线用户信息字典。
         - search (Optional[OnlineQueryParam]): 查询参数模型。
-        
+
         返回:
         - bool: 如果匹配则返回True，否则返回False。
         """
@@ -104,17 +437,17 @@ class OnlineService:
 
         if search.name and search.name[1]:
             keyword = search.name[1].strip('%')
-            if keyword.lower() not in online_info.get("name", "").lower():
+            if keyword.lower() not in (online_info.get("name") or "").lower():
                 return False
 
         if search.ipaddr and search.ipaddr[1]:
             keyword = search.ipaddr[1].strip('%')
-            if keyword not in online_info.get("ipaddr", ""):
+            if keyword not in (online_info.get("ipaddr") or ""):
                 return False
 
         if search.login_location and search.login_location[1]:
             keyword = search.login_location[1].strip('%')
-            if keyword.lower() not in online_info.get("login_location", "").lower():
+            if keyword.lower() not in (online_info.get("login_location") or "").lower():
                 return False
 
         return True
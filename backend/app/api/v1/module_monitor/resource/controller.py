@@ -8,8 +8,8 @@ from typing import List, Optional
 
 from app.common.response import StreamResponse, SuccessResponse, ErrorResponse
 from app.common.request import PaginationService
-from app.utils.common_util import bytes2file_response
-from app.core.base_params import PaginationQueryParam
+from app.utils.common_util import file2stream_response
+from app.core.base_params import ExportQueryParam, PaginationQueryParam
 from app.core.dependencies import AuthPermission
 from app.core.router_class import OperationLogRoute
 from app.core.logger import logger
@@ -252,7 +252,8 @@ async def create_directory_controller(
 )
 async def export_resource_list_controller(
     request: Request,
-    search: ResourceSearchQueryParam = Depends()
+    search: ResourceSearchQueryParam = Depends(),
+    export: ExportQueryParam = Depends(),
 ) -> StreamingResponse:
     """
     导出资源列表
@@ -260,6 +261,7 @@ async def export_resource_list_controller(
     参数:
     - request (Request): FastAPI请求对象，用于获取基础URL。
     - search (ResourceSearchQueryParam): 资源查询参数模型。
+    - export (ExportQueryParam): 导出参数。
     
     返回:
     - StreamingResponse: 包含导出资源列表的流式响应。
@@ -269,13 +271,13 @@ async def export_resource_list_controller(
         search=search,
         base_url=str(request.base_url)
     )
-    export_result = await ResourceService.export_resource_service(data_list=result_dict_list)
+    export_result = await ResourceService.export_resource_service(data_list=result_dict_list, file_format=export.file_format)
     
     logger.info("导出资源列表成功")
     return StreamResponse(
-        data=bytes2file_response(export_result),
-        media_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+        data=file2stream_response(export_result),
+        media_type=export.media_type,
         headers={
-            'Content-Disposition': 'attachment; filename=resource_list.xlsx'
+            'Content-Disposition': f'attachment; filename={export.filename("resource_list")}'
         }
     )
\ No newline at end of file
@@ -331,15 +331,16 @@ class ResourceService:
             raise CustomException(msg=f'搜索资源失败: {str(e)}')
 
     @classmethod
-    async def export_resource_service(cls, data_list: List[Dict[str, Any]]) -> bytes:
+    async def export_resource_service(cls, data_list: List[Dict[str, Any]], file_format: str = 'xlsx') -> str:
         """
         导出资源列表
         
         参数:
         - data_list (List[Dict[str, Any]]): 资源详情字典列表。
+        - file_format (str): 导出格式, xlsx 或 csv。
         
         返回:
-        - bytes: Excel文件的二进制数据。
+        - str: 导出文件路径。
         """
         mapping_dict = {
             'name': '文件名',
@@ -350,15 +351,13 @@ class ResourceService:
             'parent_path': '父目录'
         }
 
-        # 复制数据并转换状态
-        export_data = data_list.copy()
-            
         # 格式化文件大小
-        for item in export_data:
+        def format_row(item: Dict[str, Any]) -> Dict[str, Any]:
             if item.get('size'):
-                item['size'] = cls._format_file_size(item['size'])
+                return {**item, 'size': cls._format_file_size(item['size'])}
+            return item
 
-        return ExcelUtil.export_list2excel(list_data=export_data, mapping_dict=mapping_dict)
+        return await ExcelUtil.export_rows2file(rows=data_list, mapping_dict=mapping_dict, formatter=format_row, file_format=file_format)
 
     @classmethod
     async def _get_directory_stats(cls, path: str, include_hidden: bool = False) -> Dict[str, int]:
@@ -68,6 +68,19 @@ class DiskInfoSchema(BaseModel):
     usage: float = Field(ge=0, le=100, description="使用率(%)")
 
 
+class DbPoolInfoSchema(BaseModel):
+    """数据库连接池信息模型"""
+
+    model_config = ConfigDict(from_attributes=True)
+
+    name: str = Field(description="连接池名称(primary主库 replica只读副本)")
+    size: int = Field(description="连接池大小")
+    checked_in: int = Field(description="空闲连接数")
+    checked_out: int = Field(description="使用中连接数")
+    overflow: int = Field(description="当前溢出连接数")
+    status: str = Field(description="连接池状态(Pool.status())")
+
+
 class ServerMonitorSchema(BaseModel):
     """服务器监控信息模型"""
 
@@ -78,3 +91,4 @@ class ServerMonitorSchema(BaseModel):
     py: PyInfoSchema = Field(description="Python运行信息")
     sys: SysInfoSchema = Field(description="系统信息")
     disks: List[DiskInfoSchema] = Field(default_factory=list, description="磁盘信息")
+    db_pools: List[DbPoolInfoSchema] = Field(default_factory=list, description="数据库连接池信息")
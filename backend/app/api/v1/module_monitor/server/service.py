@@ -7,9 +7,13 @@ import time
 from pathlib import Path
 from typing import List, Dict
 
+from sqlalchemy.pool import QueuePool
+
+from app.core.database import async_engine, read_async_engine
 from app.utils.common_util import bytes2human
 from .schema import (
     CpuInfoSchema,
+    DbPoolInfoSchema,
     MemoryInfoSchema,
     PyInfoSchema,
     ServerMonitorSchema,
@@ -34,7 +38,8 @@ class ServerService:
             mem=cls._get_memory_info(),
             sys=cls._get_system_info(),
             py=cls._get_python_info(),
-            disks=cls._get_disk_info()
+            disks=cls._get_disk_info(),
+            db_pools=cls._get_db_pool_info()
         ).model_dump()
 
     @classmethod
@@ -146,6 +151,31 @@ class ServerService:
                 continue
         return disk_info
 
+    @classmethod
+    def _get_db_pool_info(cls) -> List[DbPoolInfoSchema]:
+        """
+        获取数据库连接池信息(主库与只读副本各自独立统计)
+        
+        返回:
+        - List[DbPoolInfoSchema]: 数据库连接池信息模型列表。
+        """
+        pool_info = []
+        for name, db_engine in (('primary', async_engine), ('replica', read_async_engine)):
+            if db_engine is None or not isinstance(db_engine.pool, QueuePool):
+                continue
+            pool = db_engine.pool
+            pool_info.append(
+                DbPoolInfoSchema(
+                    name=name,
+                    size=pool.size(),
+                    checked_in=pool.checkedin(),
+                    checked_out=pool.checkedout(),
+                    overflow=max(pool.overflow(), 0),
+                    status=pool.status()
+                )
+            )
+        return pool_info
+
     @classmethod
     def _calculate_run_time(cls,start_time: float) -> str:
         """
@@ -4,14 +4,14 @@ import json
 import uuid
 from typing import Dict, Union, NewType
 from fastapi import Request
+from fastapi.concurrency import run_in_threadpool
 from redis.asyncio.client import Redis
 from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime, timedelta
-from user_agents import parse
 
 from app.common.enums import RedisInitKeyConfig
 from app.utils.common_util import get_random_character
-from app.utils.captcha_util import CaptchaUtil
+from app.utils.captcha_util import CaptchaPool, CaptchaUtil
 from app.utils.ip_local_util import IpLocalUtil
 from app.utils.hash_bcrpy_util import PwdUtil
 from app.core.security import (
@@ -24,6 +24,7 @@ from app.core.exceptions import CustomException
 from app.core.logger import logger
 from app.config.setting import settings
 from app.api.v1.module_monitor.online.schema import OnlineOutSchema
+from app.api.v1.module_monitor.online.service import OnlineService
 from ..user.crud import UserCRUD
 from ..user.model import UserModel
 from .schema import (
@@ -38,6 +39,27 @@ from .schema import (
 CaptchaKey = NewType('CaptchaKey', str)
 CaptchaBase64 = NewType('CaptchaBase64', str)
 
+# 校验验证码(不区分大小写): 正确时删除验证码返回1; 错误时累计尝试次数(与验证码同时过期)返回0, 达到次数上限后
+# 删除验证码; 验证码不存在返回-1
+CHECK_CAPTCHA_SCRIPT = """
+local value = redis.call('GET', KEYS[1])
+if not value then
+    return -1
+end
+if string.lower(value) == string.lower(ARGV[1]) then
+    redis.call('DEL', KEYS[1], KEYS[2])
+    return 1
+end
+local attempts = redis.call('INCR', KEYS[2])
+if attempts == 1 then
+    redis.call('PEXPIRE', KEYS[2], math.max(redis.call('PTTL', KEYS[1]), 1))
+end
+if attempts >= tonumber(ARGV[2]) then
+    redis.call('DEL', KEYS[1], KEYS[2])
+end
+return 0
+"""
+
 
 class LoginService:
     """登录认证服务"""
@@ -114,6 +136,9 @@ class LoginService:
         session_id = str(uuid.uuid4())
         request.scope["session_id"] = session_id
 
+        # user_agents 加载内置正则库较慢, 登录时再导入
+        from user_agents import parse
+
         user_agent = parse(request.headers.get("user-agent"))
         request_ip = None
         x_forwarded_for = request.headers.get('X-Forwarded-For')
@@ -137,7 +162,7 @@ class LoginService:
         refresh_expires = timedelta(minutes=settings.REFRESH_TOKEN_EXPIRE_MINUTES)
         
         now = datetime.now()
-        session_info=OnlineOutSchema(
+        session_schema = OnlineOutSchema(
             session_id=session_id,
             user_id=user.id, 
             name=user.name,
@@ -148,7 +173,8 @@ class LoginService:
             browser = user_agent.browser.family,
             login_time=user.last_login,
             login_type=login_type
-        ).model_dump_json()
+        )
+        session_info = session_schema.model_dump_json()
 
         access_token = create_access_token(payload=JWTPayloadSchema(
             sub=session_info,
@@ -161,17 +187,15 @@ class LoginService:
             exp=now + refresh_expires,
         ))
 
-        # 设置新的token
-        await RedisCURD(redis).set(
-            key=f'{RedisInitKeyConfig.ACCESS_TOKEN.key}:{session_id}',
-            value=access_token,
-            expire=int(access_expires.total_seconds())
-        )
-
-        await RedisCURD(redis).set(
-            key=f'{RedisInitKeyConfig.REFRESH_TOKEN.key}:{session_id}',
-            value=refresh_token,
-            expire=int(refresh_expires.total_seconds())
+        # 设置新的token并登记在线会话索引(单次事务提交)
+        await OnlineService.add_online_session_service(
+            redis=redis,
+            session_info=session_schema.model_dump(mode='json'),
+            login_at=now.timestamp(),
+            access_token=access_token,
+            access_expire=int(access_expires.total_seconds()),
+            refresh_token=refresh_token,
+            refresh_expire=int(refresh_expires.total_seconds())
         )
 
         return JWTOutSchema(
@@ -233,18 +257,18 @@ class LoginService:
             exp=now + refresh_expires,
         ))
         
-        # 覆盖写入 Redis
-        await RedisCURD(redis).set(
-            key=f'{RedisInitKeyConfig.ACCESS_TOKEN.key}:{session_id}',
-            value=access_token,
-            expire=int(access_expires.total_seconds())
-        )
-
-        await RedisCURD(redis).set(
-            key=f'{RedisInitKeyConfig.REFRESH_TOKEN.key}:{session_id}',
-            value=refresh_token_new,
-            expire=int(refresh_expires.total_seconds())
+        # 原子覆盖写入 Redis, 刷新令牌已被注销或轮换时拒绝续期
+        renewed = await OnlineService.renew_online_session_service(
+            redis=redis,
+            session_id=session_id,
+            old_refresh_token=refresh_token.refresh_token,
+            access_token=access_token,
+            access_expire=int(access_expires.total_seconds()),
+            refresh_token=refresh_token_new,
+            refresh_expire=int(refresh_expires.total_seconds())
         )
+        if not renewed:
+            raise CustomException(msg="认证已失效", code=10401, status_code=401)
 
         return JWTOutSchema(
             access_token=access_token,
@@ -275,9 +299,8 @@ class LoginService:
         if not session_id:
             raise CustomException(msg="非法凭证,无法获取会话编号")
 
-        # 删除Redis中的在线用户、访问令牌、刷新令牌
-        await RedisCURD(redis).delete(f"{RedisInitKeyConfig.ACCESS_TOKEN.key}:{session_id}")
-        await RedisCURD(redis).delete(f"{RedisInitKeyConfig.REFRESH_TOKEN.key}:{session_id}")
+        # 删除Redis中的在线用户、访问令牌、刷新令牌(单次事务提交)
+        await OnlineService.remove_online_session_service(redis=redis, session_ids=[session_id])
         
         logger.info(f"用户退出登录成功,会话编号:{session_id}")
 
@@ -304,8 +327,11 @@ class CaptchaService:
         if not settings.CAPTCHA_ENABLE:
             raise CustomException(msg="未开启验证码服务")
 
-        # 生成验证码图片和值
-        captcha_base64, captcha_value = CaptchaUtil.captcha_arithmetic()
+        # 从预渲染验证码池中取出验证码图片和值, 池为空时在线程池中渲染, 避免阻塞事件循环
+        captcha = CaptchaPool.pop()
+        if captcha is None:
+            captcha = await run_in_threadpool(CaptchaUtil.captcha_arithmetic)
+        captcha_base64, captcha_value = captcha
         captcha_key = get_random_character()
 
         # 保存到Redis并设置过期时间
@@ -347,17 +373,20 @@ class CaptchaService:
         # 获取Redis中存储的验证码
         redis_key = f'{RedisInitKeyConfig.CAPTCHA_CODES.key}:{key}'
         
-        captcha_value = await RedisCURD(redis).get(redis_key)
-        if not captcha_value:
+        # 比对与删除在同一脚本中原子完成: 校验成功后才删除, 并发请求中只有一个能通过;
+        # 错误次数达到 CAPTCHA_MAX_ATTEMPTS 后验证码失效, 防止暴力枚举
+        result = await RedisCURD(redis).eval_script(
+            CHECK_CAPTCHA_SCRIPT,
+            keys=[redis_key, f'{redis_key}:attempts'],
+            args=[captcha, settings.CAPTCHA_MAX_ATTEMPTS]
+        )
+        if result is None or result < 0:
             logger.warning('验证码已过期或不存在')
             raise CustomException(msg="验证码已过期")
 
-        # 验证码不区分大小写比对
-        if captcha.lower() != captcha_value.lower():
-            logger.warning(f'验证码错误,用户输入:{captcha},正确值:{captcha_value}')
+        if result == 0:
+            logger.warning(f'验证码错误,用户输入:{captcha}')
             raise CustomException(msg="验证码错误")
 
-        # 验证成功后删除验证码,避免重复使用
-        await RedisCURD(redis).delete(redis_key)
         logger.info(f'验证码校验成功,key:{key}')
         return True
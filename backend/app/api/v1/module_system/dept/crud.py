@@ -60,6 +60,8 @@ class DeptCRUD(CRUDBase[DeptModel, DeptCreateSchema, DeptUpdateSchema]):
     async def set_available_crud(self, ids: List[int], status: bool) -> None:
         """
         批量设置部门可用状态。
+
+        启用时同时启用所有父级部门, 停用时同时停用所有子级部门, 均为单条SQL。
         
         参数:
         - ids (List[int]): 部门 ID 列表。
@@ -68,7 +70,10 @@ class DeptCRUD(CRUDBase[DeptModel, DeptCreateSchema, DeptUpdateSchema]):
         返回:
         - None
         """
-        await self.set(ids=ids, status=status)
+        if status:
+            await self.set_ancestors(ids=ids, status=status)
+        else:
+            await self.set_descendants(ids=ids, status=status)
 
     async def get_name_crud(self, id: int) -> Optional[str]:
         """
@@ -4,13 +4,8 @@ from typing import List, Dict, Optional
 
 from app.core.base_schema import BatchSetAvailable
 from app.core.exceptions import CustomException
-from app.utils.common_util import (
-    get_parent_id_map,
-    get_parent_recursion,
-    get_child_id_map,
-    get_child_recursion,
-    traversal_to_tree
-)
+from app.core.serialize import Serialize
+from app.utils.common_util import traversal_to_tree
 from ..auth.schema import AuthSchema
 from .crud import DeptCRUD
 from .param import DeptQueryParam
@@ -61,7 +56,7 @@ class DeptService:
         # 使用树形结构查询，预加载children关系
         dept_list = await DeptCRUD(auth).get_tree_list_crud(search=search.__dict__, order_by=order_by)
         # 转换为字典列表
-        dept_dict_list = [DeptOutSchema.model_validate(dept).model_dump() for dept in dept_list]
+        dept_dict_list = Serialize.dump_list(DeptOutSchema, dept_list)
         # 使用traversal_to_tree构建树形结构
         return traversal_to_tree(dept_dict_list)
 
@@ -150,18 +145,5 @@ class DeptService:
         返回:
         - None
         """
-        dept_list = await DeptCRUD(auth).get_list_crud()
-        total_ids = []
-        
-        if data.status:
-            id_map = get_parent_id_map(model_list=dept_list)
-            for dept_id in data.ids:
-                enable_ids = get_parent_recursion(id=dept_id, id_map=id_map)
-                total_ids.extend(enable_ids)
-        else:
-            id_map = get_child_id_map(model_list=dept_list)
-            for dept_id in data.ids:
-                disable_ids = get_child_recursion(id=dept_id, id_map=id_map)
-                total_ids.extend(disable_ids)
-
-        await DeptCRUD(auth).set_available_crud(ids=total_ids, status=data.status)
\ No newline at end of file
+        # 启用时级联启用所有父级部门, 停用时级联停用所有子级部门(递归查询, 单条SQL)
+        await DeptCRUD(auth).set_available_crud(ids=data.ids, status=data.status)
\ No newline at end of file
@@ -1,19 +1,20 @@
 # -*- coding: utf-8 -*-
 
 import json
-from fastapi import APIRouter, Body, Depends, Path, Query
-from fastapi.responses import JSONResponse, StreamingResponse
+from fastapi import APIRouter, Body, Depends, Path, Query, Request
+from fastapi.responses import JSONResponse, Response
 from redis.asyncio.client import Redis
 
-from app.common.response import StreamResponse, SuccessResponse
-from app.core.base_params import PaginationQueryParam
+from app.common.response import NotModifiedResponse, StreamResponse, SuccessResponse
+from app.core.base_params import ExportQueryParam, PaginationQueryParam
 from app.core.base_schema import BatchSetAvailable
 from app.core.dependencies import AuthPermission, redis_getter
 from app.core.router_class import OperationLogRoute
 from app.core.logger import logger
 from app.common.request import PaginationService
-from app.utils.common_util import bytes2file_response
+from app.utils.common_util import file2stream_response, etag_matches
 from ..auth.schema import AuthSchema
+from app.api.v1.module_common.task.service import TaskService
 from .param import DictTypeQueryParam, DictDataQueryParam
 from .service import DictTypeService, DictDataService
 from .schema import (
@@ -192,31 +193,43 @@ async def batch_set_available_dict_type_controller(
 @DictRouter.post('/type/export', summary="导出字典类型", description="导出字典类型")
 async def export_type_list_controller(
     search: DictTypeQueryParam = Depends(),
+    export: ExportQueryParam = Depends(),
+    redis: Redis = Depends(redis_getter),
     auth: AuthSchema = Depends(AuthPermission(["system:dict_type:export"]))
-) -> StreamingResponse:
+) -> Response:
     """
     导出字典类型
 
     参数:
     - search (DictTypeQueryParam): 查询参数模型
+    - export (ExportQueryParam): 导出参数
+    - redis (Redis): Redis 客户端
     - auth (AuthSchema): 认证信息模型
         
     返回:
-    - StreamingResponse: 包含导出字典类型结果的响应模型
+    - Response: 包含导出字典类型结果的响应模型, 后台导出时为任务信息的JSON响应
         
     异常:
     - CustomException: 导出字典类型失败时抛出异常。
     """
-    # 获取全量数据
-    result_dict_list = await DictTypeService.get_obj_list_service(search=search, auth=auth)
-    export_result = await DictTypeService.export_obj_service(data_list=result_dict_list)
+    if export.background:
+        task = await TaskService.submit_export_service(
+            redis=redis,
+            auth=auth,
+            name="导出字典类型",
+            file_name=export.filename("dict_type"),
+            export_func=lambda task_auth, progress: DictTypeService.export_obj_service(auth=task_auth, search=search, file_format=export.file_format, progress=progress)
+        )
+        return SuccessResponse(data=task, msg="导出任务已提交")
+
+    export_result = await DictTypeService.export_obj_service(auth=auth, search=search, file_format=export.file_format)
     logger.info('导出字典类型成功')
 
     return StreamResponse(
-        data=bytes2file_response(export_result),
-        media_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+        data=file2stream_response(export_result),
+        media_type=export.media_type,
         headers = {
-            'Content-Disposition': 'attachment; filename=dict_type.xlsx'
+            'Content-Disposition': f'attachment; filename={export.filename("dict_type")}'
         }
     )
 
@@ -369,53 +382,73 @@ async def batch_set_available_dict_data_controller(
 @DictRouter.post('/data/export', summary="导出字典数据", description="导出字典数据")
 async def export_data_list_controller(
     search: DictDataQueryParam = Depends(),
+    export: ExportQueryParam = Depends(),
+    redis: Redis = Depends(redis_getter),
     page: PaginationQueryParam = Depends(),
     auth: AuthSchema = Depends(AuthPermission(["system:dict_data:export"]))
-) -> StreamingResponse:
+) -> Response:
     """
     导出字典数据
 
     参数:
     - search (DictDataQueryParam): 查询参数模型
+    - export (ExportQueryParam): 导出参数
+    - redis (Redis): Redis 客户端
     - page (PaginationQueryParam): 分页参数模型
     - auth (AuthSchema): 认证信息模型
         
     返回:
-    - StreamingResponse: 包含导出字典数据结果的响应模型
+    - Response: 包含导出字典数据结果的响应模型, 后台导出时为任务信息的JSON响应
         
     异常:
     - CustomException: 导出字典数据失败时抛出异常。
     """
-    result_dict_list = await DictDataService.get_obj_list_service(auth=auth, search=search, order_by=page.order_by)
-    export_result = await DictDataService.export_obj_service(data_list=result_dict_list)
+    if export.background:
+        task = await TaskService.submit_export_service(
+            redis=redis,
+            auth=auth,
+            name="导出字典数据",
+            file_name=export.filename("dice_data"),
+            export_func=lambda task_auth, progress: DictDataService.export_obj_service(auth=task_auth, search=search, order_by=page.order_by, file_format=export.file_format, progress=progress)
+        )
+        return SuccessResponse(data=task, msg="导出任务已提交")
+
+    export_result = await DictDataService.export_obj_service(auth=auth, search=search, order_by=page.order_by, file_format=export.file_format)
     logger.info('导出字典数据成功')
 
     return StreamResponse(
-        data=bytes2file_response(export_result),
-        media_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+        data=file2stream_response(export_result),
+        media_type=export.media_type,
         headers = {
-            'Content-Disposition': 'attachment; filename=dice_data.xlsx'
+            'Content-Disposition': f'attachment; filename={export.filename("dice_data")}'
         }
     )
 
 @DictRouter.get('/data/info/{dict_type}', summary="根据字典类型获取数据", description="根据字典类型获取数据")
 async def get_init_dict_data_controller(
+    request: Request,
     dict_type: str,
     redis: Redis = Depends(redis_getter)
-) -> JSONResponse:
+) -> Response:
     """
-    根据字典类型获取数据
+    根据字典类型获取数据，支持 If-None-Match 协商缓存
 
     参数:
+    - request (Request): 请求对象
     - dict_type (str): 字典类型
     - redis (Redis): Redis数据库连接
         
     返回:
-    - JSONResponse: 包含根据字典类型获取数据结果的响应模型
+    - Response: 包含根据字典类型获取数据结果的响应模型，版本未变化时返回304
         
     异常:
     - CustomException: 根据字典类型获取数据失败时抛出异常。
     """
+    version = await DictDataService.get_init_dict_version_service(redis=redis, dict_type=dict_type)
+    etag = f'"dict-{dict_type}-{version}"'
+    if version and etag_matches(request.headers.get("If-None-Match"), etag):
+        return NotModifiedResponse(etag=etag)
+
     dict_data_query_result = await DictDataService.get_init_dict_service(
         redis=redis, dict_type=dict_type
     )
@@ -427,4 +460,29 @@ async def get_init_dict_data_controller(
     elif not isinstance(dict_data_query_result, str):
         dict_data_query_result = str(dict_data_query_result)
         
-    return SuccessResponse(data=json.loads(dict_data_query_result), msg="获取初始化字典数据成功")
+    response = SuccessResponse(data=json.loads(dict_data_query_result), msg="获取初始化字典数据成功")
+    if version:
+        response.headers["ETag"] = etag
+        response.headers["Cache-Control"] = "no-cache"
+    return response
+
+@DictRouter.get('/data/sync', summary="增量同步字典数据", description="获取指定版本号之后变更的字典数据")
+async def get_dict_sync_controller(
+    since: int = Query(0, ge=0, description="客户端已同步的版本号"),
+    epoch: str = Query('', description="客户端版本号所属的纪元"),
+    redis: Redis = Depends(redis_getter)
+) -> JSONResponse:
+    """
+    增量同步字典数据
+
+    参数:
+    - since (int): 客户端已同步的版本号，为0时返回全部字典数据
+    - epoch (str): 客户端版本号所属的纪元，与当前纪元不一致时返回全部字典数据
+    - redis (Redis): Redis数据库连接
+        
+    返回:
+    - JSONResponse: 包含当前版本号、变更的字典数据和已删除字典类型的响应模型
+    """
+    result_dict = await DictDataService.get_dict_sync_service(redis=redis, since=since, epoch=epoch)
+    logger.info(f"增量同步字典数据成功: {since} -> {result_dict['version']}")
+    return SuccessResponse(data=result_dict, msg="增量同步字典数据成功")
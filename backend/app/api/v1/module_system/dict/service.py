@@ -1,7 +1,7 @@
 # -*- coding: utf-8 -*-
 
 import json
-from typing import Any, List, Dict, Optional
+from typing import Any, List, Dict, Optional, Awaitable, Callable
 from redis.asyncio.client import Redis
 
 from app.common.enums import RedisInitKeyConfig
@@ -11,6 +11,7 @@ from app.core.base_schema import BatchSetAvailable
 from app.core.redis_crud import RedisCURD
 from app.core.exceptions import CustomException
 from app.core.logger import logger
+from app.core.serialize import Serialize
 from app.api.v1.module_system.auth.schema import AuthSchema
 from .schema import DictDataCreateSchema,DictDataOutSchema,DictDataUpdateSchema,DictTypeCreateSchema,DictTypeOutSchema,DictTypeUpdateSchema
 from .param import DictDataQueryParam, DictTypeQueryParam
@@ -51,7 +52,7 @@ class DictTypeService:
         - List[Dict]: 数据字典类型详情字典列表
         """
         obj_list = await DictTypeCRUD(auth).get_obj_list_crud(search=search.__dict__, order_by=order_by)
-        return [DictTypeOutSchema.model_validate(obj).model_dump() for obj in obj_list]
+        return Serialize.dump_list(DictTypeOutSchema, obj_list)
     
     @classmethod
     async def create_obj_service(cls, auth: AuthSchema, redis: Redis, data: DictTypeCreateSchema) -> Dict:
@@ -80,6 +81,7 @@ class DictTypeService:
                     key=redis_key,
                     value="",
                 )
+            await RedisCURD(redis).bump_version(RedisInitKeyConfig.DICT_VERSION.key, data.dict_type)
             logger.info(f"创建字典类型成功: {new_obj_dict}")
         except Exception as e:
             logger.error(f"创建字典类型失败: {e}")
@@ -138,13 +140,18 @@ class DictTypeService:
         try:
             # 获取当前字典类型的所有字典数据，确保包含最新状态
             dict_data_list = await DictDataCRUD(auth).get_obj_list_crud(search={'dict_type': data.dict_type})
-            dict_data = [DictDataOutSchema.model_validate(row).model_dump() for row in dict_data_list if row]
+            dict_data = Serialize.dump_list(DictDataOutSchema, (row for row in dict_data_list if row))
             
             value = json.dumps(dict_data, ensure_ascii=False)
             await RedisCURD(redis).set(
                     key=redis_key,
                     value=value,
                 )
+            await RedisCURD(redis).bump_version(RedisInitKeyConfig.DICT_VERSION.key, data.dict_type)
+            # 字典类型被修改时, 旧类型的缓存失效
+            if exist_obj.dict_type != data.dict_type:
+                await RedisCURD(redis).delete(f"{RedisInitKeyConfig.SYSTEM_DICT.key}:{exist_obj.dict_type}")
+                await RedisCURD(redis).bump_version(RedisInitKeyConfig.DICT_VERSION.key, exist_obj.dict_type)
             logger.info(f"更新字典类型成功并刷新缓存: {new_obj_dict}")
         except Exception as e:
             logger.error(f"更新字典类型缓存失败: {e}")
@@ -180,6 +187,7 @@ class DictTypeService:
             redis_key = f"{RedisInitKeyConfig.SYSTEM_DICT.key}:{exist_obj.dict_type}"
             try:
                 await RedisCURD(redis).delete(redis_key)
+                await RedisCURD(redis).bump_version(RedisInitKeyConfig.DICT_VERSION.key, exist_obj.dict_type)
                 logger.info(f"删除字典类型成功: {id}")
             except Exception as e:
                 logger.error(f"删除字典类型失败: {e}")
@@ -201,15 +209,19 @@ class DictTypeService:
         await DictTypeCRUD(auth).set_obj_available_crud(ids=data.ids, status=data.status)
 
     @classmethod
-    async def export_obj_service(cls, data_list: List[Dict[str, Any]]) -> bytes:
+    async def export_obj_service(cls, auth: AuthSchema, search: Optional[DictTypeQueryParam] = None, order_by: Optional[List[Dict[str, str]]] = None, file_format: str = 'xlsx', progress: Optional[Callable[[int], Awaitable[None]]] = None) -> str:
         """
         导出数据字典类型列表
         
         参数:
-        - data_list (List[Dict[str, Any]]): 数据字典类型列表
+        - auth (AuthSchema): 认证信息模型
+        - search (Optional[DictTypeQueryParam]): 查询参数
+        - order_by (Optional[List[Dict[str, str]]]): 排序参数
+        - file_format (str): 导出格式, xlsx 或 csv
+        - progress (Callable[[int], Awaitable[None]] | None): 后台任务的进度回调
         
         返回:
-        - bytes: Excel文件字节流
+        - str: 导出文件路径
         """
         mapping_dict = {
             'id': '编号',
@@ -223,15 +235,21 @@ class DictTypeService:
             'creator': '创建者',
         }
 
-        # 复制数据并转换状态
-        data = data_list.copy()
-        for item in data:
+        def format_row(obj: Any) -> Dict[str, Any]:
+            item = DictTypeOutSchema.model_validate(obj).model_dump()
             # 处理状态
             item['status'] = '正常' if item.get('status') else '停用'
             item['creator'] = item.get('creator', {}).get('name', '未知') if isinstance(item.get('creator'), dict) else '未知'
+            return item
 
-        return ExcelUtil.export_list2excel(list_data=data, mapping_dict=mapping_dict)
-    
+        # 按排序键分块读取并逐行写入导出文件, 内存占用与导出行数无关
+        return await ExcelUtil.export_rows2file(
+            rows=DictTypeCRUD(auth).scan(search=search.__dict__ if search else None, order_by=order_by),
+            mapping_dict=mapping_dict,
+            formatter=format_row,
+            file_format=file_format,
+            progress=progress
+        )
 
 class DictDataService:
     """
@@ -267,7 +285,7 @@ class DictDataService:
         - List[Dict]: 数据字典数据详情字典列表
         """
         obj_list = await DictDataCRUD(auth).get_obj_list_crud(search=search.__dict__, order_by=order_by)
-        return [DictDataOutSchema.model_validate(obj).model_dump() for obj in obj_list]
+        return Serialize.dump_list(DictDataOutSchema, obj_list)
 
     @classmethod
     async def init_dict_service(cls, redis: Redis):
@@ -295,16 +313,20 @@ class DictDataService:
                         logger.warning(f"❗️ 字典类型 {dict_type} 未找到对应的字典数据")
                         continue
                     
-                    dict_data = [DictDataOutSchema.model_validate(row).model_dump() for row in dict_data_list if row]
+                    dict_data = Serialize.dump_list(DictDataOutSchema, (row for row in dict_data_list if row))
             
                     # 保存到Redis并设置过期时间
                     redis_key = f"{RedisInitKeyConfig.SYSTEM_DICT.key}:{dict_type}"
                     try:
                         value = json.dumps(dict_data, ensure_ascii=False)
+                        # 仅在内容变化时递增版本号, 避免每次重启都使客户端缓存失效
+                        changed = await RedisCURD(redis).get(redis_key) != value
                         await RedisCURD(redis).set(
                                 key=redis_key,
                                 value=value,
                             )
+                        if changed:
+                            await RedisCURD(redis).bump_version(RedisInitKeyConfig.DICT_VERSION.key, dict_type)
                     except Exception as e:
                         logger.error(f"❌️ 初始化字典数据失败: {e}")
                         raise CustomException(msg=f"初始化字典数据失败 {e}")
@@ -327,6 +349,53 @@ class DictDataService:
             raise CustomException(msg="数据字典不存在")
         return obj_list_dict
 
+    @classmethod
+    async def get_init_dict_version_service(cls, redis: Redis, dict_type: str) -> str:
+        """
+        获取字典类型的缓存版本标识service
+        
+        参数:
+        - redis (Redis): Redis客户端
+        - dict_type (str): 字典类型
+        
+        返回:
+        - str: 版本标识(纪元-版本号), 未记录时为空字符串
+        """
+        return await RedisCURD(redis).get_version(RedisInitKeyConfig.DICT_VERSION.key, dict_type)
+
+    @classmethod
+    async def get_dict_sync_service(cls, redis: Redis, since: int, epoch: str = '') -> Dict:
+        """
+        增量同步: 获取指定版本号之后变更的字典数据service
+        
+        客户端的纪元与当前纪元不一致(如 Redis 数据被清空)时返回全部字典数据, 并标记 reset, 客户端应丢弃本地缓存。
+        
+        参数:
+        - redis (Redis): Redis客户端
+        - since (int): 客户端已同步的版本号
+        - epoch (str): 客户端版本号所属的纪元
+        
+        返回:
+        - Dict: 包含当前纪元、版本号、是否全量同步、变更的字典数据和已删除的字典类型
+        """
+        current_epoch, version, changed_versions = await RedisCURD(redis).get_versions_since(RedisInitKeyConfig.DICT_VERSION.key, since, epoch)
+        
+        changed: Dict[str, List[Dict]] = {}
+        deleted: List[str] = []
+        if changed_versions:
+            dict_types = list(changed_versions.keys())
+            values = await RedisCURD(redis).mget([f"{RedisInitKeyConfig.SYSTEM_DICT.key}:{dict_type}" for dict_type in dict_types])
+            for dict_type, value in zip(dict_types, values):
+                if value is None:
+                    deleted.append(dict_type)
+                    continue
+                try:
+                    changed[dict_type] = json.loads(value) if value else []
+                except Exception as e:
+                    logger.error(f"解析字典数据失败: {e}")
+        
+        return {"epoch": current_epoch, "version": version, "reset": epoch != current_epoch, "changed": changed, "deleted": deleted}
+
     @classmethod
     async def create_obj_service(cls, auth: AuthSchema, redis: Redis, data: DictDataCreateSchema) -> Dict:
         """
@@ -349,13 +418,14 @@ class DictDataService:
         try:
             # 获取当前字典类型的所有字典数据
             dict_data_list = await DictDataCRUD(auth).get_obj_list_crud(search={'dict_type': data.dict_type})
-            dict_data = [DictDataOutSchema.model_validate(row).model_dump() for row in dict_data_list if row]
+            dict_data = Serialize.dump_list(DictDataOutSchema, (row for row in dict_data_list if row))
             
             value = json.dumps(dict_data, ensure_ascii=False)
             await RedisCURD(redis).set(
                     key=redis_key,
                     value=value,
                 )
+            await RedisCURD(redis).bump_version(RedisInitKeyConfig.DICT_VERSION.key, data.dict_type)
             logger.info(f"创建字典数据写入缓存成功: {obj}")
         except Exception as e:
             logger.error(f"创建字典数据写入缓存失败: {e}")
@@ -402,12 +472,13 @@ class DictDataService:
                 redis_key = f"{RedisInitKeyConfig.SYSTEM_DICT.key}:{dict_type.dict_type}"
                 try:
                     dict_data_list = await DictDataCRUD(auth).get_obj_list_crud(search={'dict_type': dict_type.dict_type})
-                    dict_data = [DictDataOutSchema.model_validate(row).model_dump() for row in dict_data_list if row]
+                    dict_data = Serialize.dump_list(DictDataOutSchema, (row for row in dict_data_list if row))
                     value = json.dumps(dict_data, ensure_ascii=False)
                     await RedisCURD(redis).set(
                             key=redis_key,
                             value=value,
                         )
+                    await RedisCURD(redis).bump_version(RedisInitKeyConfig.DICT_VERSION.key, dict_type.dict_type)
                 except Exception as e:
                     logger.error(f"更新字典数据状态时刷新缓存失败: {e}")
                 
@@ -416,13 +487,14 @@ class DictDataService:
         try:
             # 获取当前字典类型的所有字典数据
             dict_data_list = await DictDataCRUD(auth).get_obj_list_crud(search={'dict_type': data.dict_type})
-            dict_data = [DictDataOutSchema.model_validate(row).model_dump() for row in dict_data_list if row]
+            dict_data = Serialize.dump_list(DictDataOutSchema, (row for row in dict_data_list if row))
             
             value = json.dumps(dict_data, ensure_ascii=False)
             await RedisCURD(redis).set(
                     key=redis_key,
                     value=value,
                 )
+            await RedisCURD(redis).bump_version(RedisInitKeyConfig.DICT_VERSION.key, data.dict_type)
             logger.info(f"更新字典数据写入缓存成功: {obj}")
         except Exception as e:
             logger.error(f"更新字典数据写入缓存失败: {e}")
@@ -446,21 +518,31 @@ class DictDataService:
         if len(ids) < 1:
             raise CustomException(msg='删除失败，删除对象不能为空')
         
+        dict_types = set()
         for id in ids:
 
             exist_obj = await DictDataCRUD(auth).get_obj_by_id_crud(id=id)
             if not exist_obj:
                 raise CustomException(msg=f'{id} 删除失败，该字典数据不存在')
-            # 删除Redis缓存
-            redis_key = f"{RedisInitKeyConfig.SYSTEM_DICT.key}:{exist_obj.dict_type}"
+            dict_types.add(exist_obj.dict_type)
+        await DictDataCRUD(auth).delete_obj_crud(ids=ids)
+
+        # 刷新受影响字典类型的Redis缓存
+        for dict_type in dict_types:
+            redis_key = f"{RedisInitKeyConfig.SYSTEM_DICT.key}:{dict_type}"
             try:
-                # 删除Redis缓存
-                await RedisCURD(redis).delete(redis_key)
-                logger.info(f"删除字典数据成功: {id}")
+                dict_data_list = await DictDataCRUD(auth).get_obj_list_crud(search={'dict_type': dict_type})
+                dict_data = Serialize.dump_list(DictDataOutSchema, (row for row in dict_data_list if row))
+                value = json.dumps(dict_data, ensure_ascii=False)
+                await RedisCURD(redis).set(
+                        key=redis_key,
+                        value=value,
+                    )
+                await RedisCURD(redis).bump_version(RedisInitKeyConfig.DICT_VERSION.key, dict_type)
+                logger.info(f"删除字典数据并刷新缓存成功: {dict_type}")
             except Exception as e:
                 logger.error(f"删除字典数据失败: {e}")
                 raise CustomException(msg=f"删除字典数据失败 {e}")
-        await DictDataCRUD(auth).delete_obj_crud(ids=ids)
 
     @classmethod
     async def set_obj_available_service(cls, auth: AuthSchema, data: BatchSetAvailable) -> None:
@@ -477,15 +559,19 @@ class DictDataService:
         await DictDataCRUD(auth).set_obj_available_crud(ids=data.ids, status=data.status)
 
     @classmethod
-    async def export_obj_service(cls, data_list: List[Dict[str, Any]]) -> bytes:
+    async def export_obj_service(cls, auth: AuthSchema, search: Optional[DictDataQueryParam] = None, order_by: Optional[List[Dict[str, str]]] = None, file_format: str = 'xlsx', progress: Optional[Callable[[int], Awaitable[None]]] = None) -> str:
         """
         导出数据字典数据列表
         
         参数:
-        - data_list (List[Dict[str, Any]]): 数据字典数据列表
+        - auth (AuthSchema): 认证信息模型
+        - search (Optional[DictDataQueryParam]): 查询参数
+        - order_by (Optional[List[Dict[str, str]]]): 排序参数
+        - file_format (str): 导出格式, xlsx 或 csv
+        - progress (Callable[[int], Awaitable[None]] | None): 后台任务的进度回调
         
         返回:
-        - bytes: Excel文件字节流
+        - str: 导出文件路径
         """
         mapping_dict = {
             'id': '编号',
@@ -504,13 +590,20 @@ class DictDataService:
             'creator': '创建者',
         }
 
-        # 复制数据并转换状态
-        data = data_list.copy()
-        for item in data:
+        def format_row(obj: Any) -> Dict[str, Any]:
+            item = DictDataOutSchema.model_validate(obj).model_dump()
             # 处理状态
             item['status'] = '正常' if item.get('status') else '停用'
             # 处理是否默认
             item['is_default'] = '是' if item.get('is_default') else '否'
             item['creator'] = item.get('creator', {}).get('name', '未知') if isinstance(item.get('creator'), dict) else '未知'
+            return item
 
-        return ExcelUtil.export_list2excel(list_data=data, mapping_dict=mapping_dict)
\ No newline at end of file
+        # 按排序键分块读取并逐行写入导出文件, 内存占用与导出行数无关
+        return await ExcelUtil.export_rows2file(
+            rows=DictDataCRUD(auth).scan(search=search.__dict__ if search else None, order_by=order_by),
+            mapping_dict=mapping_dict,
+            formatter=format_row,
+            file_format=file_format,
+            progress=progress
+        )
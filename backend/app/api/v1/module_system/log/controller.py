@@ -1,16 +1,18 @@
 # -*- coding: utf-8 -*-
 
 from fastapi import APIRouter, Body, Depends, Path, Query
-from fastapi.responses import JSONResponse, StreamingResponse
+from fastapi.responses import JSONResponse, Response
+from redis.asyncio.client import Redis
 
 from app.common.request import PaginationService
 from app.common.response import SuccessResponse, StreamResponse
-from app.utils.common_util import bytes2file_response
+from app.utils.common_util import file2stream_response
 from app.core.router_class import OperationLogRoute
-from app.core.dependencies import AuthPermission
-from app.core.base_params import PaginationQueryParam
+from app.core.dependencies import AuthPermission, redis_getter
+from app.core.base_params import ExportQueryParam, PaginationQueryParam
 from app.core.logger import logger
 from ..auth.schema import AuthSchema
+from app.api.v1.module_common.task.service import TaskService
 from .param import OperationLogQueryParam
 from .service import OperationLogService
 
@@ -87,26 +89,39 @@ async def delete_obj_log_controller(
 @LogRouter.post("/export", summary="导出日志", description="导出日志")
 async def export_obj_list_controller(
     search: OperationLogQueryParam = Depends(),
+    export: ExportQueryParam = Depends(),
+    redis: Redis = Depends(redis_getter),
     auth: AuthSchema = Depends(AuthPermission(["system:log:export"]))
-) -> StreamingResponse:
+) -> Response:
     """ 
     导出日志 
     
     参数:
     - search (OperationLogQueryParam): 日志查询参数模型
+    - export (ExportQueryParam): 导出参数
+    - redis (Redis): Redis 客户端
     - auth (AuthSchema): 认证信息模型
     
     返回:
-    - StreamingResponse: 包含导出日志的流式响应模型
+    - Response: 包含导出日志的流式响应模型, 后台导出时为任务信息的JSON响应
     """
-    operation_log_list = await OperationLogService.get_log_list_service(search=search, auth=auth)
-    operation_log_export_result = await OperationLogService.export_log_list_service(operation_log_list=operation_log_list)
+    if export.background:
+        task = await TaskService.submit_export_service(
+            redis=redis,
+            auth=auth,
+            name="导出日志",
+            file_name=export.filename("log"),
+            export_func=lambda task_auth, progress: OperationLogService.export_log_list_service(auth=task_auth, search=search, file_format=export.file_format, progress=progress)
+        )
+        return SuccessResponse(data=task, msg="导出任务已提交")
+
+    operation_log_export_result = await OperationLogService.export_log_list_service(auth=auth, search=search, file_format=export.file_format)
     logger.info('导出日志成功')
 
     return StreamResponse(
-        data=bytes2file_response(operation_log_export_result),
-        media_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+        data=file2stream_response(operation_log_export_result),
+        media_type=export.media_type,
         headers = {
-            'Content-Disposition': 'attachment; filename=log.xlsx'
+            'Content-Disposition': f'attachment; filename={export.filename("log")}'
         }
     )
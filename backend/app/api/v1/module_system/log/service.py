@@ -1,8 +1,9 @@
 # -*- coding: utf-8 -*-
 
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Awaitable, Callable
 
 from app.core.exceptions import CustomException
+from app.core.serialize import Serialize
 from app.utils.excel_util import ExcelUtil
 from ..auth.schema import AuthSchema
 from .param import OperationLogQueryParam
@@ -48,7 +49,7 @@ class OperationLogService:
         - List[Dict]: 日志详情字典列表
         """            
         log_list = await OperationLogCRUD(auth).get_list_crud(search=search.__dict__, order_by=order_by)
-        log_dict_list = [OperationLogOutSchema.model_validate(log).model_dump() for log in log_list]
+        log_dict_list = Serialize.dump_list(OperationLogOutSchema, log_list)
         return log_dict_list
 
     @classmethod
@@ -84,17 +85,20 @@ class OperationLogService:
         await OperationLogCRUD(auth).delete(ids=ids)
 
     @classmethod
-    async def export_log_list_service(cls, operation_log_list: List[Dict[str, Any]]) -> bytes:
+    async def export_log_list_service(cls, auth: AuthSchema, search: Optional[OperationLogQueryParam] = None, order_by: Optional[List[Dict[str, str]]] = None, file_format: str = 'xlsx', progress: Optional[Callable[[int], Awaitable[None]]] = None) -> str:
         """
         导出日志信息
-
+        
         参数:
-        - operation_log_list (List[Dict[str, Any]]): 操作日志信息列表
+        - auth (AuthSchema): 认证信息模型
+        - search (Optional[OperationLogQueryParam]): 查询参数
+        - order_by (Optional[List[Dict[str, str]]]): 排序参数
+        - file_format (str): 导出格式, xlsx 或 csv
+        - progress (Callable[[int], Awaitable[None]] | None): 后台任务的进度回调
         
         返回:
-        - bytes: 操作日志信息excel的二进制数据
+        - str: 导出文件路径
         """
-        # 操作日志字段映射
         mapping_dict = {
             'id': '编号',
             'type': '日志类型',
@@ -115,13 +119,20 @@ class OperationLogService:
             'creator': '创建者',
         }
 
-        # 处理数据
-        data = operation_log_list.copy()
-        for item in data:
+        def format_row(obj: Any) -> Dict[str, Any]:
+            item = OperationLogOutSchema.model_validate(obj).model_dump()
             # 处理状态
             item['response_code'] = '成功' if item.get('response_code') == 200 else '失败'
             # 处理日志类型
             item['type'] = '操作日志' if item.get('type') == 1 else '登录日志'
             item['creator'] = item.get('creator', {}).get('name', '未知') if isinstance(item.get('creator'), dict) else '未知'
+            return item
 
-        return ExcelUtil.export_list2excel(list_data=data, mapping_dict=mapping_dict)
+        # 按排序键分块读取并逐行写入导出文件, 内存占用与导出行数无关
+        return await ExcelUtil.export_rows2file(
+            rows=OperationLogCRUD(auth).scan(search=search.__dict__ if search else None, order_by=order_by),
+            mapping_dict=mapping_dict,
+            formatter=format_row,
+            file_format=file_format,
+            progress=progress
+        )
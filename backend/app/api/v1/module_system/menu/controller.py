@@ -2,9 +2,10 @@
 
 from fastapi import APIRouter, Body, Depends, Path
 from fastapi.responses import JSONResponse
+from redis.asyncio.client import Redis
 
 from app.common.response import SuccessResponse
-from app.core.dependencies import AuthPermission
+from app.core.dependencies import AuthPermission, redis_getter
 from app.core.base_schema import BatchSetAvailable
 from app.core.router_class import OperationLogRoute
 from app.core.logger import logger
@@ -61,6 +62,7 @@ async def get_obj_detail_controller(
 @MenuRouter.post("/create", summary="创建菜单", description="创建菜单")
 async def create_obj_controller(
     data: MenuCreateSchema,
+    redis: Redis = Depends(redis_getter),
     auth: AuthSchema = Depends(AuthPermission(["system:menu:create"]))
 ) -> JSONResponse:
     """
@@ -68,11 +70,12 @@ async def create_obj_controller(
     
     参数:
     - data (MenuCreateSchema): 菜单创建模型。
+    - redis (Redis): Redis客户端对象。
     
     返回:
     - JSONResponse: 包含创建菜单的 JSON 响应。
     """
-    result_dict = await MenuService.create_menu_service(data=data, auth=auth)
+    result_dict = await MenuService.create_menu_service(data=data, auth=auth, redis=redis)
     logger.info(f"创建菜单成功: {result_dict}")
     return SuccessResponse(data=result_dict, msg="创建菜单成功")
 
@@ -81,6 +84,7 @@ async def create_obj_controller(
 async def update_obj_controller(
     data: MenuUpdateSchema,
     id: int = Path(..., description="菜单ID"),
+    redis: Redis = Depends(redis_getter),
     auth: AuthSchema = Depends(AuthPermission(["system:menu:update"]))
 ) -> JSONResponse:
     """
@@ -89,11 +93,12 @@ async def update_obj_controller(
     参数:
     - id (int): 菜单ID。
     - data (MenuUpdateSchema): 菜单更新模型。
+    - redis (Redis): Redis客户端对象。
     
     返回:
     - JSONResponse: 包含修改菜单的 JSON 响应。
     """
-    result_dict = await MenuService.update_menu_service(id=id, data=data, auth=auth)
+    result_dict = await MenuService.update_menu_service(id=id, data=data, auth=auth, redis=redis)
     logger.info(f"修改菜单成功: {result_dict}")
     return SuccessResponse(data=result_dict, msg="修改菜单成功")
 
@@ -101,6 +106,7 @@ async def update_obj_controller(
 @MenuRouter.delete("/delete", summary="删除菜单", description="删除菜单")
 async def delete_obj_controller(
     ids: list[int] = Body(..., description="ID列表"),
+    redis: Redis = Depends(redis_getter),
     auth: AuthSchema = Depends(AuthPermission(["system:menu:delete"]))
 ) -> JSONResponse:
     """
@@ -108,11 +114,12 @@ async def delete_obj_controller(
     
     参数:
     - ids (list[int]): 菜单ID列表。
+    - redis (Redis): Redis客户端对象。
     
     返回:
     - JSONResponse: 包含删除菜单的 JSON 响应。
     """
-    await MenuService.delete_menu_service(ids=ids, auth=auth)
+    await MenuService.delete_menu_service(ids=ids, auth=auth, redis=redis)
     logger.info(f"删除菜单成功: {ids}")
     return SuccessResponse(msg="删除菜单成功")
 
@@ -120,6 +127,7 @@ async def delete_obj_controller(
 @MenuRouter.patch("/available/setting", summary="批量修改菜单状态", description="批量修改菜单状态")
 async def batch_set_available_obj_controller(
     data: BatchSetAvailable,
+    redis: Redis = Depends(redis_getter),
     auth: AuthSchema = Depends(AuthPermission(["system:menu:patch"]))
 ) -> JSONResponse:
     """
@@ -127,10 +135,11 @@ async def batch_set_available_obj_controller(
     
     参数:
     - data (BatchSetAvailable): 批量修改菜单状态模型。
+    - redis (Redis): Redis客户端对象。
     
     返回:
     - JSONResponse: 批量修改菜单状态的 JSON 响应。
     """
-    await MenuService.set_menu_available_service(data=data, auth=auth)
+    await MenuService.set_menu_available_service(data=data, auth=auth, redis=redis)
     logger.info(f"批量修改菜单状态成功: {data.ids}")
     return SuccessResponse(msg="批量修改菜单状态成功")
\ No newline at end of file
@@ -60,6 +60,8 @@ class MenuCRUD(CRUDBase[MenuModel, MenuCreateSchema, MenuUpdateSchema]):
     async def set_available_crud(self, ids: List[int], status: bool) -> None:
         """
         批量设置菜单可用状态。
+
+        启用时同时启用所有父级菜单, 停用时同时停用所有子级菜单, 均为单条SQL。
         
         参数:
         - ids (List[int]): 菜单 ID 列表。
@@ -68,4 +70,7 @@ class MenuCRUD(CRUDBase[MenuModel, MenuCreateSchema, MenuUpdateSchema]):
         返回:
         - None
         """
-        await self.set(ids=ids, status=status)
+        if status:
+            await self.set_ancestors(ids=ids, status=status)
+        else:
+            await self.set_descendants(ids=ids, status=status)
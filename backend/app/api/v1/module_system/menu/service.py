@@ -1,16 +1,19 @@
 # -*- coding: utf-8 -*-
 
+import json
+from functools import partial
 from typing import List, Dict, Optional
+from redis.asyncio.client import Redis
 
+from app.common.enums import RedisInitKeyConfig
+from app.config.setting import settings
+from app.core.logger import logger
 from app.core.base_schema import BatchSetAvailable
+from app.core.database import add_after_commit
 from app.core.exceptions import CustomException
-from app.utils.common_util import (
-    get_parent_id_map,
-    get_parent_recursion,
-    get_child_id_map,
-    get_child_recursion,
-    traversal_to_tree
-)
+from app.core.redis_crud import RedisCURD
+from app.core.serialize import Serialize
+from app.utils.common_util import traversal_to_tree
 from ..auth.schema import AuthSchema
 from .param import MenuQueryParam
 from .crud import MenuCRUD
@@ -21,6 +24,17 @@ from .schema import (
 )
 
 
+# 写入菜单树缓存: 缓存版本与构建前读取的版本一致时才写入, 避免构建期间菜单或授权已变更时写入过期数据
+SET_ROUTE_TREE_SCRIPT = """
+if (redis.call('GET', KEYS[2]) or '') ~= ARGV[1] then
+    return 0
+end
+redis.call('HSET', KEYS[1], ARGV[2], ARGV[3])
+redis.call('EXPIRE', KEYS[1], ARGV[4])
+return 1
+"""
+
+
 class MenuService:
     """
     菜单模块服务层
@@ -63,17 +77,110 @@ class MenuService:
         # 使用树形结构查询，预加载children关系
         menu_list = await MenuCRUD(auth).get_tree_list_crud(search=search.__dict__, order_by=order_by)
         # 转换为字典列表
-        menu_dict_list = [MenuOutSchema.model_validate(menu).model_dump() for menu in menu_list]
+        menu_dict_list = Serialize.dump_list(MenuOutSchema, menu_list)
         # 使用traversal_to_tree构建树形结构
         return traversal_to_tree(menu_dict_list)
 
     @classmethod
-    async def create_menu_service(cls, auth: AuthSchema, data: MenuCreateSchema) -> Dict:
+    async def get_route_tree_service(cls, auth: AuthSchema, redis: Redis) -> List[Dict]:
+        """
+        获取当前用户的路由菜单树(按角色集合缓存)。
+
+        超级管理员共用一份缓存, 其余用户按已启用角色ID排序后的集合共用缓存,
+        菜单或角色授权变更提交后整体失效(缓存版本递增)。
+
+        参数:
+        - auth (AuthSchema): 认证对象。
+        - redis (Redis): Redis客户端对象。
+
+        返回:
+        - List[Dict]: 路由菜单树形列表。
+        """
+        if auth.user and auth.user.is_superuser:
+            field = 'superuser'
+        else:
+            role_ids = sorted({role.id for role in auth.user.roles or []}) if auth.user else []
+            field = 'role:' + ','.join(str(role_id) for role_id in role_ids)
+
+        name = RedisInitKeyConfig.MENU_TREE.key
+        version_name = RedisInitKeyConfig.MENU_TREE_VERSION.key
+        version = None
+        try:
+            # 版本需在查询数据库之前读取
+            async with redis.pipeline(transaction=False) as pipe:
+                pipe.get(version_name)
+                pipe.hget(name, field)
+                version, cached = await pipe.execute()
+            if cached is not None:
+                return json.loads(cached)
+        except Exception as e:
+            logger.error(f"获取菜单树缓存失败: {str(e)}")
+
+        menu_tree = await cls._build_route_tree(auth=auth)
+        await RedisCURD(redis).eval_script(
+            script=SET_ROUTE_TREE_SCRIPT,
+            keys=[name, version_name],
+            args=[version or '', field, json.dumps(menu_tree, ensure_ascii=False), settings.MENU_TREE_CACHE_EXPIRE_SECONDS]
+        )
+        return menu_tree
+
+    @classmethod
+    async def clear_route_tree_cache_service(cls, redis: Redis) -> None:
+        """
+        清除所有角色的路由菜单树缓存并递增缓存版本。
+
+        须在变更提交后调用(通过 add_after_commit 注册), 提交前清除时并发请求可能重新缓存变更前的数据。
+
+        参数:
+        - redis (Redis): Redis客户端对象。
+
+        返回:
+        - None
+        """
+        try:
+            async with redis.pipeline(transaction=True) as pipe:
+                pipe.incr(RedisInitKeyConfig.MENU_TREE_VERSION.key)
+                pipe.delete(RedisInitKeyConfig.MENU_TREE.key)
+                await pipe.execute()
+        except Exception as e:
+            logger.error(f"清除菜单树缓存失败: {str(e)}")
+
+    @classmethod
+    async def _build_route_tree(cls, auth: AuthSchema) -> List[Dict]:
+        """
+        从数据库构造当前用户的路由菜单树。
+
+        参数:
+        - auth (AuthSchema): 认证对象。
+
+        返回:
+        - List[Dict]: 可JSON序列化的路由菜单树形列表。
+        """
+        if auth.user and auth.user.is_superuser:
+            # 使用树形结构查询，预加载children关系
+            menu_all = await MenuCRUD(auth).get_tree_list_crud(search={'type': ('in', [1, 2, 4]), 'status': True})
+        else:
+            # 收集用户所有角色的菜单ID
+            menu_ids = {
+                menu.id
+                for role in (auth.user.roles if auth.user else None) or []
+                for menu in role.menus
+                if menu.status and menu.type in [1, 2, 4]
+            }
+            if not menu_ids:
+                return []
+            menu_all = await MenuCRUD(auth).get_tree_list_crud(search={'id': ('in', list(menu_ids))})
+        menus = [MenuOutSchema.model_validate(menu).model_dump(mode='json') for menu in menu_all]
+        return traversal_to_tree(menus)
+
+    @classmethod
+    async def create_menu_service(cls, auth: AuthSchema, redis: Redis, data: MenuCreateSchema) -> Dict:
         """
         创建菜单。
         
         参数:
         - auth (AuthSchema): 认证对象。
+        - redis (Redis): Redis客户端对象。
         - data (MenuCreateSchema): 创建参数对象。
         
         返回:
@@ -84,16 +191,18 @@ class MenuService:
             raise CustomException(msg='创建失败，该菜单已存在')
 
         new_menu = await MenuCRUD(auth).create(data=data)
+        add_after_commit(auth.db, partial(cls.clear_route_tree_cache_service, redis=redis))
         new_menu_dict = MenuOutSchema.model_validate(new_menu).model_dump()
         return new_menu_dict
 
     @classmethod
-    async def update_menu_service(cls, auth: AuthSchema,id:int, data: MenuUpdateSchema) -> Dict:
+    async def update_menu_service(cls, auth: AuthSchema, redis: Redis, id: int, data: MenuUpdateSchema) -> Dict:
         """
         更新菜单。
         
         参数:
         - auth (AuthSchema): 认证对象。
+        - redis (Redis): Redis客户端对象。
         - id (int): 菜单ID。
         - data (MenuUpdateSchema): 更新参数对象。
         
@@ -114,18 +223,19 @@ class MenuService:
             data.parent_name = parent_menu.name
         new_menu = await MenuCRUD(auth).update(id=id, data=data)
         
-        await cls.set_menu_available_service(auth=auth, data=BatchSetAvailable(ids=[id], status=data.status))
+        await cls.set_menu_available_service(auth=auth, redis=redis, data=BatchSetAvailable(ids=[id], status=data.status))
         
         new_menu_dict = MenuOutSchema.model_validate(new_menu).model_dump()
         return new_menu_dict
     
     @classmethod
-    async def delete_menu_service(cls, auth: AuthSchema, ids: list[int]) -> None:
+    async def delete_menu_service(cls, auth: AuthSchema, redis: Redis, ids: list[int]) -> None:
         """
         删除菜单。
         
         参数:
         - auth (AuthSchema): 认证对象。
+        - redis (Redis): Redis客户端对象。
         - ids (list[int]): 菜单ID列表。
         
         返回:
@@ -138,33 +248,21 @@ class MenuService:
             if not menu:
                 raise CustomException(msg='删除失败，该菜单不存在')
         await MenuCRUD(auth).delete(ids=ids)
+        add_after_commit(auth.db, partial(cls.clear_route_tree_cache_service, redis=redis))
 
     @classmethod
-    async def set_menu_available_service(cls, auth: AuthSchema, data: BatchSetAvailable) -> None:
+    async def set_menu_available_service(cls, auth: AuthSchema, redis: Redis, data: BatchSetAvailable) -> None:
         """
         递归获取所有父、子级菜单，然后批量修改菜单可用状态。
         
         参数:
         - auth (AuthSchema): 认证对象。
+        - redis (Redis): Redis客户端对象。
         - data (BatchSetAvailable): 批量设置可用参数对象。
         
         返回:
         - None
         """
-        menu_list = await MenuCRUD(auth).get_list_crud()
-        total_ids = []
-        
-        if data.status:
-            # 激活，则需要把所有父级菜单都激活
-            id_map = get_parent_id_map(model_list=menu_list)
-            for menu_id in data.ids:
-                enable_ids = get_parent_recursion(id=menu_id, id_map=id_map)
-                total_ids.extend(enable_ids)
-        else:
-            # 禁止，则需要把所有子级菜单都禁止
-            id_map = get_child_id_map(model_list=menu_list)
-            for menu_id in data.ids:
-                disable_ids = get_child_recursion(id=menu_id, id_map=id_map)
-                total_ids.extend(disable_ids)
-
-        await MenuCRUD(auth).set_available_crud(ids=total_ids, status=data.status)
\ No newline at end of file
+        # 启用时级联启用所有父级菜单, 停用时级联停用所有子级菜单(递归查询, 单条SQL)
+        await MenuCRUD(auth).set_available_crud(ids=data.ids, status=data.status)
+        add_after_commit(auth.db, partial(cls.clear_route_tree_cache_service, redis=redis))
\ No newline at end of file
@@ -1,17 +1,19 @@
 # -*- coding: utf-8 -*-
 
 from fastapi import APIRouter, Body, Depends, Path, Query
-from fastapi.responses import JSONResponse, StreamingResponse
+from fastapi.responses import JSONResponse, Response
+from redis.asyncio.client import Redis
 
 from app.common.response import StreamResponse, SuccessResponse
-from app.core.base_params import PaginationQueryParam
-from app.core.dependencies import AuthPermission, get_current_user
+from app.core.base_params import ExportQueryParam, PaginationQueryParam
+from app.core.dependencies import AuthPermission, get_current_user, redis_getter
 from app.core.router_class import OperationLogRoute
 from app.core.base_schema import BatchSetAvailable
 from app.core.logger import logger
 from app.common.request import PaginationService
-from app.utils.common_util import bytes2file_response
+from app.utils.common_util import file2stream_response
 from ..auth.schema import AuthSchema
+from app.api.v1.module_common.task.service import TaskService
 from .param import NoticeQueryParam
 from .service import NoticeService
 from .schema import (
@@ -144,27 +146,40 @@ async def batch_set_available_obj_controller(
 @NoticeRouter.post('/export', summary="导出公告", description="导出公告")
 async def export_obj_list_controller(
     search: NoticeQueryParam = Depends(),
+    export: ExportQueryParam = Depends(),
+    redis: Redis = Depends(redis_getter),
     auth: AuthSchema = Depends(AuthPermission(["system:notice:export"]))
-) -> StreamingResponse:
+) -> Response:
     """
     导出公告。
     
     参数:
     - search (NoticeQueryParam): 查询公告参数模型。
+    - export (ExportQueryParam): 导出参数
+    - redis (Redis): Redis 客户端
     - auth (AuthSchema): 认证信息模型。
     
     返回:
-    - StreamingResponse: 包含导出公告的流式响应模型。
-    """
-    result_dict_list = await NoticeService.get_notice_list_service(search=search, auth=auth)
-    export_result = await NoticeService.export_notice_service(notice_list=result_dict_list)
+    - Response: 包含导出公告的流式响应模型, 后台导出时为任务信息的JSON响应。
+    """
+    if export.background:
+        task = await TaskService.submit_export_service(
+            redis=redis,
+            auth=auth,
+            name="导出公告",
+            file_name=export.filename("notice"),
+            export_func=lambda task_auth, progress: NoticeService.export_notice_service(auth=task_auth, search=search, file_format=export.file_format, progress=progress)
+        )
+        return SuccessResponse(data=task, msg="导出任务已提交")
+
+    export_result = await NoticeService.export_notice_service(auth=auth, search=search, file_format=export.file_format)
     logger.info('导出公告成功')
 
     return StreamResponse(
-        data=bytes2file_response(export_result),
-        media_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+        data=file2stream_response(export_result),
+        media_type=export.media_type,
         headers = {
-            'Content-Disposition': 'attachment; filename=notice.xlsx'
+            'Content-Disposition': f'attachment; filename={export.filename("notice")}'
         }
     )
 
@@ -1,10 +1,11 @@
 # -*- coding: utf-8 -*-
 
-from typing import Any, List, Dict, Optional
+from typing import Any, List, Dict, Optional, Awaitable, Callable
 
 
 from app.core.base_schema import BatchSetAvailable
 from app.core.exceptions import CustomException
+from app.core.serialize import Serialize
 from app.utils.excel_util import ExcelUtil
 from ..auth.schema import AuthSchema
 from .schema import NoticeCreateSchema, NoticeUpdateSchema, NoticeOutSchema
@@ -44,7 +45,7 @@ class NoticeService:
         - List[Dict]: 可用公告详情字典列表。
         """
         notice_obj_list = await NoticeCRUD(auth).get_list_crud(search={'status': True})
-        return [NoticeOutSchema.model_validate(notice_obj).model_dump() for notice_obj in notice_obj_list]
+        return Serialize.dump_list(NoticeOutSchema, notice_obj_list)
 
     @classmethod
     async def get_notice_list_service(cls, auth: AuthSchema, search: Optional[NoticeQueryParam] = None, order_by: Optional[List[Dict[str, str]]] = None) -> List[Dict]:
@@ -60,7 +61,7 @@ class NoticeService:
         - List[Dict]: 公告详情字典列表。
         """
         notice_obj_list = await NoticeCRUD(auth).get_list_crud(search=search.__dict__, order_by=order_by)
-        return [NoticeOutSchema.model_validate(notice_obj).model_dump() for notice_obj in notice_obj_list]
+        return Serialize.dump_list(NoticeOutSchema, notice_obj_list)
     
     @classmethod
     async def create_notice_service(cls, auth: AuthSchema, data: NoticeCreateSchema) -> Dict:
@@ -143,15 +144,19 @@ class NoticeService:
         await NoticeCRUD(auth).set_available_crud(ids=data.ids, status=data.status)
     
     @classmethod
-    async def export_notice_service(cls, notice_list: List[Dict[str, Any]]) -> bytes:
+    async def export_notice_service(cls, auth: AuthSchema, search: Optional[NoticeQueryParam] = None, order_by: Optional[List[Dict[str, str]]] = None, file_format: str = 'xlsx', progress: Optional[Callable[[int], Awaitable[None]]] = None) -> str:
         """
         导出公告列表。
         
         参数:
-        - notice_list (List[Dict[str, Any]]): 公告详情字典列表。
+        - auth (AuthSchema): 认证信息模型
+        - search (Optional[NoticeQueryParam]): 查询参数
+        - order_by (Optional[List[Dict[str, str]]]): 排序参数
+        - file_format (str): 导出格式, xlsx 或 csv
+        - progress (Callable[[int], Awaitable[None]] | None): 后台任务的进度回调
         
         返回:
-        - bytes: Excel 文件的字节流。
+        - str: 导出文件路径
         """
         mapping_dict = {
             'id': '编号',
@@ -166,13 +171,20 @@ class NoticeService:
             'creator': '创建者',
         }
 
-        # 复制数据并转换状态
-        data = notice_list.copy()
-        for item in data:
+        def format_row(obj: Any) -> Dict[str, Any]:
+            item = NoticeOutSchema.model_validate(obj).model_dump()
             # 处理状态
             item['status'] = '正常' if item.get('status') else '停用'
             # 处理公告类型
             item['notice_type'] = '通知' if item.get('notice_type') == '1' else '公告'
             item['creator'] = item.get('creator', {}).get('name', '未知') if isinstance(item.get('creator'), dict) else '未知'
+            return item
 
-        return ExcelUtil.export_list2excel(list_data=data, mapping_dict=mapping_dict)
\ No newline at end of file
+        # 按排序键分块读取并逐行写入导出文件, 内存占用与导出行数无关
+        return await ExcelUtil.export_rows2file(
+            rows=NoticeCRUD(auth).scan(search=search.__dict__ if search else None, order_by=order_by),
+            mapping_dict=mapping_dict,
+            formatter=format_row,
+            file_format=file_format,
+            progress=progress
+        )
@@ -1,18 +1,19 @@
 # -*- coding: utf-8 -*-
 
 from fastapi import APIRouter, Body, Depends, Path, Query, Request, UploadFile
-from fastapi.responses import JSONResponse, StreamingResponse
+from fastapi.responses import JSONResponse, Response
 from redis.asyncio.client import Redis
 
 
 from app.common.request import PaginationService
-from app.common.response import StreamResponse, SuccessResponse
-from app.utils.common_util import bytes2file_response
-from app.core.base_params import PaginationQueryParam
+from app.common.response import NotModifiedResponse, StreamResponse, SuccessResponse
+from app.utils.common_util import file2stream_response, etag_matches
+from app.core.base_params import ExportQueryParam, PaginationQueryParam
 from app.core.dependencies import AuthPermission, redis_getter
 from app.core.router_class import OperationLogRoute
 from app.core.logger import logger
 from ..auth.schema import AuthSchema
+from app.api.v1.module_common.task.service import TaskService
 from .param import ParamsQueryParam
 from .schema import ParamsCreateSchema, ParamsUpdateSchema
 from .service import ParamsService
@@ -174,27 +175,40 @@ async def delete_obj_controller(
 @ParamsRouter.post('/export', summary="导出参数", description="导出参数")
 async def export_obj_list_controller(
     search: ParamsQueryParam = Depends(),
+    export: ExportQueryParam = Depends(),
+    redis: Redis = Depends(redis_getter),
     auth: AuthSchema = Depends(AuthPermission(["system:param:export"]))
-) -> StreamingResponse:
+) -> Response:
     """
     导出参数
     
     参数:
     - search (ParamsQueryParam): 参数查询参数模型
+    - export (ExportQueryParam): 导出参数
+    - redis (Redis): Redis 客户端
     - auth (AuthSchema): 认证信息模型
     
     返回:
-    - StreamingResponse: 包含导出参数的 Excel 文件流响应
+    - Response: 包含导出参数的 Excel 文件流响应, 后台导出时为任务信息的JSON响应
     """
-    result_dict_list = await ParamsService.get_obj_list_service(search=search, auth=auth)
-    export_result = await ParamsService.export_obj_service(data_list=result_dict_list)
+    if export.background:
+        task = await TaskService.submit_export_service(
+            redis=redis,
+            auth=auth,
+            name="导出参数",
+            file_name=export.filename("params"),
+            export_func=lambda task_auth, progress: ParamsService.export_obj_service(auth=task_auth, search=search, file_format=export.file_format, progress=progress)
+        )
+        return SuccessResponse(data=task, msg="导出任务已提交")
+
+    export_result = await ParamsService.export_obj_service(auth=auth, search=search, file_format=export.file_format)
     logger.info('导出参数成功')
 
     return StreamResponse(
-        data=bytes2file_response(export_result),
-        media_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+        data=file2stream_response(export_result),
+        media_type=export.media_type,
         headers = {
-            'Content-Disposition': 'attachment; filename=params.xlsx'
+            'Content-Disposition': f'attachment; filename={export.filename("params")}'
         }
     )
 
@@ -221,17 +235,50 @@ async def upload_file_controller(
 
 @ParamsRouter.get("/info", summary="获取初始化缓存参数", description="获取初始化缓存参数")
 async def get_init_obj_controller(
+    request: Request,
     redis: Redis = Depends(redis_getter),
-) -> JSONResponse:
+) -> Response:
     """
-    获取初始化缓存参数
+    获取初始化缓存参数，支持 If-None-Match 协商缓存
     
     参数:
+    - request (Request): 请求对象
     - redis (Redis): Redis 客户端实例
     
     返回:
-    - JSONResponse: 获取初始化缓存参数的 JSON 响应
+    - Response: 获取初始化缓存参数的 JSON 响应，版本未变化时返回304
     """
+    version = await ParamsService.get_init_config_version_service(redis=redis)
+    etag = f'"config-{version}"'
+    if version and etag_matches(request.headers.get("If-None-Match"), etag):
+        return NotModifiedResponse(etag=etag)
+
     result_dict = await ParamsService.get_init_config_service(redis=redis)
     logger.info(f"获取初始化缓存参数成功 {result_dict}")
-    return SuccessResponse(data=result_dict, msg="获取初始化缓存参数成功")
\ No newline at end of file
+    response = SuccessResponse(data=result_dict, msg="获取初始化缓存参数成功")
+    if version:
+        response.headers["ETag"] = etag
+        response.headers["Cache-Control"] = "no-cache"
+    return response
+
+
+@ParamsRouter.get("/sync", summary="增量同步缓存参数", description="获取指定版本号之后变更的缓存参数")
+async def get_sync_obj_controller(
+    since: int = Query(0, ge=0, description="客户端已同步的版本号"),
+    epoch: str = Query('', description="客户端版本号所属的纪元"),
+    redis: Redis = Depends(redis_getter),
+) -> JSONResponse:
+    """
+    增量同步缓存参数
+    
+    参数:
+    - since (int): 客户端已同步的版本号，为0时返回全部参数
+    - epoch (str): 客户端版本号所属的纪元，与当前纪元不一致时返回全部参数
+    - redis (Redis): Redis 客户端实例
+    
+    返回:
+    - JSONResponse: 包含当前版本号、变更参数和已删除参数键的 JSON 响应
+    """
+    result_dict = await ParamsService.get_config_sync_service(redis=redis, since=since, epoch=epoch)
+    logger.info(f"增量同步缓存参数成功: {since} -> {result_dict['version']}")
+    return SuccessResponse(data=result_dict, msg="增量同步缓存参数成功")
@@ -1,7 +1,7 @@
 # -*- coding: utf-8 -*-
 
 import json
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Awaitable, Callable
 
 from redis.asyncio.client import Redis
 from fastapi import UploadFile
@@ -15,6 +15,7 @@ from app.utils.upload_util import UploadUtil
 from app.core.base_schema import UploadResponseSchema
 from app.core.exceptions import CustomException
 from app.core.logger import logger
+from app.core.serialize import Serialize
 from ..auth.schema import AuthSchema
 from .param import ParamsQueryParam
 from .schema import ParamsOutSchema, ParamsUpdateSchema, ParamsCreateSchema
@@ -92,7 +93,7 @@ class ParamsService:
             obj_list = await ParamsCRUD(auth).get_obj_list_crud(search=search.__dict__, order_by=order_by)
         else:
             obj_list = await ParamsCRUD(auth).get_obj_list_crud()
-        return [ParamsOutSchema.model_validate(obj).model_dump() for obj in obj_list]
+        return Serialize.dump_list(ParamsOutSchema, obj_list)
     
     @classmethod
     async def create_obj_service(cls, auth: AuthSchema, redis: Redis, data: ParamsCreateSchema) -> Dict:
@@ -124,6 +125,7 @@ class ParamsService:
             if not result:
                 logger.error(f"同步配置到缓存失败: {new_obj_dict}")
                 raise CustomException(msg="同步配置到缓存失败")
+            await RedisCURD(redis).bump_version(RedisInitKeyConfig.CONFIG_VERSION.key, data.config_key)
         except Exception as e:
             logger.error(f"创建字典类型失败: {e}")
             raise CustomException(msg=f"创建字典类型失败 {e}")
@@ -166,6 +168,7 @@ class ParamsService:
             if not result:
                 logger.error(f"同步配置到缓存失败: {new_obj_dict}")
                 raise CustomException(msg="同步配置到缓存失败")
+            await RedisCURD(redis).bump_version(RedisInitKeyConfig.CONFIG_VERSION.key, new_obj.config_key)
         except Exception as e:
             logger.error(f"更新系统配置失败: {e}")
             raise CustomException(msg="更新系统配置失败")
@@ -187,6 +190,7 @@ class ParamsService:
         """
         if len(ids) < 1:
             raise CustomException(msg='删除失败，删除对象不能为空')
+        config_keys = []
         for id in ids:
             exist_obj = await ParamsCRUD(auth).get_obj_by_id_crud(id=id)
             if not exist_obj:
@@ -195,32 +199,35 @@ class ParamsService:
             if exist_obj.config_type:
                 # 如果有字典数据，不能删除
                 raise CustomException(msg=f'{exist_obj.config_name} 删除失败，系统初始化配置不可以删除')
+            config_keys.append(exist_obj.config_key)
         
         await ParamsCRUD(auth).delete_obj_crud(ids=ids)
         
         # 同步删除Redis缓存
-        for id in ids:
-            exist_obj = await ParamsCRUD(auth).get_obj_by_id_crud(id=id)
-            if not exist_obj:
-                continue
-            redis_key = f"{RedisInitKeyConfig.SYSTEM_CONFIG.key}:{exist_obj.config_key}"
+        for config_key in config_keys:
+            redis_key = f"{RedisInitKeyConfig.SYSTEM_CONFIG.key}:{config_key}"
             try:
                 await RedisCURD(redis).delete(redis_key)
-                logger.info(f"删除系统配置成功: {id}")
+                await RedisCURD(redis).bump_version(RedisInitKeyConfig.CONFIG_VERSION.key, config_key)
+                logger.info(f"删除系统配置成功: {config_key}")
             except Exception as e:
                 logger.error(f"删除系统配置失败: {e}")
                 raise CustomException(msg="删除字典类型失败")
     
     @classmethod
-    async def export_obj_service(cls, data_list: List[Dict[str, Any]]) -> bytes:
+    async def export_obj_service(cls, auth: AuthSchema, search: Optional[ParamsQueryParam] = None, order_by: Optional[List[Dict[str, str]]] = None, file_format: str = 'xlsx', progress: Optional[Callable[[int], Awaitable[None]]] = None) -> str:
         """
         导出系统配置列表
         
         参数:
-        - data_list (List[Dict[str, Any]]): 系统配置模型实例字典列表表示
+        - auth (AuthSchema): 认证信息模型
+        - search (Optional[ParamsQueryParam]): 查询参数
+        - order_by (Optional[List[Dict[str, str]]]): 排序参数
+        - file_format (str): 导出格式, xlsx 或 csv
+        - progress (Callable[[int], Awaitable[None]] | None): 后台任务的进度回调
         
         返回:
-        - bytes: Excel文件二进制数据
+        - str: 导出文件路径
         """
         mapping_dict = {
             'id': '编号',
@@ -235,15 +242,22 @@ class ParamsService:
             'creator': '创建者',
         }
 
-        # 复制数据并转换状态
-        data = data_list.copy()
-        for item in data:
+        def format_row(obj: Any) -> Dict[str, Any]:
+            item = ParamsOutSchema.model_validate(obj).model_dump()
             # 处理状态
             item['config_type'] = '是' if item.get('config_type') else '否'
             item['creator'] = item.get('creator', {}).get('name', '未知') if isinstance(item.get('creator'), dict) else '未知'
+            return item
+
+        # 按排序键分块读取并逐行写入导出文件, 内存占用与导出行数无关
+        return await ExcelUtil.export_rows2file(
+            rows=ParamsCRUD(auth).scan(search=search.__dict__ if search else None, order_by=order_by),
+            mapping_dict=mapping_dict,
+            formatter=format_row,
+            file_format=file_format,
+            progress=progress
+        )
 
-        return ExcelUtil.export_list2excel(list_data=data, mapping_dict=mapping_dict)
-    
     @classmethod
     async def upload_service(cls, base_url: str, file: UploadFile) -> Dict:
         """
@@ -288,6 +302,8 @@ class ParamsService:
                         redis_key = (f"{RedisInitKeyConfig.SYSTEM_CONFIG.key}:{config.config_key}")
                         config_obj_dict = ParamsOutSchema.model_validate(config).model_dump()
                         value = json.dumps(config_obj_dict, ensure_ascii=False)
+                        # 仅在内容变化时递增版本号, 避免每次重启都使客户端缓存失效
+                        changed = await RedisCURD(redis).get(redis_key) != value
                         result = await RedisCURD(redis).set(
                             key=redis_key,
                             value=value,
@@ -295,6 +311,8 @@ class ParamsService:
                         if not result:
                             logger.error(f"❌️ 初始化系统配置失败: {config_obj_dict}")
                             raise CustomException(msg="初始化系统配置失败")
+                        if changed:
+                            await RedisCURD(redis).bump_version(RedisInitKeyConfig.CONFIG_VERSION.key, config.config_key)
                 except Exception as e:
                     logger.error(f"❌️ 初始化系统配置失败: {e}")
                     raise CustomException(msg="初始化系统配置失败")
@@ -324,6 +342,54 @@ class ParamsService:
                 continue
         
         return configs
+
+    @classmethod
+    async def get_init_config_version_service(cls, redis: Redis) -> str:
+        """
+        获取系统配置集合的缓存版本标识
+        
+        参数:
+        - redis (Redis): Redis 客户端实例
+        
+        返回:
+        - str: 版本标识(纪元-版本号), 未记录时为空字符串
+        """
+        return await RedisCURD(redis).get_version(RedisInitKeyConfig.CONFIG_VERSION.key)
+
+    @classmethod
+    async def get_config_sync_service(cls, redis: Redis, since: int, epoch: str = '') -> Dict[str, Any]:
+        """
+        增量同步: 获取指定版本号之后变更的系统配置
+        
+        客户端的纪元与当前纪元不一致(如 Redis 数据被清空)时返回全部系统配置, 并标记 reset, 客户端应丢弃本地缓存。
+        
+        参数:
+        - redis (Redis): Redis 客户端实例
+        - since (int): 客户端已同步的版本号
+        - epoch (str): 客户端版本号所属的纪元
+        
+        返回:
+        - Dict[str, Any]: 包含当前纪元、版本号、是否全量同步、变更的系统配置和已删除的配置键
+        """
+        current_epoch, version, changed_versions = await RedisCURD(redis).get_versions_since(RedisInitKeyConfig.CONFIG_VERSION.key, since, epoch)
+
+        changed: List[Dict] = []
+        deleted: List[str] = []
+        if changed_versions:
+            config_keys = list(changed_versions.keys())
+            values = await RedisCURD(redis).mget([f"{RedisInitKeyConfig.SYSTEM_CONFIG.key}:{config_key}" for config_key in config_keys])
+            for config_key, value in zip(config_keys, values):
+                if value is None:
+                    deleted.append(config_key)
+                    continue
+                if not value:
+                    continue
+                try:
+                    changed.append(json.loads(value))
+                except Exception as e:
+                    logger.error(f"解析系统配置数据失败: {e}")
+
+        return {"epoch": current_epoch, "version": version, "reset": epoch != current_epoch, "changed": changed, "deleted": deleted}
     
     @classmethod
     async def get_system_config_for_middleware(cls, redis: Redis) -> Dict[str, Any]:
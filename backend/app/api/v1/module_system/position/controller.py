@@ -1,17 +1,19 @@
 # -*- coding: utf-8 -*-
 
 from fastapi import APIRouter, Body, Depends, Path, Query
-from fastapi.responses import JSONResponse, StreamingResponse
+from fastapi.responses import JSONResponse, Response
+from redis.asyncio.client import Redis
 
 from app.common.response import StreamResponse, SuccessResponse
 from app.common.request import PaginationService
-from app.utils.common_util import bytes2file_response
-from app.core.base_params import PaginationQueryParam
+from app.utils.common_util import file2stream_response
+from app.core.base_params import ExportQueryParam, PaginationQueryParam
 from app.core.router_class import OperationLogRoute
-from app.core.dependencies import AuthPermission
+from app.core.dependencies import AuthPermission, redis_getter
 from app.core.base_schema import BatchSetAvailable
 from app.core.logger import logger
 from ..auth.schema import AuthSchema
+from app.api.v1.module_common.task.service import TaskService
 from .service import PositionService
 from .param import PositionQueryParam
 from .schema import (
@@ -154,26 +156,39 @@ async def batch_set_available_obj_controller(
 @PositionRouter.post('/export', summary="导出岗位", description="导出岗位")
 async def export_obj_list_controller(
     search: PositionQueryParam = Depends(),
+    export: ExportQueryParam = Depends(),
+    redis: Redis = Depends(redis_getter),
     auth: AuthSchema = Depends(AuthPermission(["system:position:export"])),
-) -> StreamingResponse:
+) -> Response:
     """
     导出岗位
     
     参数:
     - search (PositionQueryParam): 查询参数
+    - export (ExportQueryParam): 导出参数
+    - redis (Redis): Redis 客户端
     - auth (AuthSchema): 认证信息模型
     
     返回:
-    - StreamingResponse: 岗位Excel文件流
+    - Response: 岗位Excel文件流, 后台导出时为任务信息的JSON响应
     """
-    position_query_result = await PositionService.get_position_list_service(search=search, auth=auth)
-    position_export_result = await PositionService.export_position_list_service(position_list=position_query_result)
+    if export.background:
+        task = await TaskService.submit_export_service(
+            redis=redis,
+            auth=auth,
+            name="导出岗位",
+            file_name=export.filename("position"),
+            export_func=lambda task_auth, progress: PositionService.export_position_list_service(auth=task_auth, search=search, file_format=export.file_format, progress=progress)
+        )
+        return SuccessResponse(data=task, msg="导出任务已提交")
+
+    position_export_result = await PositionService.export_position_list_service(auth=auth, search=search, file_format=export.file_format)
     logger.info('导出岗位成功')
 
     return StreamResponse(
-        data=bytes2file_response(position_export_result),
-        media_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+        data=file2stream_response(position_export_result),
+        media_type=export.media_type,
         headers = {
-            'Content-Disposition': 'attachment; filename=position.xlsx'
+            'Content-Disposition': f'attachment; filename={export.filename("position")}'
         }
     )
@@ -1,9 +1,10 @@
 # -*- coding: utf-8 -*-
 
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Awaitable, Callable
 
 from app.core.base_schema import BatchSetAvailable
 from app.core.exceptions import CustomException
+from app.core.serialize import Serialize
 from app.utils.excel_util import ExcelUtil
 from ..auth.schema import AuthSchema
 from .param import PositionQueryParam
@@ -47,7 +48,7 @@ class PositionService:
         - List[Dict]: 岗位列表对象
         """
         position_list = await PositionCRUD(auth).get_list_crud(search=search.__dict__, order_by=order_by)
-        return [PositionOutSchema.model_validate(position).model_dump() for position in position_list]
+        return Serialize.dump_list(PositionOutSchema, position_list)
 
     @classmethod
     async def create_position_service(cls, auth: AuthSchema, data: PositionCreateSchema) -> Dict:
@@ -124,15 +125,19 @@ class PositionService:
         await PositionCRUD(auth).set_available_crud(ids=data.ids, status=data.status)
 
     @classmethod
-    async def export_position_list_service(cls, position_list: List[Dict[str, Any]]) -> bytes:
+    async def export_position_list_service(cls, auth: AuthSchema, search: Optional[PositionQueryParam] = None, order_by: Optional[List[Dict[str, str]]] = None, file_format: str = 'xlsx', progress: Optional[Callable[[int], Awaitable[None]]] = None) -> str:
         """
         导出岗位列表
         
         参数:
-        - position_list (List[Dict[str, Any]]): 岗位列表对象
+        - auth (AuthSchema): 认证信息模型
+        - search (Optional[PositionQueryParam]): 查询参数
+        - order_by (Optional[List[Dict[str, str]]]): 排序参数
+        - file_format (str): 导出格式, xlsx 或 csv
+        - progress (Callable[[int], Awaitable[None]] | None): 后台任务的进度回调
         
         返回:
-        - bytes: 导出的Excel文件字节流
+        - str: 导出文件路径
         """
         mapping_dict = {
             'id': '编号',
@@ -146,10 +151,17 @@ class PositionService:
             'creator': '创建者',
         }
 
-        # 复制数据并转换状态
-        data = position_list.copy()
-        for item in data:
+        def format_row(obj: Any) -> Dict[str, Any]:
+            item = PositionOutSchema.model_validate(obj).model_dump()
             item['status'] = '正常' if item.get('status') else '停用'
             item['creator'] = item.get('creator', {}).get('name', '未知') if isinstance(item.get('creator'), dict) else '未知'
+            return item
 
-        return ExcelUtil.export_list2excel(list_data=data, mapping_dict=mapping_dict)
\ No newline at end of file
+        # 按排序键分块读取并逐行写入导出文件, 内存占用与导出行数无关
+        return await ExcelUtil.export_rows2file(
+            rows=PositionCRUD(auth).scan(search=search.__dict__ if search else None, order_by=order_by),
+            mapping_dict=mapping_dict,
+            formatter=format_row,
+            file_format=file_format,
+            progress=progress
+        )
@@ -1,17 +1,19 @@
 # -*- coding: utf-8 -*-
 
 from fastapi import APIRouter, Body, Depends, Path, Query
-from fastapi.responses import JSONResponse, StreamingResponse
+from fastapi.responses import JSONResponse, Response
+from redis.asyncio.client import Redis
 
 from app.common.response import StreamResponse, SuccessResponse
 from app.common.request import PaginationService
-from app.utils.common_util import bytes2file_response
+from app.utils.common_util import file2stream_response
 from app.core.router_class import OperationLogRoute
-from app.core.base_params import PaginationQueryParam
-from app.core.dependencies import AuthPermission
+from app.core.base_params import ExportQueryParam, PaginationQueryParam
+from app.core.dependencies import AuthPermission, redis_getter
 from app.core.base_schema import BatchSetAvailable
 from app.core.logger import logger
 from ..auth.schema import AuthSchema
+from app.api.v1.module_common.task.service import TaskService
 from .service import RoleService
 from .param import RoleQueryParam
 from .schema import (
@@ -155,6 +157,7 @@ async def batch_set_available_obj_controller(
 @RoleRouter.patch("/permission/setting", summary="角色授权", description="角色授权")
 async def set_role_permission_controller(
     data: RolePermissionSettingSchema,
+    redis: Redis = Depends(redis_getter),
     auth: AuthSchema = Depends(AuthPermission(["system:role:permission"])),
 ) -> JSONResponse:
     """
@@ -162,12 +165,13 @@ async def set_role_permission_controller(
     
     参数:
     - data (RolePermissionSettingSchema): 角色授权模型
+    - redis (Redis): Redis客户端对象
     - auth (AuthSchema): 认证信息模型
     
     返回:
     - JSONResponse: 角色授权JSON响应
     """
-    await RoleService.set_role_permission_service(data=data, auth=auth)
+    await RoleService.set_role_permission_service(data=data, auth=auth, redis=redis)
     logger.info(f"设置角色权限成功: {data}")
     return SuccessResponse(msg="授权角色成功")
 
@@ -175,26 +179,39 @@ async def set_role_permission_controller(
 @RoleRouter.post('/export', summary="导出角色", description="导出角色")
 async def export_obj_list_controller(
     search: RoleQueryParam = Depends(),
+    export: ExportQueryParam = Depends(),
+    redis: Redis = Depends(redis_getter),
     auth: AuthSchema = Depends(AuthPermission(["system:role:export"])),
-) -> StreamingResponse:
+) -> Response:
     """
     导出角色
     
     参数:
     - search (RoleQueryParam): 查询参数模型
+    - export (ExportQueryParam): 导出参数
+    - redis (Redis): Redis 客户端
     - auth (AuthSchema): 认证信息模型
     
     返回:
-    - StreamingResponse: 导出角色流响应
-    """
-    role_query_result = await RoleService.get_role_list_service(search=search, auth=auth)
-    role_export_result = await RoleService.export_role_list_service(role_list=role_query_result)
+    - Response: 导出角色流响应, 后台导出时为任务信息的JSON响应
+    """
+    if export.background:
+        task = await TaskService.submit_export_service(
+            redis=redis,
+            auth=auth,
+            name="导出角色",
+            file_name=export.filename("role"),
+            export_func=lambda task_auth, progress: RoleService.export_role_list_service(auth=task_auth, search=search, file_format=export.file_format, progress=progress)
+        )
+        return SuccessResponse(data=task, msg="导出任务已提交")
+
+    role_export_result = await RoleService.export_role_list_service(auth=auth, search=search, file_format=export.file_format)
     logger.info('导出角色成功')
 
     return StreamResponse(
-        data=bytes2file_response(role_export_result),
-        media_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+        data=file2stream_response(role_export_result),
+        media_type=export.media_type,
         headers = {
-            'Content-Disposition': 'attachment; filename=role.xlsx'
+            'Content-Disposition': f'attachment; filename={export.filename("role")}'
         }
     )
@@ -3,7 +3,7 @@
 from typing import Dict, List, Sequence, Optional
 
 from app.core.base_crud import CRUDBase
-from .model import RoleModel
+from .model import RoleModel, RoleMenusModel, RoleDeptsModel
 from .schema import RoleCreateSchema, RoleUpdateSchema
 from ..auth.schema import AuthSchema
 from ..menu.crud import MenuCRUD
@@ -59,14 +59,7 @@ class RoleCRUD(CRUDBase[RoleModel, RoleCreateSchema, RoleUpdateSchema]):
         返回:
         - None
         """
-        roles = await self.list(search={"id": ("in", role_ids)})
-        menus = await MenuCRUD(self.auth).get_list_crud(search={"id": ("in", menu_ids)})
-
-        for obj in roles:
-            relationship = obj.menus
-            relationship.clear()
-            relationship.extend(menus)
-        await self.db.flush()
+        await self.set_relation(secondary=RoleMenusModel, ids=role_ids, target=MenuCRUD(self.auth), target_ids=menu_ids)
 
     async def set_role_data_scope_crud(self, role_ids: List[int], data_scope: int) -> None:
         """
@@ -92,14 +85,7 @@ class RoleCRUD(CRUDBase[RoleModel, RoleCreateSchema, RoleUpdateSchema]):
         返回:
         - None
         """
-        roles = await self.list(search={"id": ("in", role_ids)})
-        depts = await DeptCRUD(self.auth).get_list_crud(search={"id": ("in", dept_ids)})
-
-        for obj in roles:
-            relationship = obj.depts
-            relationship.clear()
-            relationship.extend(depts)
-        await self.db.flush()
+        await self.set_relation(secondary=RoleDeptsModel, ids=role_ids, target=DeptCRUD(self.auth), target_ids=dept_ids)
 
     async def set_available_crud(self, ids: List[int], status: bool) -> None:
         """
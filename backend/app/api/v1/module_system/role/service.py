@@ -1,11 +1,16 @@
 # -*- coding: utf-8 -*-
 
-from typing import Any, Dict, List, Optional
+from functools import partial
+from typing import Any, Dict, List, Optional, Awaitable, Callable
+from redis.asyncio.client import Redis
 
 from app.core.base_schema import BatchSetAvailable
+from app.core.database import add_after_commit
 from app.core.exceptions import CustomException
+from app.core.serialize import Serialize
 from app.utils.excel_util import ExcelUtil
 from ..auth.schema import AuthSchema
+from ..menu.service import MenuService
 from .crud import RoleCRUD
 from .param import RoleQueryParam
 from .schema import (
@@ -48,7 +53,7 @@ class RoleService:
         - List[Dict]: 角色详情字典列表
         """
         role_list = await RoleCRUD(auth).get_list_crud(search=search.__dict__, order_by=order_by)
-        return [RoleOutSchema.model_validate(role).model_dump() for role in role_list]
+        return Serialize.dump_list(RoleOutSchema, role_list)
 
     @classmethod
     async def create_role_service(cls, auth: AuthSchema, data: RoleCreateSchema) -> Dict:
@@ -111,12 +116,13 @@ class RoleService:
         await RoleCRUD(auth).delete(ids=ids)
 
     @classmethod
-    async def set_role_permission_service(cls, auth: AuthSchema, data: RolePermissionSettingSchema) -> None:
+    async def set_role_permission_service(cls, auth: AuthSchema, redis: Redis, data: RolePermissionSettingSchema) -> None:
         """
         设置角色权限
         
         参数:
         - auth (AuthSchema): 认证信息模型
+        - redis (Redis): Redis客户端对象
         - data (RolePermissionSettingSchema): 角色权限设置模型
         
         返回:
@@ -124,6 +130,7 @@ class RoleService:
         """
         # 设置角色菜单权限
         await RoleCRUD(auth).set_role_menus_crud(role_ids=data.role_ids, menu_ids=data.menu_ids)
+        add_after_commit(auth.db, partial(MenuService.clear_route_tree_cache_service, redis=redis))
         
         # 设置数据权限范围
         await RoleCRUD(auth).set_role_data_scope_crud(role_ids=data.role_ids, data_scope=data.data_scope)
@@ -149,17 +156,20 @@ class RoleService:
         await RoleCRUD(auth).set_available_crud(ids=data.ids, status=data.status)
 
     @classmethod
-    async def export_role_list_service(cls, role_list: List[Dict[str, Any]]) -> bytes:
+    async def export_role_list_service(cls, auth: AuthSchema, search: Optional[RoleQueryParam] = None, order_by: Optional[List[Dict[str, str]]] = None, file_format: str = 'xlsx', progress: Optional[Callable[[int], Awaitable[None]]] = None) -> str:
         """
         导出角色列表
         
         参数:
-        - role_list (List[Dict[str, Any]]): 角色详情字典列表
+        - auth (AuthSchema): 认证信息模型
+        - search (Optional[RoleQueryParam]): 查询参数
+        - order_by (Optional[List[Dict[str, str]]]): 排序参数
+        - file_format (str): 导出格式, xlsx 或 csv
+        - progress (Callable[[int], Awaitable[None]] | None): 后台任务的进度回调
         
         返回:
-        - bytes: Excel文件字节流
+        - str: 导出文件路径
         """
-        # 字段映射配置
         mapping_dict = {
             'id': '角色编号',
             'name': '角色名称',
@@ -182,12 +192,18 @@ class RoleService:
             5: '自定义数据权限'
         }
 
-        # 处理数据
-        data = role_list.copy()
-        for item in data:
+        def format_row(obj: Any) -> Dict[str, Any]:
+            item = RoleOutSchema.model_validate(obj).model_dump()
             item['status'] = '正常' if item.get('status') else '停用'
             item['data_scope'] = data_scope_map.get(item.get('data_scope', 1), '')
             item['creator'] = item.get('creator', {}).get('name', '未知') if isinstance(item.get('creator'), dict) else '未知'
+            return item
 
-        return ExcelUtil.export_list2excel(list_data=data, mapping_dict=mapping_dict)
-        
\ No newline at end of file
+        # 按排序键分块读取并逐行写入导出文件, 内存占用与导出行数无关
+        return await ExcelUtil.export_rows2file(
+            rows=RoleCRUD(auth).scan(search=search.__dict__ if search else None, order_by=order_by),
+            mapping_dict=mapping_dict,
+            formatter=format_row,
+            file_format=file_format,
+            progress=progress
+        )
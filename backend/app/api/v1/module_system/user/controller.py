@@ -1,19 +1,21 @@
 # -*- coding: utf-8 -*-
 
 from fastapi import APIRouter, Depends, Body, Path, Query, Form, File, UploadFile, Request
-from fastapi.responses import JSONResponse, StreamingResponse
+from fastapi.responses import JSONResponse, StreamingResponse, Response
+from redis.asyncio.client import Redis
 from sqlalchemy.ext.asyncio import AsyncSession
 import urllib.parse
 
 from app.common.response import StreamResponse, SuccessResponse
 from app.common.request import PaginationService
-from app.utils.common_util import bytes2file_response
+from app.utils.common_util import bytes2file_response, file2stream_response
 from app.core.router_class import OperationLogRoute
-from app.core.dependencies import db_getter, get_current_user, AuthPermission
-from app.core.base_params import PaginationQueryParam
+from app.core.dependencies import db_getter, redis_getter, get_current_user, AuthPermission
+from app.core.base_params import ExportQueryParam, PaginationQueryParam
 from app.core.base_schema import BatchSetAvailable
 from app.core.logger import logger
 from ..auth.schema import AuthSchema
+from app.api.v1.module_common.task.service import TaskService
 from .service import UserService
 from .param import UserQueryParam
 from .schema import (
@@ -32,18 +34,20 @@ UserRouter = APIRouter(route_class=OperationLogRoute, prefix="/user", tags=["用
 
 @UserRouter.get("/current/info", summary="查询当前用户信息", description="查询当前用户信息")
 async def get_current_user_info_controller(
+    redis: Redis = Depends(redis_getter),
     auth: AuthSchema = Depends(get_current_user)
 ) -> JSONResponse:
     """
     查询当前用户信息
     
     参数:
+    - redis (Redis): Redis客户端对象
     - auth (AuthSchema): 认证信息模型
     
     返回:
     - JSONResponse: 当前用户信息JSON响应
     """
-    result_dict = await UserService.get_current_user_info_service(auth=auth)
+    result_dict = await UserService.get_current_user_info_service(auth=auth, redis=redis)
     logger.info(f"获取当前用户信息成功")
     return SuccessResponse(data=result_dict, msg='获取当前用户信息成功')
 
@@ -322,28 +326,41 @@ async def export_obj_template_controller()-> StreamingResponse:
 async def export_obj_list_controller(
     page: PaginationQueryParam = Depends(),
     search: UserQueryParam = Depends(),
+    export: ExportQueryParam = Depends(),
+    redis: Redis = Depends(redis_getter),
     auth: AuthSchema = Depends(AuthPermission(["system:user:export"])),
-) -> StreamingResponse:
+) -> Response:
     """
     导出用户
     
     参数:
     - page (PaginationQueryParam): 分页查询参数模型
     - search (UserQueryParam): 查询参数模型
+    - export (ExportQueryParam): 导出参数
+    - redis (Redis): Redis 客户端
     - auth (AuthSchema): 认证信息模型
     
     返回:
-    - StreamingResponse: 用户导出模板流响应
-    """
-    user_list = await UserService.get_user_list_service(auth=auth, search=search, order_by=page.order_by)
-    user_export_result = await UserService.export_user_list_service(user_list)
+    - Response: 用户导出模板流响应, 后台导出时为任务信息的JSON响应
+    """
+    if export.background:
+        task = await TaskService.submit_export_service(
+            redis=redis,
+            auth=auth,
+            name="导出用户",
+            file_name=export.filename("user"),
+            export_func=lambda task_auth, progress: UserService.export_user_list_service(auth=task_auth, search=search, order_by=page.order_by, file_format=export.file_format, progress=progress)
+        )
+        return SuccessResponse(data=task, msg="导出任务已提交")
+
+    user_export_result = await UserService.export_user_list_service(auth=auth, search=search, order_by=page.order_by, file_format=export.file_format)
     logger.info('导出用户成功')
 
     return StreamResponse(
-        data=bytes2file_response(user_export_result),
-        media_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+        data=file2stream_response(user_export_result),
+        media_type=export.media_type,
         headers = {
-            'Content-Disposition': 'attachment; filename=user.xlsx'
+            'Content-Disposition': f'attachment; filename={export.filename("user")}'
         }
     )
 
@@ -351,6 +368,8 @@ async def export_obj_list_controller(
 @UserRouter.post('/import/data', summary="导入用户", description="导入用户")
 async def import_obj_list_controller(
     file: UploadFile,
+    background: bool = Query(default=False, description="是否作为后台任务导入, 为真时返回任务信息"),
+    redis: Redis = Depends(redis_getter),
     auth: AuthSchema = Depends(AuthPermission(["system:user:import"]))
 ) -> JSONResponse:
     """
@@ -358,11 +377,23 @@ async def import_obj_list_controller(
     
     参数:
     - file (UploadFile): 用户导入文件
+    - background (bool): 是否作为后台任务导入
+    - redis (Redis): Redis 客户端
     - auth (AuthSchema): 认证信息模型
     
     返回:
-    - JSONResponse: 导入用户JSON响应
-    """
+    - JSONResponse: 导入用户JSON响应, 后台导入时为任务信息
+    """
+    if background:
+        task = await TaskService.submit_import_service(
+            redis=redis,
+            auth=auth,
+            name="导入用户",
+            file=file,
+            import_func=lambda task_auth, upload, progress: UserService.batch_import_user_service(file=upload, auth=task_auth, update_support=True, progress=progress)
+        )
+        return SuccessResponse(data=task, msg="导入任务已提交")
+
     batch_import_result = await UserService.batch_import_user_service(file=file, auth=auth, update_support=True)
     logger.info(f"导入用户成功: {batch_import_result}")
     return SuccessResponse(data=batch_import_result, msg="导入用户成功")
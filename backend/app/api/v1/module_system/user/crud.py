@@ -5,7 +5,7 @@ from datetime import datetime
 
 
 from app.core.base_crud import CRUDBase
-from .model import UserModel
+from .model import UserModel, UserRolesModel, UserPositionsModel
 from .schema import UserCreateSchema, UserForgetPasswordSchema, UserUpdateSchema
 from ..role.crud import RoleCRUD
 from ..position.crud import PositionCRUD
@@ -111,18 +111,7 @@ class UserCRUD(CRUDBase[UserModel, UserCreateSchema, UserUpdateSchema]):
         返回:
         - None:
         """
-        user_objs = await self.list(search={"id": ("in", user_ids)})
-        if role_ids:
-            role_objs = await RoleCRUD(self.auth).get_list_crud(search={"id": ("in", role_ids)})
-        else:
-            role_objs = []
-        
-        for obj in user_objs:
-            relationship = obj.roles
-            relationship.clear()
-            relationship.extend(role_objs)
-        await self.db.flush()
-
+        await self.set_relation(secondary=UserRolesModel, ids=user_ids, target=RoleCRUD(self.auth), target_ids=role_ids)
 
     async def set_user_positions_crud(self, user_ids: List[int], position_ids: List[int]) -> None:
         """
@@ -135,17 +124,7 @@ class UserCRUD(CRUDBase[UserModel, UserCreateSchema, UserUpdateSchema]):
         返回:
         - None:
         """
-        user_objs = await self.list(search={"id": ("in", user_ids)})
-        if position_ids:
-            position_objs = await PositionCRUD(self.auth).get_list_crud(search={"id": ("in", position_ids)})
-        else:
-            position_objs = []
-
-        for obj in user_objs:
-            relationship = obj.positions
-            relationship.clear()
-            relationship.extend(position_objs)
-        await self.db.flush()
+        await self.set_relation(secondary=UserPositionsModel, ids=user_ids, target=PositionCRUD(self.auth), target_ids=position_ids)
 
     async def change_password_crud(self, id: int, password_hash: str) -> Optional[UserModel]:
         """
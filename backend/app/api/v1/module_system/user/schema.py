@@ -1,7 +1,7 @@
 # -*- coding: utf-8 -*-
 
 from typing import Optional, List
-from pydantic import BaseModel, ConfigDict, Field, EmailStr, field_validator
+from pydantic import BaseModel, ConfigDict, Field, EmailStr, field_validator, model_validator
 
 from app.core.validator import DateTimeStr, mobile_validator
 from app.core.base_schema import BaseSchema, CommonSchema
@@ -91,3 +91,10 @@ class UserOutSchema(UserUpdateSchema, BaseSchema):
     dept: Optional[CommonSchema] = Field(default=None, description='部门')
     roles: Optional[List[RoleOutSchema]] = Field(default=[], description='角色')
     positions: Optional[List[CommonSchema]] = Field(default=[], description='岗位')
+
+    @model_validator(mode='after')
+    def fill_dept_name(self):
+        # 部门名称取自已随用户预加载的部门关系, 无需再逐个查询部门
+        if self.dept_name is None and self.dept:
+            self.dept_name = self.dept.name
+        return self
@@ -1,23 +1,22 @@
 # -*- coding: utf-8 -*-
 
-import io
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Awaitable, Callable
 from fastapi import UploadFile
-import pandas as pd
+from redis.asyncio.client import Redis
 
 from app.core.exceptions import CustomException
+from app.core.validator import EMAIL_REGEX, MOBILE_REGEX
 from app.utils.hash_bcrpy_util import PwdUtil
 from app.core.base_schema import BatchSetAvailable, UploadResponseSchema
 from app.core.logger import logger
-from app.utils.common_util import traversal_to_tree
-from app.utils.excel_util import ExcelUtil
+from app.core.serialize import Serialize
+from app.utils.excel_util import ExcelUtil, ImportResult
 from app.utils.upload_util import UploadUtil
 from ..position.crud import PositionCRUD
 from ..role.crud import RoleCRUD
-from ..menu.crud import MenuCRUD
+from ..menu.service import MenuService
 from ..dept.crud import DeptCRUD
 from ..auth.schema import AuthSchema
-from ..menu.schema import MenuOutSchema
 from .param import UserQueryParam
 from .crud import UserCRUD
 from .schema import (
@@ -50,15 +49,7 @@ class UserService:
         user = await UserCRUD(auth).get_by_id_crud(id=id)
         if not user:
             raise CustomException(msg="用户不存在")
-        
-        # 如果用户绑定了部门,则获取部门名称
-        if user.dept_id:
-            dept = await DeptCRUD(auth).get_by_id_crud(id=user.dept_id)
-            UserOutSchema.dept_name = dept.name if dept else None
-        else:
-            UserOutSchema.dept_name = None
-            
-            
+
         return UserOutSchema.model_validate(user).model_dump()
 
     @classmethod
@@ -75,17 +66,8 @@ class UserService:
         - List[Dict]: 用户详情字典列表
         """
         user_list = await UserCRUD(auth).get_list_crud(search=search.__dict__, order_by=order_by)
-        user_dict_list = []
-        for user in user_list:
-            if user.dept_id:
-                dept = await DeptCRUD(auth).get_by_id_crud(id=user.dept_id)
-                UserOutSchema.dept_name = dept.name if dept else None
-            else:
-                UserOutSchema.dept_name = None
-            user_dict = UserOutSchema.model_validate(user).model_dump()
-            user_dict_list.append(user_dict)
-
-        return user_dict_list
+        # 部门名称由随查询批量预加载的部门关系填充, 查询次数与用户数无关
+        return Serialize.dump_list(UserOutSchema, user_list)
 
     @classmethod
     async def create_user_service(cls, data: UserCreateSchema, auth: AuthSchema) -> Dict:
@@ -225,47 +207,24 @@ class UserService:
         await UserCRUD(auth).delete(ids=ids)
 
     @classmethod
-    async def get_current_user_info_service(cls, auth: AuthSchema) -> Dict:
+    async def get_current_user_info_service(cls, auth: AuthSchema, redis: Redis) -> Dict:
         """
         获取当前用户信息
         
         参数:
         - auth (AuthSchema): 认证信息模型
+        - redis (Redis): Redis客户端对象
         
         返回:
         - Dict: 当前用户详情字典
         """
-        # 获取用户基本信息
+        # 用户信息已由认证依赖加载, 无需重复查询
         if not auth.user or not auth.user.id:
             raise CustomException(msg="用户不存在")
-        user = await UserCRUD(auth).get_by_id_crud(id=auth.user.id)
-        # 获取部门名称
-        if user and user.dept_id:
-            dept = await DeptCRUD(auth).get_by_id_crud(id=user.dept_id)
-            UserOutSchema.dept_name = dept.name if dept else None
-        user_dict = UserOutSchema.model_validate(user).model_dump()
-
-        # 获取菜单权限
-        if auth.user and auth.user.is_superuser:
-            # 使用树形结构查询，预加载children关系
-            menu_all = await MenuCRUD(auth).get_tree_list_crud(search={'type': ('in', [1, 2, 4]), 'status': True})
-            menus = [MenuOutSchema.model_validate(menu).model_dump() for menu in menu_all]
-            
-        else:
-            # 收集用户所有角色的菜单ID，使用列表推导式优化代码
-            menu_ids = {
-                menu.id 
-                for role in auth.user.roles or [] 
-                for menu in role.menus 
-                if menu.status and menu.type in [1, 2, 4]
-            }
-            
-            # 使用树形结构查询，预加载children关系
-            menus = [
-                MenuOutSchema.model_validate(menu).model_dump() 
-                for menu in await MenuCRUD(auth).get_tree_list_crud(search={'id': ('in', list(menu_ids))})
-            ] if menu_ids else []
-        user_dict["menus"] = traversal_to_tree(menus)
+        user_dict = auth.user.model_dump()
+
+        # 获取菜单权限(按角色集合缓存)
+        user_dict["menus"] = await MenuService.get_route_tree_service(auth=auth, redis=redis)
         return user_dict
 
     @classmethod
@@ -381,8 +340,8 @@ class UserService:
         if not user:
             raise CustomException(msg="用户不存在")
 
-        # 更新密码
-        new_password_hash = PwdUtil.set_password_hash(password=data.password)
+        # 更新密码(在线程池中计算哈希, 不阻塞事件循环)
+        new_password_hash = await PwdUtil.set_password_hash_async(password=data.password)
         new_user = await UserCRUD(auth).change_password_crud(id=data.id, password_hash=new_password_hash)
         return UserOutSchema.model_validate(new_user).model_dump()
 
@@ -403,7 +362,7 @@ class UserService:
         if username_ok:
             raise CustomException(msg='账号已存在')
 
-        data.password = PwdUtil.set_password_hash(password=data.password)
+        data.password = await PwdUtil.set_password_hash_async(password=data.password)
         data.name = data.username
         data.creator_id = 1
         # dict_data = data.model_dump(exclude_unset=True)
@@ -437,19 +396,22 @@ class UserService:
         return UserOutSchema.model_validate(new_user).model_dump()
 
     @classmethod
-    async def batch_import_user_service(cls, auth: AuthSchema, file: UploadFile, update_support: bool = False) -> str:
+    async def batch_import_user_service(cls, auth: AuthSchema, file: UploadFile, update_support: bool = False, progress: Optional[Callable[[int], Awaitable[None]]] = None) -> Dict:
         """
         批量导入用户
+
+        以只读模式分块读取Excel, 每块向量化校验, 用一次IN查询匹配已存在的用户名,
+        在线程池中计算密码哈希后批量写入, 内存占用与导入行数无关。
         
         参数:
         - auth (AuthSchema): 认证信息模型
         - file (UploadFile): 上传的Excel文件
         - update_support (bool, optional): 是否支持更新已存在用户. 默认值为False.
+        - progress (Callable[[int], Awaitable[None]] | None): 后台任务的进度回调, 以已处理行数调用
         
         返回:
-        - str: 导入结果消息
+        - Dict: 导入结果, 包含成功数、失败数及逐行错误明细
         """
-        
         header_dict = {
             '部门编号': 'dept_id',
             '用户名': 'username',
@@ -459,81 +421,104 @@ class UserService:
             '性别': 'gender',
             '状态': 'status'
         }
-
+        # 与字典 sys_user_sex 保持一致
+        gender_options = {'男': '0', '女': '1', '未知': '2'}
+        status_options = {'正常': True, '启用': True, '停用': False}
+
+        result = ImportResult()
+        # 唯一字段在文件内的已出现值, 跨块去重
+        unique_fields = {'username': '用户名', 'mobile': '手机号', 'email': '邮箱'}
+        seen_values: Dict[str, set] = {field: set() for field in unique_fields}
         try:
-            # 读取Excel文件
-            contents = await file.read()
-            df = pd.read_excel(io.BytesIO(contents))
-            await file.close()
-            
-            if df.empty:
-                raise CustomException(msg="导入文件为空")
-            
-            # 检查表头是否完整
-            missing_headers = [header for header in header_dict.keys() if header not in df.columns]
-            if missing_headers:
-                raise CustomException(msg=f"导入文件缺少必要的列: {', '.join(missing_headers)}")
-            
-            # 重命名列名
-            df.rename(columns=header_dict, inplace=True)
-            
-            # 验证必填字段
-            required_fields = ['username', 'name', 'dept_id']
-            for field in required_fields:
-                missing_rows = df[df[field].isnull()].index.tolist()
-                raise CustomException(msg=f"{[k for k,v in header_dict.items() if v == field][0]}不能为空，第{[i+1 for i in missing_rows]}行")
-            
-            error_msgs = []
-            success_count = 0
-            count = 0
-            
-            # 处理每一行数据
-            for index, row in df.iterrows():
-                try:
-                    count = count + 1
-                    # 数据转换
-                    gender = 1 if row['gender'] == '男' else (2 if row['gender'] == '女' else 1)
-                    status = True if row['status'] == '正常' else False
-                    
-                    # 构建用户数据
-                    user_data = {
-                        "username": str(row['username']).strip(),
-                        "name": str(row['name']).strip(),
-                        "email": str(row['email']).strip(),
-                        "mobile": str(row['mobile']).strip(),
-                        "gender": gender,
-                        "status": status,
-                        "dept_id": int(row['dept_id']),
-                        "password": PwdUtil.set_password_hash(password="123456")  # 设置默认密码
+            rows_read = 0
+            async for chunk in ExcelUtil.aiter_excel_chunks(file=file.file, header_dict=header_dict):
+                # 块索引为Excel行号, 数据从第2行开始
+                rows_before, rows_read = int(chunk.index[0]) - 2, int(chunk.index[-1]) - 1
+                if progress:
+                    await progress(rows_before)
+                df, errors = ExcelUtil.check_import_chunk(
+                    df=chunk,
+                    header_dict=header_dict,
+                    required_fields=['username', 'name', 'dept_id'],
+                    option_dict={'gender': gender_options, 'status': status_options},
+                    pattern_dict={
+                        'dept_id': r'\d+',
+                        'username': r'.{1,32}',
+                        'name': r'.{1,32}',
+                        'email': EMAIL_REGEX,
+                        'mobile': MOBILE_REGEX
                     }
+                )
+                result.add_errors(errors)
+
+                # 唯一字段在文件内重复时只导入第一条
+                for field, values in seen_values.items():
+                    column = df[field]
+                    duplicated = column.notna() & (column.duplicated() | column.isin(values))
+                    result.add_errors([{'row': int(row), 'msg': f"{unique_fields[field]} {value} 在文件中重复"} for row, value in column[duplicated].items()])
+                    values.update(column.dropna())
+                    df = df[~duplicated]
+                if df.empty:
+                    continue
 
-                    # 处理用户导入
-                    exists_user = await UserCRUD(auth).get_by_username_crud(username=user_data["username"])
-                    if exists_user:
-                        if update_support:
-                            user_update_data = UserUpdateSchema(**user_data)
-                            await UserCRUD(auth).update(id=exists_user.id, data=user_update_data)
-                            success_count += 1
-                        else:
-                            error_msgs.append(f"第{count}行: 用户 {user_data['username']} 已存在")
-                    else:
-                        user_create_data = UserCreateSchema(**user_data)
-                        await UserCRUD(auth).create(data=user_create_data)
-                        success_count += 1
-                        
-                except Exception as e:
-                    error_msgs.append(f"第{count}行: 异常{str(e)}")
+                # 一次IN查询校验部门是否存在
+                df = df.assign(dept_id=df['dept_id'].astype(int))
+                dept_map = await DeptCRUD(auth).get_id_map(field='id', values=df['dept_id'].unique().tolist())
+                missing_dept = ~df['dept_id'].isin(dept_map.keys())
+                result.add_errors([{'row': int(row), 'msg': f"部门编号 {dept_id} 不存在"} for row, dept_id in df.loc[missing_dept, 'dept_id'].items()])
+                df = df[~missing_dept]
+
+                # 一次IN查询匹配已存在的用户
+                user_map = await UserCRUD(auth).get_id_map(field='username', values=df['username'].tolist())
+                exists = df['username'].isin(user_map.keys())
+                if not update_support:
+                    result.add_errors([{'row': int(row), 'msg': f"用户 {username} 已存在"} for row, username in df.loc[exists, 'username'].items()])
+                    df, exists = df[~exists], exists[~exists]
+                # 已存在的用户按数据权限过滤, 无权限的行不更新
+                existing_ids = df['username'].map(user_map)
+                visible_ids = await UserCRUD(auth).visible_ids(ids=existing_ids[exists].astype(int).tolist())
+                forbidden = exists & ~existing_ids.isin(visible_ids)
+                result.add_errors([{'row': int(row), 'msg': f"无权限更新用户 {username}"} for row, username in df.loc[forbidden, 'username'].items()])
+                df, exists = df[~forbidden], exists[~forbidden]
+
+                # 手机号、邮箱不能与其他用户重复(每个字段一次IN查询)
+                user_ids = df['username'].map(user_map)
+                for field, label in (('mobile', '手机号'), ('email', '邮箱')):
+                    owner_map = await UserCRUD(auth).get_id_map(field=field, values=df[field].dropna().tolist())
+                    owners = df[field].map(owner_map)
+                    conflict = owners.notna() & (owners != user_ids)
+                    result.add_errors([{'row': int(row), 'msg': f"{label} {value} 已被其他用户使用"} for row, value in df.loc[conflict, field].items()])
+                    df, exists, user_ids = df[~conflict], exists[~conflict], user_ids[~conflict]
+
+                df = df.assign(gender=df['gender'].fillna('2'), status=df['status'].fillna(False).astype(bool))
+                df = df.astype(object).where(df.notna(), None)
+                create_rows = df[~exists].to_dict('records')
+                update_rows = [{**row, 'id': user_map[row['username']]} for row in df[exists].to_dict('records')]
+                if not create_rows and not update_rows:
                     continue
 
-            # 返回详细的导入结果
-            result = f"成功导入 {success_count} 条数据"
-            if error_msgs:
-                result += "\n错误信息:\n" + "\n".join(error_msgs)
-            return result
-            
+                # 整块默认密码在进程池中并行计算哈希(每个用户独立加盐), 不阻塞事件循环
+                password_hashes = await PwdUtil.set_password_hash_batch(
+                    passwords=["123456"] * len(create_rows),
+                    progress=(lambda done: progress(rows_before + done)) if progress else None
+                )
+                for row, password_hash in zip(create_rows, password_hashes):
+                    row['password'] = password_hash
+
+                # 唯一性已在上面预先校验, 写入失败时整体回滚
+                await UserCRUD(auth).bulk_create(data=create_rows)
+                await UserCRUD(auth).bulk_update(data=update_rows)
+                result.success_count += len(create_rows) + len(update_rows)
+
+            if progress:
+                await progress(rows_read)
+            return result.to_dict()
+
         except Exception as e:
             logger.error(f"批量导入用户失败: {str(e)}")
             raise CustomException(msg=f"导入失败: {str(e)}")
+        finally:
+            await file.close()
 
     @classmethod
     async def get_import_template_user_service(cls) -> bytes:
@@ -553,20 +538,20 @@ class UserService:
         )
 
     @classmethod
-    async def export_user_list_service(cls, user_list: List[Dict[str, Any]]) -> bytes:
+    async def export_user_list_service(cls, auth: AuthSchema, search: Optional[UserQueryParam] = None, order_by: Optional[List[Dict[str, str]]] = None, file_format: str = 'xlsx', progress: Optional[Callable[[int], Awaitable[None]]] = None) -> str:
         """
         导出用户列表为Excel文件
         
         参数:
-        - user_list (List[Dict[str, Any]]): 用户列表
+        - auth (AuthSchema): 认证信息模型
+        - search (Optional[UserQueryParam]): 查询参数
+        - order_by (Optional[List[Dict[str, str]]]): 排序参数
+        - file_format (str): 导出格式, xlsx 或 csv
+        - progress (Callable[[int], Awaitable[None]] | None): 后台任务的进度回调
         
         返回:
-        - bytes: Excel文件字节流
+        - str: 导出文件路径
         """
-        if not user_list:
-            raise CustomException(msg="没有数据可导出")
-            
-        # 定义字段映射
         mapping_dict = {
             'id': '用户编号',
             'avatar': '头像',
@@ -585,14 +570,20 @@ class UserService:
             'creator': '创建者',
         }
 
-        # 复制数据并转换
-        # creator = {'id': 1, 'name': '管理员', 'username': 'admin'}
-        data = user_list.copy()
-        for item in data:
+        def format_row(obj: Any) -> Dict[str, Any]:
+            item = UserOutSchema.model_validate(obj).model_dump()
             item['status'] = '启用' if item.get('status') else '停用'
             gender = item.get('gender')
-            item['gender'] = '男' if gender == '1' else ('女' if gender == '2' else '未知')
+            item['gender'] = '男' if gender == '0' else ('女' if gender == '1' else '未知')
             item['is_superuser'] = '是' if item.get('is_superuser') else '否'
             item['creator'] = item.get('creator', {}).get('name', '未知') if isinstance(item.get('creator'), dict) else '未知'
-
-        return ExcelUtil.export_list2excel(list_data=data, mapping_dict=mapping_dict)
+            return item
+
+        # 按排序键分块读取并逐行写入导出文件, 内存占用与导出行数无关
+        return await ExcelUtil.export_rows2file(
+            rows=UserCRUD(auth).scan(search=search.__dict__ if search else None, order_by=order_by),
+            mapping_dict=mapping_dict,
+            formatter=format_row,
+            file_format=file_format,
+            progress=progress
+        )
@@ -43,9 +43,17 @@ class RedisInitKeyConfig(Enum):
 
     ACCESS_TOKEN = {'key': 'access_token', 'remark': '登录令牌信息'}
     REFRESH_TOKEN = {'key': 'refresh_token', 'remark': '刷新令牌信息'}
+    ONLINE_SESSION = {'key': 'online_session', 'remark': '在线会话索引'}
     CAPTCHA_CODES = {'key': 'captcha_codes', 'remark': '图片验证码'}
     SYSTEM_CONFIG = {'key': 'system_config', 'remark': '系统配置'}
     SYSTEM_DICT = {'key':'system_dict','remark': '数据字典'}
+    DICT_VERSION = {'key': 'dict_version', 'remark': '数据字典版本'}
+    CONFIG_VERSION = {'key': 'config_version', 'remark': '系统配置版本'}
+    MENU_TREE = {'key': 'menu_tree', 'remark': '角色菜单树'}
+    MENU_TREE_VERSION = {'key': 'menu_tree_version', 'remark': '角色菜单树缓存版本'}
+    BACKGROUND_TASK = {'key': 'background_task', 'remark': '后台任务状态'}
+    DB_PRIMARY_PIN = {'key': 'db_primary_pin', 'remark': '写入后固定走主库标记'}
+    INIT_DB_LOCK = {'key': 'init_db_lock', 'remark': '数据库初始化锁'}
     
     @property
     def key(self) -> str:
@@ -2,9 +2,10 @@
 
 from typing import Any, Mapping, Optional
 from fastapi import status
-from fastapi.responses import JSONResponse, StreamingResponse, FileResponse
+from fastapi.responses import JSONResponse, StreamingResponse, FileResponse, Response
 from starlette.background import BackgroundTask
 from pydantic import Field, BaseModel
+from pydantic_core import PydanticSerializationError, to_json
 
 from app.common.constant import RET
 
@@ -16,7 +17,32 @@ class ResponseSchema(BaseModel):
     status_code: int = Field(default=status.HTTP_200_OK, description="HTTP状态码")
     success: bool = Field(default=True, description='操作是否成功')
 
-class SuccessResponse(JSONResponse):
+class FastJSONResponse(JSONResponse):
+    """
+    JSON响应类
+
+    使用 pydantic-core 一次性序列化整个响应体, 原生支持 datetime、Decimal、UUID、bytes 等类型,
+    NaN/Infinity 输出为 null, 其余无法识别的类型转为字符串。
+    """
+
+    def render(self, content: Any) -> bytes:
+        """
+        序列化响应内容
+        
+        参数:
+        - content (Any): 响应内容。
+        
+        返回:
+        - bytes: JSON 字节串。
+        """
+        try:
+            return to_json(content, inf_nan_mode='null', fallback=str)
+        except PydanticSerializationError:
+            # 非 UTF-8 的二进制内容(如上传文件的请求体)按 base64 输出
+            return to_json(content, inf_nan_mode='null', fallback=str, bytes_mode='base64')
+
+
+class SuccessResponse(FastJSONResponse):
     """成功响应类"""
 
     def __init__(
@@ -40,17 +66,18 @@ class SuccessResponse(JSONResponse):
         返回:
         - None
         """
-        content = ResponseSchema(
-            code=code,
-            msg=msg,
-            data=data,
-            status_code=status_code,
-            success=success
-        ).model_dump()
+        # 响应体字段与 ResponseSchema 一致, 直接构造字典, 由 render 一次性序列化
+        content = {
+            'code': code,
+            'msg': msg,
+            'data': data,
+            'status_code': status_code,
+            'success': success
+        }
         super().__init__(content=content, status_code=status_code)
 
 
-class ErrorResponse(JSONResponse):
+class ErrorResponse(FastJSONResponse):
     """错误响应类"""
 
     def __init__(
@@ -74,16 +101,36 @@ class ErrorResponse(JSONResponse):
         返回:
         - None
         """
-        content = ResponseSchema(
-            code=code,
-            msg=msg,
-            data=data,
-            status_code=status_code,
-            success=success
-        ).model_dump()
+        # 响应体字段与 ResponseSchema 一致, 直接构造字典, 由 render 一次性序列化
+        content = {
+            'code': code,
+            'msg': msg,
+            'data': data,
+            'status_code': status_code,
+            'success': success
+        }
         super().__init__(content=content, status_code=status_code)
 
 
+class NotModifiedResponse(Response):
+    """协商缓存命中响应类(304)"""
+
+    def __init__(self, etag: str) -> None:
+        """
+        初始化协商缓存命中响应类
+        
+        参数:
+        - etag (str): 当前资源的 ETag。
+        
+        返回:
+        - None
+        """
+        super().__init__(
+            status_code=status.HTTP_304_NOT_MODIFIED,
+            headers={"ETag": etag, "Cache-Control": "no-cache"}
+        )
+
+
 class StreamResponse(StreamingResponse):
     """流式响应类"""
 
@@ -9,9 +9,7 @@ from apscheduler.job import Job
 from apscheduler.events import JobExecutionEvent, EVENT_ALL, JobEvent
 from apscheduler.executors.asyncio import AsyncIOExecutor
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
-from apscheduler.executors.pool import ProcessPoolExecutor
 from apscheduler.jobstores.memory import MemoryJobStore
-from apscheduler.jobstores.redis import RedisJobStore
 from apscheduler.triggers.cron import CronTrigger
 from apscheduler.triggers.date import DateTrigger
 from apscheduler.triggers.interval import IntervalTrigger
@@ -23,26 +21,20 @@ from apscheduler.triggers.interval import IntervalTrigger
 # from pymongo import MongoClient
 
 from app.config.setting import settings
-from app.core.database import SessionLocal, AsyncSessionLocal
+from app.core.database import SessionLocal, AsyncSessionLocal, get_engine
 from app.core.exceptions import CustomException
 from app.core.logger import logger
 
 
+# redis 任务存储与进程池执行器在启动调度器时再创建(见 SchedulerUtil.init_system_scheduler), 导入本模块不建立连接
 job_stores = {
     'default': MemoryJobStore(),
+    'task': MemoryJobStore(),  # 导入导出等一次性后台任务, 不记录任务日志
     # 'sqlalchemy': SQLAlchemyJobStore(url=settings.DB_URI, engine=engine), 如果用同一个数据库会有lock冲突
-    'redis': RedisJobStore(**dict(
-        host=settings.REDIS_HOST,
-        port=settings.REDIS_PORT,
-        username=settings.REDIS_USER,
-        password=settings.REDIS_PASSWORD,
-        db=settings.REDIS_DB_NAME,
-    )),
 }
 # 配置执行器
 executors = {
     'default': AsyncIOExecutor(), 
-    'processpool': ProcessPoolExecutor(max_workers=1)  # 减少进程数量以减少资源消耗
 }
 # 配置默认参数
 job_defaults = {
@@ -85,7 +77,7 @@ class SchedulerUtil:
         if isinstance(event, JobExecutionEvent) and event.exception:
             exception_info = str(event.exception)
             status = False
-        if hasattr(event, 'job_id'):
+        if hasattr(event, 'job_id') and getattr(event, 'jobstore', None) != 'task':
             job_id = event.job_id
             query_job = cls.get_job(job_id=job_id)
             if query_job:
@@ -119,7 +111,7 @@ class SchedulerUtil:
                     exception_info=exception_info,
                     create_time=datetime.now(),
                 )
-                session = SessionLocal()
+                session = SessionLocal(bind=get_engine())
                 session.add(**job_log.model_dump())
                 session.commit()
                 session.close()
@@ -136,6 +128,17 @@ class SchedulerUtil:
         from app.api.v1.module_application.job.crud import JobCRUD
         from app.api.v1.module_system.auth.schema import AuthSchema
         
+        from apscheduler.executors.pool import ProcessPoolExecutor
+        from apscheduler.jobstores.redis import RedisJobStore
+
+        scheduler.add_jobstore(RedisJobStore(**dict(
+            host=settings.REDIS_HOST,
+            port=settings.REDIS_PORT,
+            username=settings.REDIS_USER,
+            password=settings.REDIS_PASSWORD,
+            db=settings.REDIS_DB_NAME,
+        )), alias='redis')
+        scheduler.add_executor(ProcessPoolExecutor(max_workers=1), alias='processpool')  # 减少进程数量以减少资源消耗
         scheduler.start()
         async with AsyncSessionLocal() as session:
             async with session.begin():
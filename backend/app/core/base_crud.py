@@ -1,17 +1,17 @@
 # -*- coding: utf-8 -*-
 
 from pydantic import BaseModel
-from typing import TypeVar, Sequence, Generic, Dict, Any, List, Optional, Type, Union
+from typing import AsyncGenerator, TypeVar, Sequence, Generic, Dict, Any, List, Optional, Tuple, Type, Union
 from sqlalchemy.sql.elements import ColumnElement
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import aliased, raiseload, selectinload
+from sqlalchemy.orm.util import identity_key
 from sqlalchemy.engine import Result
-from sqlalchemy import asc, func, select, delete, Select, desc, update, or_, and_
+from sqlalchemy import asc, func, literal, select, insert, delete, Select, desc, update, or_, and_, CTE
 
 from app.core.base_model import MappedBase
 from app.api.v1.module_system.auth.schema import AuthSchema
 from app.api.v1.module_system.dept.model import DeptModel
 from app.api.v1.module_system.user.model import UserModel
-from app.utils.common_util import get_child_id_map, get_child_recursion
 from app.core.exceptions import CustomException
 from app.common.request import PageResultSchema
 from app.core.serialize import Serialize
@@ -75,6 +75,47 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         except Exception as e:
             raise CustomException(msg=f"获取查询失败: {str(e)}")
 
+    async def get_id_map(self, field: str, values: List[Any]) -> Dict[Any, int]:
+        """
+        按字段值批量查询对象ID(单条 IN 查询, 仅查询两列, 不做数据权限过滤, 用于唯一性校验)
+        
+        参数:
+        - field (str): 字段名
+        - values (List[Any]): 字段值列表
+            
+        返回:
+        - Dict[Any, int]: {字段值: 对象ID} 映射字典
+            
+        异常:
+        - CustomException: 查询失败时抛出异常
+        """
+        if not values:
+            return {}
+        try:
+            column = getattr(self.model, field)
+            result: Result = await self.db.execute(select(column, self.model.id).where(column.in_(values)))
+            return {value: id for value, id in result.all()}
+        except Exception as e:
+            raise CustomException(msg=f"批量查询失败: {str(e)}")
+
+    async def visible_ids(self, ids: List[int]) -> List[int]:
+        """
+        过滤出存在且当前用户有数据权限的对象ID(只查询ID列)
+        
+        参数:
+        - ids (List[int]): 对象ID列表
+            
+        返回:
+        - List[int]: 过滤后的对象ID列表
+            
+        异常:
+        - CustomException: 查询失败时抛出异常
+        """
+        try:
+            return await self.__visible_ids(ids)
+        except Exception as e:
+            raise CustomException(msg=f"数据权限查询失败: {str(e)}")
+
     async def list(self, search: Optional[Dict] = None, order_by: Optional[List[Dict[str, str]]] = None) -> Sequence[ModelType]:
         """
         根据条件获取对象列表和总数
@@ -90,18 +131,81 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         - CustomException: 查询失败时抛出异常
         """
         try:
-            conditions = await self.__build_conditions(**search) if search else []
-            order = order_by or [{'id': 'asc'}]
-            sql = select(self.model).where(*conditions).order_by(*self.__order_by(order))
-            # 只有继承自CreatorMixin的模型才有creator关系
-            if hasattr(self.model, "creator_id"):
-                sql = sql.options(selectinload(self.model.creator))
-            sql = await self.__filter_permissions(sql)
+            sql = await self.__list_sql(search=search, order_by=order_by)
             result: Result = await self.db.execute(sql)
             return result.scalars().all()
         except Exception as e:
             raise CustomException(msg=f"列表查询失败: {str(e)}")
 
+    async def stream(self, search: Optional[Dict] = None, order_by: Optional[List[Dict[str, str]]] = None, chunk_size: int = 1000) -> AsyncGenerator[ModelType, None]:
+        """
+        以服务端游标逐条获取对象, 条件与数据权限同 list, 内存占用只与 chunk_size 有关
+        
+        注意:
+        - 游标占用当前连接, 遍历结束前不要在同一会话中执行其他语句
+        - 关联对象不加载(访问时抛出异常), 以免在游标打开期间执行额外查询; 需要关联对象时使用 scan
+        - 提前退出遍历时游标会随生成器关闭一起释放
+        
+        参数:
+        - search (Optional[Dict]): 查询条件,格式为 {'id': value, 'name': value}
+        - order_by (Optional[List[Dict[str, str]]]): 排序字段,格式为 [{'id': 'asc'}, {'name': 'desc'}]
+        - chunk_size (int): 每批从游标获取的行数
+            
+        返回:
+        - AsyncGenerator[ModelType, None]: 对象异步生成器
+            
+        异常:
+        - CustomException: 查询失败时抛出异常
+        """
+        try:
+            sql = await self.__list_sql(search=search, order_by=order_by, preload=False)
+            result = await self.db.stream_scalars(sql.options(raiseload('*')).execution_options(yield_per=chunk_size))
+        except Exception as e:
+            raise CustomException(msg=f"流式查询失败: {str(e)}")
+        try:
+            async for obj in result:
+                yield obj
+        finally:
+            await result.close()
+
+    async def scan(self, search: Optional[Dict] = None, order_by: Optional[List[Dict[str, str]]] = None, chunk_size: int = 1000) -> AsyncGenerator[ModelType, None]:
+        """
+        按排序字段分块(键集分页)逐条获取对象, 条件与数据权限同 list, 内存占用只与 chunk_size 有关
+        
+        注意:
+        - 每块完整读取后再批量加载关联对象, 不占用连接上的游标, 遍历期间可以在同一会话中执行其他语句
+        - 排序字段后自动追加 id 保证顺序唯一, 空值在升序时排在最前、降序时排在最后
+        
+        参数:
+        - search (Optional[Dict]): 查询条件,格式为 {'id': value, 'name': value}
+        - order_by (Optional[List[Dict[str, str]]]): 排序字段,格式为 [{'id': 'asc'}, {'name': 'desc'}]
+        - chunk_size (int): 每块读取的行数
+            
+        返回:
+        - AsyncGenerator[ModelType, None]: 对象异步生成器
+            
+        异常:
+        - CustomException: 查询失败时抛出异常
+        """
+        keys = self.__keyset_keys(order_by or [{'id': 'asc'}])
+        try:
+            sql = (await self.__list_sql(search=search)).order_by(None).order_by(*self.__keyset_order(keys)).limit(chunk_size)
+        except Exception as e:
+            raise CustomException(msg=f"分块查询失败: {str(e)}")
+        last: Optional[List[Any]] = None
+        while True:
+            try:
+                chunk_sql = sql if last is None else sql.where(self.__keyset_after(keys, last))
+                result: Result = await self.db.execute(chunk_sql)
+                objs = result.scalars().all()
+            except Exception as e:
+                raise CustomException(msg=f"分块查询失败: {str(e)}")
+            for obj in objs:
+                yield obj
+            if len(objs) < chunk_size:
+                return
+            last = [getattr(objs[-1], column.key) for column, _ in keys]
+
     async def tree_list(self, search: Optional[Dict] = None, order_by: Optional[List[Dict[str, str]]] = None, children_attr: str = 'children') -> Sequence[ModelType]:
         """
         获取树形结构数据列表
@@ -184,7 +288,7 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
             objs = result.scalars().all()
 
             data=PageResultSchema(
-                items=[out_schema.model_validate(obj).model_dump()  for obj in objs],
+                items=Serialize.dump_list(out_schema, objs),
                 total=total,
                 page_no=offset // limit + 1 if limit else 1,
                 page_size=limit,
@@ -254,6 +358,48 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         except Exception as e:
             raise CustomException(msg=f"更新失败: {str(e)}")
 
+    async def bulk_create(self, data: List[Dict]) -> None:
+        """
+        批量创建对象(单条 INSERT 批量执行, 不返回对象实例)
+        
+        参数:
+        - data (List[Dict]): 对象属性列表
+            
+        异常:
+        - CustomException: 创建失败时抛出异常
+        """
+        if not data:
+            return
+        try:
+            # 只有继承自CreatorMixin的模型才有creator关系
+            if hasattr(self.model, "creator_id") and self.current_user:
+                data = [{**item, "creator_id": self.current_user.id} for item in data]
+            await self.db.execute(insert(self.model), data)
+            await self.db.flush()
+        except Exception as e:
+            raise CustomException(msg=f"批量创建失败: {str(e)}")
+
+    async def bulk_update(self, data: List[Dict]) -> None:
+        """
+        按主键批量更新对象(单条 UPDATE 批量执行), 与 update 一样只能更新有数据权限的对象
+        
+        参数:
+        - data (List[Dict]): 对象属性列表, 每项必须包含 id
+            
+        异常:
+        - CustomException: 存在无数据权限的对象或更新失败时抛出异常
+        """
+        if not data:
+            return
+        ids = {item["id"] for item in data}
+        if len(await self.visible_ids(list(ids))) != len(ids):
+            raise CustomException(msg="批量更新失败: 包含不存在或无权限的数据")
+        try:
+            await self.db.execute(update(self.model), data)
+            await self.db.flush()
+        except Exception as e:
+            raise CustomException(msg=f"批量更新失败: {str(e)}")
+
     async def delete(self, ids: List[int]) -> None:
         """
         删除对象
@@ -304,12 +450,201 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         except Exception as e:
             raise CustomException(msg=f"批量更新失败: {str(e)}")
 
-    async def __filter_permissions(self, sql: Select) -> Select:
+    async def set_relation(self, secondary: Type[MappedBase], ids: List[int], target: "CRUDBase", target_ids: List[int]) -> None:
+        """
+        设置多对多关联, 按集合差量更新关联表: 一条 DELETE 删除多余的关联, 一条多行 INSERT 补充缺少的关联
+        
+        只查询ID, 不加载两端的ORM对象; 两端ID均按各自的数据权限过滤, 不存在或无权限的ID被忽略。
+        会话中已加载的本端对象会刷新对应的关系属性, 对端对象的反向关系属性被置为过期。
+        
+        参数:
+        - secondary (Type[MappedBase]): 关联表模型
+        - ids (List[int]): 本端对象ID列表
+        - target (CRUDBase): 对端数据层
+        - target_ids (List[int]): 对端对象ID列表, 为空时清空关联
+            
+        异常:
+        - CustomException: 设置失败时抛出异常
+        """
+        try:
+            table = secondary.__table__
+            owner_column = next(column for column in table.c if column.references(self.model.__table__.c.id))
+            target_column = next(column for column in table.c if column.references(target.model.__table__.c.id))
+
+            owner_ids = await self.__visible_ids(ids)
+            if not owner_ids:
+                return
+            new_target_ids = await target.__visible_ids(target_ids) if target_ids else []
+
+            result: Result = await self.db.execute(select(owner_column, target_column).where(owner_column.in_(owner_ids)))
+            existing = {(owner_id, target_id) for owner_id, target_id in result.all()}
+            desired = {(owner_id, target_id) for owner_id in owner_ids for target_id in new_target_ids}
+            removed, added = existing - desired, desired - existing
+
+            if removed:
+                sql = delete(table).where(owner_column.in_(owner_ids))
+                if new_target_ids:
+                    sql = sql.where(target_column.not_in(new_target_ids))
+                await self.db.execute(sql)
+            if added:
+                await self.db.execute(insert(table), [{owner_column.name: owner_id, target_column.name: target_id} for owner_id, target_id in added])
+
+            # 关联表由SQL直接修改, 同步会话中已加载对象的关系属性
+            relationship = next(rel for rel in self.model.__mapper__.relationships if rel.secondary is table)
+            changed = removed | added
+            for owner_id in {owner_id for owner_id, _ in changed}:
+                obj = self.db.identity_map.get(identity_key(self.model, owner_id))
+                if obj is not None:
+                    await self.db.refresh(obj, attribute_names=[relationship.key])
+            if relationship.back_populates:
+                for target_id in {target_id for _, target_id in changed}:
+                    obj = self.db.identity_map.get(identity_key(target.model, target_id))
+                    if obj is not None:
+                        self.db.expire(obj, [relationship.back_populates])
+        except Exception as e:
+            raise CustomException(msg=f"设置关联失败: {str(e)}")
+
+    async def descendants(self, ids: List[int]) -> List[int]:
+        """
+        获取节点及其所有子孙节点ID(WITH RECURSIVE 递归查询, 单条SQL)
+        
+        参数:
+        - ids (List[int]): 节点ID列表
+            
+        返回:
+        - List[int]: 包含自身在内的所有子孙节点ID列表
+            
+        异常:
+        - CustomException: 查询失败时抛出异常
+        """
+        try:
+            tree = self.__tree_cte(model=self.model, ids=ids, ancestors=False)
+            result: Result = await self.db.execute(select(tree.c.id))
+            return list(result.scalars().all())
+        except Exception as e:
+            raise CustomException(msg=f"子级节点查询失败: {str(e)}")
+
+    async def ancestors(self, ids: List[int]) -> List[int]:
+        """
+        获取节点及其所有祖先节点ID(WITH RECURSIVE 递归查询, 单条SQL)
+        
+        参数:
+        - ids (List[int]): 节点ID列表
+            
+        返回:
+        - List[int]: 包含自身在内的所有祖先节点ID列表
+            
+        异常:
+        - CustomException: 查询失败时抛出异常
+        """
+        try:
+            tree = self.__tree_cte(model=self.model, ids=ids, ancestors=True)
+            result: Result = await self.db.execute(select(tree.c.id))
+            return list(result.scalars().all())
+        except Exception as e:
+            raise CustomException(msg=f"父级节点查询失败: {str(e)}")
+
+    async def set_descendants(self, ids: List[int], **kwargs) -> None:
+        """
+        批量更新节点及其所有子孙节点(UPDATE ... WHERE id IN (子树), 单条SQL)
+        
+        参数:
+        - ids (List[int]): 节点ID列表
+        - **kwargs: 更新的属性及值
+            
+        异常:
+        - CustomException: 更新失败时抛出异常
+        """
+        await self.__set_tree(ids=ids, ancestors=False, **kwargs)
+
+    async def set_ancestors(self, ids: List[int], **kwargs) -> None:
+        """
+        批量更新节点及其所有祖先节点(UPDATE ... WHERE id IN (祖先链), 单条SQL)
+        
+        参数:
+        - ids (List[int]): 节点ID列表
+        - **kwargs: 更新的属性及值
+            
+        异常:
+        - CustomException: 更新失败时抛出异常
+        """
+        await self.__set_tree(ids=ids, ancestors=True, **kwargs)
+
+    async def __set_tree(self, ids: List[int], ancestors: bool, **kwargs) -> None:
+        """
+        按递归查询结果批量更新对象
+        
+        参数:
+        - ids (List[int]): 节点ID列表
+        - ancestors (bool): True 更新祖先链, False 更新子树
+        - **kwargs: 更新的属性及值
+            
+        异常:
+        - CustomException: 更新失败时抛出异常
+        """
+        if not ids:
+            return
+        try:
+            tree = self.__tree_cte(model=self.model, ids=ids, ancestors=ancestors, nesting=True)
+            # 包一层派生表, 避免 MySQL 不允许在 UPDATE 子查询中引用目标表(1093)
+            subtree = select(tree.c.id).subquery()
+            sql = update(self.model).where(self.model.id.in_(select(subtree.c.id))).values(**kwargs)
+            await self.db.execute(sql)
+            await self.db.flush()
+        except Exception as e:
+            raise CustomException(msg=f"批量更新失败: {str(e)}")
+
+    @staticmethod
+    def __tree_cte(model: Type[MappedBase], ids: List[int], ancestors: bool, nesting: bool = False) -> CTE:
+        """
+        构造树形表的递归查询(SQLite、MySQL 8、PostgreSQL 通用)
+        
+        参数:
+        - model (Type[MappedBase]): 含 id、parent_id 字段的模型类
+        - ids (List[int]): 起始节点ID列表
+        - ancestors (bool): True 向上查询祖先, False 向下查询子孙
+        - nesting (bool): 是否将 WITH 子句嵌套在所在子查询内部
+            
+        返回:
+        - CTE: 包含 id、parent_id 列的递归查询
+        """
+        tree = (
+            select(model.id, model.parent_id)
+            .where(model.id.in_(ids))
+            .cte(name=f"{model.__tablename__}_tree", recursive=True, nesting=nesting)
+        )
+        node = aliased(model)
+        join_on = node.id == tree.c.parent_id if ancestors else node.parent_id == tree.c.id
+        # UNION 去重, 数据中存在环时也能终止
+        return tree.union(select(node.id, node.parent_id).join(tree, join_on))
+
+    async def __list_sql(self, search: Optional[Dict] = None, order_by: Optional[List[Dict[str, str]]] = None, preload: bool = True) -> Select:
+        """
+        构建列表查询语句(条件、排序、创建者预加载及数据权限)
+        
+        参数:
+        - search (Optional[Dict]): 查询条件
+        - order_by (Optional[List[Dict[str, str]]]): 排序字段
+        - preload (bool): 是否预加载创建者
+            
+        返回:
+        - Select: 查询语句
+        """
+        conditions = await self.__build_conditions(**search) if search else []
+        order = order_by or [{'id': 'asc'}]
+        sql = select(self.model).where(*conditions).order_by(*self.__order_by(order))
+        # 只有继承自CreatorMixin的模型才有creator关系
+        if preload and hasattr(self.model, "creator_id"):
+            sql = sql.options(selectinload(self.model.creator))
+        return await self.__filter_permissions(sql, preload=preload)
+
+    async def __filter_permissions(self, sql: Select, preload: bool = True) -> Select:
         """
         过滤数据权限
         
         参数:
         - sql (Select): SQL查询对象
+        - preload (bool): 查询实体时是否预加载创建人
             
         返回:
         - Select: 过滤后的数据查询对象
@@ -325,7 +660,9 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         if not hasattr(self.model, "creator_id"):
             return sql
         
-        sql = sql.options(selectinload(self.model.creator))
+        # 查询实体时预加载创建人, 只查询列(如ID)时加载选项不适用
+        if preload and isinstance(sql, Select) and sql.column_descriptions[0]['expr'] is self.model:
+            sql = sql.options(selectinload(self.model.creator))
         
         # 2. 超级管理员可以查看所有数据
         if self.current_user.is_superuser:
@@ -367,25 +704,36 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
             # 2、本部门数据
             dept_ids.add(self.current_user.dept_id)
             
-        if 3 in data_scopes:
-            # 3、本部门及以下数据
-            # 直接查询部门表，避免递归调用CRUD
-            dept_sql = select(DeptModel)
-            dept_result = await self.db.execute(dept_sql)
-            dept_objs = dept_result.scalars().all()
-            id_map = get_child_id_map(dept_objs)
-            dept_child_ids = get_child_recursion(id=self.current_user.dept_id, id_map=id_map)
-            for child_id in dept_child_ids:
-                dept_ids.add(child_id)
-
         # 5、自定义权限
         # 检查UserModel是否有dept_id属性
         if hasattr(UserModel, 'dept_id'):
-            return sql.where(self.model.creator.has(UserModel.dept_id.in_(list(dept_ids))))
+            dept_condition = UserModel.dept_id.in_(list(dept_ids))
+            if 3 in data_scopes:
+                # 3、本部门及以下数据
+                # 递归查询作为子查询内联, 无需加载整张部门表
+                dept_tree = self.__tree_cte(model=DeptModel, ids=[self.current_user.dept_id], ancestors=False)
+                dept_condition = or_(dept_condition, UserModel.dept_id.in_(select(dept_tree.c.id)))
+            return sql.where(self.model.creator.has(dept_condition))
         else:
             # 如果没有dept_id属性，回退到只显示自己的数据
             return sql.where(self.model.creator_id == self.current_user.id)
 
+    async def __visible_ids(self, ids: List[int]) -> List[int]:
+        """
+        过滤出存在且有数据权限的对象ID(只查询ID列)
+        
+        参数:
+        - ids (List[int]): 对象ID列表
+            
+        返回:
+        - List[int]: 过滤后的对象ID列表
+        """
+        if not ids:
+            return []
+        sql = await self.__filter_permissions(select(self.model.id).where(self.model.id.in_(ids)))
+        result: Result = await self.db.execute(sql)
+        return list(result.scalars().all())
+
     def __order_by(self, order_by: List[Dict[str, str]]) -> List[ColumnElement]:
         """
         获取排序字段
@@ -406,6 +754,70 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
                 columns.append(desc(column) if direction.lower() == 'desc' else asc(column))
         return columns
 
+    def __keyset_keys(self, order_by: List[Dict[str, str]]) -> List[Tuple[Any, bool]]:
+        """
+        获取键集分页的排序键, 末尾追加 id 保证顺序唯一
+        
+        参数:
+        - order_by (List[Dict[str, str]]): 排序字段列表,格式为 [{'id': 'asc'}, {'name': 'desc'}]
+            
+        返回:
+        - List[Tuple[Any, bool]]: [(字段, 是否降序)] 列表
+        """
+        keys = [(getattr(self.model, field), direction.lower() == 'desc') for order in order_by for field, direction in order.items()]
+        if not any(column.key == 'id' for column, _ in keys):
+            keys.append((self.model.id, False))
+        return keys
+
+    @staticmethod
+    def __keyset_order(keys: List[Tuple[Any, bool]]) -> List[ColumnElement]:
+        """
+        获取键集分页的排序表达式, 可空字段先按是否为空排序(升序空值在前, 降序空值在后), 各数据库结果一致
+        
+        参数:
+        - keys (List[Tuple[Any, bool]]): [(字段, 是否降序)] 列表
+            
+        返回:
+        - List[ColumnElement]: 排序表达式列表
+        """
+        columns = []
+        for column, descending in keys:
+            if column.nullable:
+                columns.append(column.is_(None).asc() if descending else column.is_(None).desc())
+            columns.append(desc(column) if descending else asc(column))
+        return columns
+
+    @staticmethod
+    def __keyset_after(keys: List[Tuple[Any, bool]], values: List[Any]) -> ColumnElement:
+        """
+        构建排在上一块最后一行之后的条件: (k1 之后) 或 (k1 相等且 k2 之后) 或 ...
+        
+        参数:
+        - keys (List[Tuple[Any, bool]]): [(字段, 是否降序)] 列表
+        - values (List[Any]): 上一块最后一行的排序键值
+            
+        返回:
+        - ColumnElement: 查询条件
+        """
+        clauses = []
+        equals: List[ColumnElement] = []
+        for (column, descending), value in zip(keys, values):
+            if value is None:
+                # 升序时空值在前, 之后是全部非空值; 降序时空值在最后, 之后没有更多的值
+                after = None if descending else column.is_not(None)
+                equal = column.is_(None)
+            else:
+                # 布尔值只能直接比较相等, 以绑定参数比较大小
+                value = literal(value, type_=column.type)
+                after = column < value if descending else column > value
+                if descending and column.nullable:
+                    after = or_(after, column.is_(None))
+                equal = column == value
+            if after is not None:
+                clauses.append(and_(*equals, after))
+            equals.append(equal)
+        return or_(*clauses)
+
     async def __build_conditions(self, **kwargs) -> List[ColumnElement]:
         """
         构建查询条件
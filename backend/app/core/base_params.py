@@ -1,6 +1,6 @@
 # -*- coding: utf-8 -*-
 
-from typing import Optional
+from typing import Literal, Optional
 from fastapi import Query
 
 
@@ -40,3 +40,43 @@ class PaginationQueryParam:
         else:
             self.order_by = [{'id': 'asc'}]
 
+
+
+class ExportQueryParam:
+    """导出参数"""
+
+    MEDIA_TYPES = {
+        'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+        'csv': 'text/csv; charset=utf-8',
+    }
+
+    def __init__(
+        self,
+        file_format: Literal['xlsx', 'csv'] = Query(default='xlsx', description="导出格式: xlsx 或 csv"),
+        background: bool = Query(default=False, description="是否作为后台任务导出, 为真时返回任务信息"),
+    ) -> None:
+        """
+        初始化导出参数。
+        
+        参数:
+        - file_format (str): 导出格式，默认 xlsx。
+        - background (bool): 是否作为后台任务导出，默认 False。
+        
+        返回:
+        - None
+        """
+        self.file_format = file_format
+        self.background = background
+        self.media_type = self.MEDIA_TYPES[file_format]
+
+    def filename(self, name: str) -> str:
+        """
+        生成下载文件名。
+        
+        参数:
+        - name (str): 不含扩展名的文件名。
+        
+        返回:
+        - str: 带扩展名的文件名。
+        """
+        return f'{name}.{self.file_format}'
@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+
+import gzip
+import zlib
+from typing import List, Optional, Sequence
+from starlette.datastructures import Headers
+
+try:
+    import brotli
+except ImportError:  # 未安装 brotli 时不提供 br 编码
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # 未安装 zstandard 时不提供 zstd 编码
+    zstandard = None
+
+# 已安装的压缩编码
+ENCODINGS: List[str] = []
+if brotli is not None:
+    ENCODINGS.append('br')
+if zstandard is not None:
+    ENCODINGS.append('zstd')
+ENCODINGS.append('gzip')
+
+
+def accepted_encodings(headers: Headers) -> List[str]:
+    """
+    解析 Accept-Encoding 请求头
+
+    参数:
+    - headers (Headers): 请求头。
+
+    返回:
+    - List[str]: 客户端接受的编码(q=0 的除外)。
+    """
+    encodings = []
+    for item in headers.get('accept-encoding', '').split(','):
+        name, _, params = item.partition(';')
+        q = params.strip().removeprefix('q=')
+        try:
+            if params and float(q) <= 0:
+                continue
+        except ValueError:
+            continue
+        encodings.append(name.strip().lower())
+    return encodings
+
+
+def negotiate(headers: Headers, encodings: Sequence[str]) -> Optional[str]:
+    """
+    按服务端优先顺序选择客户端接受且已安装的编码
+
+    参数:
+    - headers (Headers): 请求头。
+    - encodings (Sequence[str]): 服务端优先的编码顺序。
+
+    返回:
+    - Optional[str]: 选中的编码, 没有可用编码时为 None。
+    """
+    accepted = accepted_encodings(headers)
+    for encoding in encodings:
+        if encoding in accepted and encoding in ENCODINGS:
+            return encoding
+    return None
+
+
+def compress(encoding: str, data: bytes, level: int) -> bytes:
+    """
+    一次性压缩数据
+
+    参数:
+    - encoding (str): 编码(br、zstd、gzip)。
+    - data (bytes): 原始数据。
+    - level (int): 压缩级别。
+
+    返回:
+    - bytes: 压缩后的数据。
+    """
+    if encoding == 'br':
+        return brotli.compress(data, quality=level)
+    if encoding == 'zstd':
+        return zstandard.ZstdCompressor(level=level).compress(data)
+    # mtime 固定为 0, 相同内容的压缩结果不变
+    return gzip.compress(data, compresslevel=level, mtime=0)
+
+
+class StreamCompressor:
+    """
+    流式压缩器
+
+    每个分块压缩后立即刷新输出, 客户端可以逐块解压, 流式输出(如 AI 对话)不会被压缩缓冲区积压。
+    """
+
+    def __init__(self, encoding: str, level: int) -> None:
+        """
+        初始化流式压缩器
+
+        参数:
+        - encoding (str): 编码(br、zstd、gzip)。
+        - level (int): 压缩级别。
+        """
+        self.encoding = encoding
+        if encoding == 'br':
+            self.__compressor = brotli.Compressor(quality=level)
+        elif encoding == 'zstd':
+            self.__compressor = zstandard.ZstdCompressor(level=level).compressobj()
+        else:
+            # wbits=31 输出 gzip 格式
+            self.__compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        """
+        压缩一个分块并刷新输出
+
+        参数:
+        - data (bytes): 分块数据。
+
+        返回:
+        - bytes: 可以立即发送的压缩数据。
+        """
+        if self.encoding == 'br':
+            return self.__compressor.process(data) + self.__compressor.flush()
+        if self.encoding == 'zstd':
+            return self.__compressor.compress(data) + self.__compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+        return self.__compressor.compress(data) + self.__compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        """
+        结束压缩
+
+        返回:
+        - bytes: 剩余的压缩数据。
+        """
+        if self.encoding == 'br':
+            return self.__compressor.finish()
+        return self.__compressor.flush()
@@ -1,11 +1,19 @@
 # -*- coding: utf-8 -*-
 
+import asyncio
+import re
+from contextlib import AsyncExitStack
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Dict
 from redis.asyncio import Redis
 from redis import exceptions
-from motor.motor_asyncio import AsyncIOMotorClient
 from fastapi import FastAPI
-from sqlalchemy import create_engine, Engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy import create_engine, event, text, Connection, Engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from sqlalchemy.util import await_only
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.sql import CompoundSelect, Select
+from sqlalchemy.sql.dml import UpdateBase
 from sqlalchemy.ext.asyncio import (
     create_async_engine,
     async_sessionmaker,
@@ -17,43 +25,195 @@ from app.core.logger import logger
 from app.config.setting import settings
 from app.core.exceptions import CustomException
 
+if TYPE_CHECKING:
+    from motor.motor_asyncio import AsyncIOMotorClient
 
-# 同步数据库引擎
-engine: Engine = create_engine(
-    url=settings.DB_URI,
-    echo=settings.DATABASE_ECHO,
-    pool_pre_ping=settings.POOL_PRE_PING,
-    pool_recycle=settings.POOL_RECYCLE,
-)
 
-# 同步数据库会话工厂
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# SQLite 进程内写锁: SQLite 同一时间只允许一个写事务, 写事务在应用内排队, 避免并发写入直接失败
+_sqlite_write_lock = asyncio.Lock()
+_SQLITE_WRITE_LOCK_KEY = 'sqlite_write_lock'
+_SQLITE_WRITE_STATEMENT = re.compile(r'^\s*(INSERT|UPDATE|DELETE|REPLACE|CREATE|DROP|ALTER)\b', re.IGNORECASE)
+
+
+def _engine_options(is_async: bool) -> Dict[str, Any]:
+    """
+    按数据库类型生成引擎参数。
+
+    MySQL/PostgreSQL 使用配置的连接池大小; SQLite 同样复用连接(默认 NullPool 每个会话都会重新建立连接),
+    连接预检与回收对本地文件无意义, 不再开启。
+
+    参数:
+    - is_async (bool): 是否为异步引擎。
+
+    返回:
+    - Dict[str, Any]: create_engine/create_async_engine 的参数。
+    """
+    options: Dict[str, Any] = dict(
+        echo=settings.DATABASE_ECHO,
+        echo_pool=settings.ECHO_POOL,
+        pool_size=settings.POOL_SIZE,
+        max_overflow=settings.MAX_OVERFLOW,
+        pool_timeout=settings.POOL_TIMEOUT,
+    )
+    if settings.DATABASE_TYPE == 'sqlite':
+        options.update(poolclass=AsyncAdaptedQueuePool if is_async else QueuePool)
+    else:
+        options.update(
+            pool_pre_ping=settings.POOL_PRE_PING,
+            pool_recycle=settings.POOL_RECYCLE,
+        )
+    return options
+
+
+def _set_sqlite_pragma(dbapi_connection: Any, connection_record: Any) -> None:
+    """
+    新建 SQLite 连接时设置 PRAGMA: WAL 模式下读写互不阻塞, synchronous=NORMAL 在 WAL 下仍可保证一致性。
+
+    参数:
+    - dbapi_connection (Any): DBAPI 连接。
+    - connection_record (Any): 连接池记录。
+    """
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute(f"PRAGMA busy_timeout={int(settings.SQLITE_BUSY_TIMEOUT)}")
+    cursor.execute(f"PRAGMA mmap_size={int(settings.SQLITE_MMAP_SIZE)}")
+    cursor.close()
+
+
+def _acquire_sqlite_write_lock(conn: Connection, cursor: Any, statement: str, parameters: Any, context: Any, executemany: bool) -> None:
+    """
+    连接执行第一条写语句前获取写锁, 持有到事务结束。
+
+    参数:
+    - conn (Connection): 数据库连接。
+    - statement (str): 待执行的 SQL。
+
+    异常:
+    - CustomException: 等待写锁超时时抛出。
+    """
+    if conn.info.get(_SQLITE_WRITE_LOCK_KEY) or not _SQLITE_WRITE_STATEMENT.match(statement):
+        return
+    try:
+        await_only(asyncio.wait_for(_sqlite_write_lock.acquire(), settings.SQLITE_BUSY_TIMEOUT / 1000))
+    except asyncio.TimeoutError:
+        raise CustomException(msg="数据库繁忙, 请稍后重试")
+    conn.info[_SQLITE_WRITE_LOCK_KEY] = True
+
+
+def _release_sqlite_write_lock(info: Dict[Any, Any]) -> None:
+    """
+    事务提交、回滚或连接归还连接池时释放写锁。
+
+    参数:
+    - info (Dict[Any, Any]): 连接信息字典。
+    """
+    if info.pop(_SQLITE_WRITE_LOCK_KEY, False):
+        _sqlite_write_lock.release()
+
+
+@lru_cache(maxsize=None)
+def get_engine() -> Engine:
+    """
+    获取同步数据库引擎, 首次使用时才创建(同步驱动只在定时任务中用到, 不在导入时加载)。
+
+    返回:
+    - Engine: 同步数据库引擎。
+    """
+    sync_engine = create_engine(url=settings.DB_URI, **_engine_options(is_async=False))
+    if settings.DATABASE_TYPE == 'sqlite':
+        event.listen(sync_engine, 'connect', _set_sqlite_pragma)
+    return sync_engine
+
+
+# 同步数据库会话工厂, 创建会话时通过 bind=get_engine() 绑定引擎
+SessionLocal = sessionmaker(autocommit=False, autoflush=False)
 
 # 异步数据库引擎
 async_engine: AsyncEngine = create_async_engine(
     url=settings.ASYNC_DB_URI,
-    echo=settings.DATABASE_ECHO,
-    echo_pool=settings.ECHO_POOL,
-    pool_pre_ping=settings.POOL_PRE_PING,
     future=settings.FUTURE,
-    pool_recycle=settings.POOL_RECYCLE,
-    # pool_size=settings.POOL_SIZE,  # sqlite 不支持
-    # max_overflow=settings.MAX_OVERFLOW,  # sqlite 不支持
-    # pool_timeout=settings.POOL_TIMEOUT,  # sqlite 不支持
+    **_engine_options(is_async=True)
 )
 
+if settings.DATABASE_TYPE == 'sqlite':
+    event.listen(async_engine.sync_engine, 'connect', _set_sqlite_pragma)
+    # 写锁只用于异步引擎, 同步引擎(定时任务线程)依靠 busy_timeout 等待
+    event.listen(async_engine.sync_engine, 'before_cursor_execute', _acquire_sqlite_write_lock)
+    event.listen(async_engine.sync_engine, 'commit', lambda conn: _release_sqlite_write_lock(conn.info))
+    event.listen(async_engine.sync_engine, 'rollback', lambda conn: _release_sqlite_write_lock(conn.info))
+    event.listen(async_engine.sync_engine.pool, 'checkin', lambda dbapi_connection, connection_record: _release_sqlite_write_lock(connection_record.info))
+
+# 只读副本异步引擎(可选), 使用独立的连接池
+read_async_engine: AsyncEngine | None = create_async_engine(
+    url=settings.READ_DB_URI,
+    future=settings.FUTURE,
+    **_engine_options(is_async=True)
+) if settings.READ_DB_URI else None
+
+# 会话 info 键: 是否允许查询走只读副本 / 会话是否发生过写入 / 事务提交后执行的回调
+READ_REPLICA_KEY = 'read_replica'
+WROTE_KEY = 'wrote'
+AFTER_COMMIT_KEY = 'after_commit'
+
+
+class RoutingSession(Session):
+    """
+    读写分离会话
+
+    会话 info 中标记了 READ_REPLICA_KEY 时, 查询语句走只读副本; 写入(flush、INSERT/UPDATE/DELETE)、
+    文本SQL以及会话发生写入之后的所有语句都走主库, 保证会话内读到自己的写入。
+    """
+
+    def get_bind(self, mapper: Any = None, clause: Any = None, **kw: Any) -> Any:
+        """
+        选择语句执行的数据库引擎
+
+        参数:
+        - mapper (Any): 映射类。
+        - clause (Any): 待执行语句。
+
+        返回:
+        - Any: 同步引擎或连接。
+        """
+        if self._flushing or isinstance(clause, UpdateBase):
+            self.info[WROTE_KEY] = True
+        elif (
+            read_async_engine is not None
+            and self.info.get(READ_REPLICA_KEY)
+            and not self.info.get(WROTE_KEY)
+            and isinstance(clause, (Select, CompoundSelect))
+        ):
+            return read_async_engine.sync_engine
+        return super().get_bind(mapper=mapper, clause=clause, **kw)
+
+
 # 异步数据库会话工厂
 AsyncSessionLocal = async_sessionmaker(
     bind=async_engine,
+    sync_session_class=RoutingSession,
     autocommit=settings.AUTOCOMMIT,
     autoflush=settings.AUTOFETCH,
     expire_on_commit=settings.EXPIRE_ON_COMMIT,
     class_=AsyncSession
 )
 
-def session_connect() -> AsyncSession:
+def add_after_commit(session: AsyncSession, callback: Callable[[], Awaitable[None]]) -> None:
+    """
+    注册事务提交后执行的异步回调(如清除缓存), 由 db_getter 在事务提交成功后依次执行, 事务回滚时丢弃。
+
+    参数:
+    - session (AsyncSession): 数据库会话。
+    - callback (Callable[[], Awaitable[None]]): 异步回调。
+    """
+    session.info.setdefault(AFTER_COMMIT_KEY, []).append(callback)
+
+def session_connect(read_replica: bool = False) -> AsyncSession:
     """
     获取异步数据库会话连接。
+
+    参数:
+    - read_replica (bool): 是否允许查询走只读副本(未配置 READ_DB_URI 时无效)。
     
     返回:
     - AsyncSession: 异步数据库会话连接。
@@ -61,10 +221,47 @@ def session_connect() -> AsyncSession:
     try:
         if not settings.SQL_DB_ENABLE:
             raise CustomException(msg="请先开启数据库连接", data="请启用 app/config/setting.py: SQL_DB_ENABLE")
-        return AsyncSessionLocal()
+        session = AsyncSessionLocal()
+        session.info[READ_REPLICA_KEY] = read_replica
+        return session
     except Exception as e:
         raise CustomException(msg=f"数据库连接失败: {e}")
 
+async def warmup_db_pool(size: int) -> None:
+    """
+    预先建立数据库连接(主库及只读副本), 避免服务就绪后的首批请求承担建立连接的耗时。
+
+    参数:
+    - size (int): 每个连接池预热的连接数, 不超过连接池大小。
+    """
+    count = min(size, settings.POOL_SIZE)
+    if count <= 0:
+        return
+    for db_engine in (async_engine, read_async_engine):
+        if db_engine is None:
+            continue
+        # 同时持有 count 个连接直到全部建立, 保证建立的是不同连接, 退出时统一归还连接池
+        async with AsyncExitStack() as stack:
+            conns = await asyncio.gather(
+                *(stack.enter_async_context(db_engine.connect()) for _ in range(count)),
+                return_exceptions=True
+            )
+            for conn in conns:
+                if isinstance(conn, BaseException):
+                    raise conn
+            await asyncio.gather(*(conn.execute(text("SELECT 1")) for conn in conns))
+
+async def warmup_redis_pool(redis: Redis, size: int) -> None:
+    """
+    预先建立 Redis 连接。
+
+    参数:
+    - redis (Redis): Redis 客户端。
+    - size (int): 预热的连接数, 不超过连接池大小。
+    """
+    # 并发请求时连接池为每个请求分配不同连接
+    await asyncio.gather(*(redis.ping() for _ in range(max(min(size, settings.POOL_SIZE), 0))))
+
 async def redis_connect(app: FastAPI, status: bool) -> Redis | None:
     """
     创建或关闭Redis连接。
@@ -104,7 +301,7 @@ async def redis_connect(app: FastAPI, status: bool) -> Redis | None:
         await app.state.redis.close()
         logger.info('Redis连接已关闭')
 
-async def mongodb_connect(app: FastAPI, status: bool) -> AsyncIOMotorClient | None:
+async def mongodb_connect(app: FastAPI, status: bool) -> "AsyncIOMotorClient | None":
     """
     创建或关闭MongoDB连接。
     
@@ -120,7 +317,8 @@ async def mongodb_connect(app: FastAPI, status: bool) -> AsyncIOMotorClient | No
 
     if status:
         try:
-            
+            from motor.motor_asyncio import AsyncIOMotorClient
+
             client = AsyncIOMotorClient(
                 settings.MONGO_DB_URI,
                 maxPoolSize=settings.POOL_SIZE,
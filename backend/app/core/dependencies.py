@@ -1,33 +1,68 @@
 # -*- coding: utf-8 -*-
 
+import hashlib
 import json
 from redis.asyncio.client import Redis
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import AsyncGenerator, Optional
+from typing import TYPE_CHECKING, AsyncGenerator, Optional
 from fastapi import Depends, Request
-from motor.motor_asyncio import AsyncIOMotorDatabase
 from fastapi import Depends
 
 from app.api.v1.module_system.user.schema import UserOutSchema
 from app.common.enums import RedisInitKeyConfig
 from app.core.exceptions import CustomException
-from app.core.database import session_connect
+from app.config.setting import settings
+from app.core.database import AFTER_COMMIT_KEY, WROTE_KEY, read_async_engine, session_connect
 from app.core.security import OAuth2Schema, decode_access_token
 from app.core.logger import logger
 from app.core.redis_crud import RedisCURD
 from app.api.v1.module_system.user.crud import UserCRUD
 from app.api.v1.module_system.auth.schema import AuthSchema
 
+if TYPE_CHECKING:
+    from motor.motor_asyncio import AsyncIOMotorDatabase
 
-async def db_getter() -> AsyncGenerator[AsyncSession, None]:
+
+async def db_getter(request: Request) -> AsyncGenerator[AsyncSession, None]:
     """获取数据库会话连接
+
+    配置了只读副本时, GET/HEAD 请求的查询走只读副本; 已登录的请求发生写入后, 同一令牌在
+    READ_DB_STICKY_SECONDS 秒内的读请求固定走主库, 避免复制延迟导致读不到刚写入的数据。
+    未登录的请求不检查固定标记, 读请求不增加Redis往返。
+
+    参数:
+    - request (Request): 请求对象
     
     返回:
     - AsyncSession: 数据库会话连接
     """
-    async with session_connect() as session:
+    read_replica = read_async_engine is not None and request.method in ('GET', 'HEAD')
+    redis: Optional[Redis] = getattr(request.app.state, 'redis', None) if read_async_engine is not None else None
+    pin_key = _primary_pin_key(request) if redis is not None else None
+    if read_replica and pin_key:
+        read_replica = not await redis.exists(pin_key)
+    async with session_connect(read_replica=read_replica) as session:
         async with session.begin():
             yield session
+        # 事务已提交, 执行提交后回调(回滚时不会执行到这里)
+        for callback in session.info.pop(AFTER_COMMIT_KEY, []):
+            await callback()
+        if pin_key and session.info.get(WROTE_KEY):
+            await redis.set(pin_key, 1, ex=settings.READ_DB_STICKY_SECONDS)
+
+def _primary_pin_key(request: Request) -> Optional[str]:
+    """获取固定走主库标记的Redis键(按登录令牌区分)
+    
+    参数:
+    - request (Request): 请求对象
+    
+    返回:
+    - Optional[str]: Redis键名, 未登录的请求返回None
+    """
+    token = request.headers.get('Authorization')
+    if not token:
+        return None
+    return f'{RedisInitKeyConfig.DB_PRIMARY_PIN.key}:{hashlib.sha1(token.encode()).hexdigest()}'
 
 async def redis_getter(request: Request) -> Redis:
     """获取Redis连接
@@ -40,7 +75,7 @@ async def redis_getter(request: Request) -> Redis:
     """
     return request.app.state.redis
 
-async def mongo_getter(request: Request) -> AsyncIOMotorDatabase:
+async def mongo_getter(request: Request) -> "AsyncIOMotorDatabase":
     """获取MongoDB连接
     
     参数:
@@ -104,6 +139,11 @@ async def get_current_user(
     if not user.status:
         raise CustomException(msg="用户已被停用", code=10401, status_code=401)
     
+    # 记录会话活跃时间(写入进程内缓冲区, 由后台任务批量写入Redis)
+    # 延迟导入避免循环导入
+    from app.api.v1.module_monitor.online.service import OnlineService
+    OnlineService.record_activity_service(session_id=session_id, user_id=user.id)
+
     # 设置请求上下文
     request.scope["user_id"] = user.id
     request.scope["user_username"] = user.username
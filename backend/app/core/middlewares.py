@@ -4,14 +4,15 @@ import time
 import json
 from typing import Any
 from starlette.middleware.cors import CORSMiddleware
-from starlette.types import ASGIApp
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 from starlette.requests import Request
-from starlette.middleware.gzip import GZipMiddleware
 from starlette.responses import Response
 from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
 
 from app.common.response import ErrorResponse
 from app.config.setting import settings
+from app.core import compression
 from app.core.logger import logger
 from app.core.exceptions import CustomException
 from app.api.v1.module_system.params.service import ParamsService
@@ -133,12 +134,139 @@ class RequestLogMiddleware(BaseHTTPMiddleware):
             return ErrorResponse(msg=f"系统异常，请联系管理员", data=str(e))
 
 
-class CustomGZipMiddleware(GZipMiddleware):
-    """GZip压缩中间件"""
+class CustomCompressionMiddleware:
+    """
+    响应压缩中间件
+
+    - 按 COMPRESS_ENCODINGS 顺序协商 br/zstd/gzip, 按响应大小选择压缩级别(COMPRESS_LEVELS);
+    - 跳过已编码(如预压缩的静态文件)、分段(Range)、已压缩格式(COMPRESS_EXCLUDE_TYPES)的响应;
+    - 流式响应(StreamingResponse、大文件)默认不压缩, 路由策略为 stream 时逐块压缩并立即刷新。
+    """
     def __init__(self, app: ASGIApp) -> None:
-        super().__init__(
-            app,
-            minimum_size=settings.GZIP_MIN_SIZE,
-            compresslevel=settings.GZIP_COMPRESS_LEVEL
-        )
+        self.app = app
+        self.encodings = [encoding for encoding in settings.COMPRESS_ENCODINGS if encoding in compression.ENCODINGS]
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = compression.negotiate(Headers(scope=scope), self.encodings)
+        await _CompressionResponder(self.app, scope, encoding)(receive, send)
+
+
+class _CompressionResponder:
+    """单个请求的响应压缩处理"""
+    def __init__(self, app: ASGIApp, scope: Scope, encoding: str | None) -> None:
+        self.app = app
+        self.scope = scope
+        self.encoding = encoding
+        self.send: Send
+        self.initial_message: Message | None = None
+        self.compressor: compression.StreamCompressor | None = None
+
+    async def __call__(self, receive: Receive, send: Send) -> None:
+        self.send = send
+        await self.app(self.scope, receive, self.send_with_compression)
+
+    async def send_with_compression(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            # 等到第一个响应体分块才能确定是否压缩
+            self.initial_message = message
+            return
+        if self.initial_message is None:
+            if self.compressor and message["type"] == "http.response.body":
+                body = self.compressor.compress(message.get("body", b""))
+                if not message.get("more_body", False):
+                    body += self.compressor.finish()
+                message["body"] = body
+            await self.send(message)
+            return
+
+        initial_message, self.initial_message = self.initial_message, None
+        if message["type"] != "http.response.body":
+            await self.send(initial_message)
+            await self.send(message)
+            return
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        headers = MutableHeaders(raw=initial_message["headers"])
+        policy = self.__policy()
+        compressible = policy != "off" and self.__compressible(initial_message["status"], headers) and (not more_body or policy == "stream")
+        if compressible and (more_body or len(body) >= settings.COMPRESS_MIN_SIZE):
+            if "accept-encoding" not in headers.get("vary", "").lower():
+                headers.add_vary_header("Accept-Encoding")
+            if self.encoding and not more_body:
+                content = compression.compress(self.encoding, body, self.__level(len(body)))
+                if len(content) < len(body):
+                    self.__set_encoding_headers(headers)
+                    headers["Content-Length"] = str(len(content))
+                    message["body"] = content
+            elif self.encoding:
+                # 流式响应长度未知, 使用最低一档的压缩级别
+                self.compressor = compression.StreamCompressor(self.encoding, self.__level(None))
+                self.__set_encoding_headers(headers)
+                del headers["Content-Length"]
+                message["body"] = self.compressor.compress(body)
+        await self.send(initial_message)
+        await self.send(message)
+
+    def __policy(self) -> str | None:
+        """
+        获取当前路由的压缩策略(COMPRESS_ROUTE_POLICY 中最长匹配的路由前缀)
+
+        返回:
+        - str | None: off、stream 或 None(默认策略)。
+        """
+        if not settings.COMPRESS_ROUTE_POLICY:
+            return None
+        route = self.scope.get("route")
+        path = getattr(route, "path", None) or self.scope["path"].removeprefix(self.scope.get("root_path", ""))
+        matched = [prefix for prefix in settings.COMPRESS_ROUTE_POLICY if path.startswith(prefix)]
+        return settings.COMPRESS_ROUTE_POLICY[max(matched, key=len)] if matched else None
+
+    @staticmethod
+    def __compressible(status_code: int, headers: MutableHeaders) -> bool:
+        """
+        判断响应是否可以压缩
+
+        参数:
+        - status_code (int): 状态码。
+        - headers (MutableHeaders): 响应头。
+
+        返回:
+        - bool: 未编码、非分段且不是已压缩格式时为 True。
+        """
+        # Content-Range 针对未压缩的内容, 分段响应压缩后不再成立
+        if status_code in (204, 206, 304) or "content-encoding" in headers:
+            return False
+        content_type = headers.get("content-type", "").lower()
+        # image/svg+xml 等文本格式仍然压缩
+        return content_type.endswith("+xml") or not content_type.startswith(tuple(settings.COMPRESS_EXCLUDE_TYPES))
+
+    def __level(self, size: int | None) -> int:
+        """
+        按响应大小选择压缩级别
+
+        参数:
+        - size (int | None): 响应大小, 流式响应为 None。
+
+        返回:
+        - int: 压缩级别。
+        """
+        levels = settings.COMPRESS_LEVELS[self.encoding]
+        if size is None:
+            return levels[-1]
+        tier = sum(size >= threshold for threshold in settings.COMPRESS_SIZE_TIERS)
+        return levels[min(tier, len(levels) - 1)]
+
+    def __set_encoding_headers(self, headers: MutableHeaders) -> None:
+        """
+        设置压缩后的响应头, 强 ETag 改为弱 ETag(压缩后的内容与原 ETag 对应的内容不再逐字节相同)
 
+        参数:
+        - headers (MutableHeaders): 响应头。
+        """
+        headers["Content-Encoding"] = self.encoding
+        etag = headers.get("etag")
+        if etag and not etag.startswith("W/"):
+            headers["ETag"] = f"W/{etag}"
@@ -1,12 +1,22 @@
 # -*- coding: utf-8 -*-
 
 import pickle
-from typing import Any, Awaitable, List, Optional
+import uuid
+from typing import Any, Awaitable, Dict, List, Optional, Tuple
 from redis.asyncio.client import Redis
 
 from app.core.logger import logger
 
 
+# 递增版本号: 分配版本号、记录字段版本号、初始化纪元在同一脚本中完成
+BUMP_VERSION_SCRIPT = """
+redis.call('SET', KEYS[3], ARGV[2], 'NX')
+local version = redis.call('INCR', KEYS[1])
+redis.call('HSET', KEYS[2], ARGV[1], version)
+return version
+"""
+
+
 class RedisCURD:
     """缓存工具类"""
 
@@ -228,7 +238,7 @@ class RedisCURD:
         - bool: 如果设置哈希缓存成功则返回True,否则返回False
         """
         try:
-            self.redis.hset(name=name, key=key, value=value)
+            await self.redis.hset(name=name, key=key, value=value)
             return True
         except Exception as e:
             logger.error(f"设置哈希缓存失败: {str(e)}")
@@ -245,8 +255,97 @@ class RedisCURD:
         - Awaitable[List[Any]] | List[Any]: 返回哈希缓存值列表,如果获取失败则返回空列表
         """
         try:
-            data = self.redis.hmget(name=name, keys=keys)
+            data = await self.redis.hmget(name=name, keys=keys)
             return data
         except Exception as e:
             logger.error(f"获取哈希缓存失败: {str(e)}")
-            return []
\ No newline at end of file
+            return []
+
+    async def bump_version(self, name: str, field: str) -> int:
+        """递增版本号并记录到版本表(Lua脚本, 原子执行)
+        
+        版本号由 `{name}:seq` 计数器统一分配, 保证单调递增;
+        `{name}:map` 哈希表记录每个字段最近一次变更时的版本号;
+        `{name}:epoch` 为版本表的纪元标识, 首次递增时随机生成, Redis 数据被清空后计数器从头开始, 纪元随之改变,
+        客户端据此判断已缓存的版本号是否失效。
+        
+        参数:
+        - name (str): 版本表名称
+        - field (str): 发生变更的字段(如字典类型、配置键)
+            
+        返回:
+        - int: 新的版本号,如果递增失败则返回0
+        """
+        version = await self.eval_script(
+            script=BUMP_VERSION_SCRIPT,
+            keys=[f"{name}:seq", f"{name}:map", f"{name}:epoch"],
+            args=[field, uuid.uuid4().hex[:8]]
+        )
+        return int(version) if version else 0
+
+    async def get_version(self, name: str, field: Optional[str] = None) -> str:
+        """获取版本标识(纪元与版本号, 一次事务读取)
+        
+        参数:
+        - name (str): 版本表名称
+        - field (Optional[str], optional): 字段名称,为None时返回整个版本表的最新版本号
+            
+        返回:
+        - str: `{纪元}-{版本号}`,如果不存在或获取失败则返回空字符串
+        """
+        try:
+            async with self.redis.pipeline(transaction=True) as pipe:
+                pipe.get(f"{name}:epoch")
+                if field is None:
+                    pipe.get(f"{name}:seq")
+                else:
+                    pipe.hget(name=f"{name}:map", key=field)
+                epoch, version = await pipe.execute()
+            return f"{epoch}-{version}" if epoch and version else ""
+        except Exception as e:
+            logger.error(f"获取版本号失败: {str(e)}")
+            return ""
+
+    async def get_versions_since(self, name: str, since: int, epoch: Optional[str] = None) -> Tuple[str, int, Dict[str, int]]:
+        """获取指定版本号之后发生变更的字段(纪元、最新版本号与版本表在同一事务中读取)
+        
+        客户端的纪元与当前纪元不一致(如 Redis 数据被清空)时, 其版本号已无意义, 返回全部字段。
+        
+        参数:
+        - name (str): 版本表名称
+        - since (int): 起始版本号(不包含)
+        - epoch (Optional[str], optional): 客户端版本号所属的纪元
+            
+        返回:
+        - Tuple[str, int, Dict[str, int]]: (当前纪元, 最新版本号, 字段与其版本号的映射),如果获取失败则返回空值
+        """
+        try:
+            async with self.redis.pipeline(transaction=True) as pipe:
+                pipe.get(f"{name}:epoch")
+                pipe.get(f"{name}:seq")
+                pipe.hgetall(f"{name}:map")
+                current_epoch, version, data = await pipe.execute()
+            current_epoch = current_epoch or ""
+            if epoch != current_epoch:
+                since = 0
+            return current_epoch, int(version or 0), {field: int(value) for field, value in data.items() if int(value) > since}
+        except Exception as e:
+            logger.error(f"获取变更版本失败: {str(e)}")
+            return "", 0, {}
+
+    async def eval_script(self, script: str, keys: List[str], args: List[Any]) -> Any:
+        """执行Lua脚本(优先EVALSHA, 脚本未缓存时自动加载)
+        
+        参数:
+        - script (str): Lua脚本
+        - keys (List[str]): 脚本涉及的键名列表
+        - args (List[Any]): 脚本参数列表
+            
+        返回:
+        - Any: 脚本返回值,如果执行失败则返回None
+        """
+        try:
+            return await self.redis.register_script(script)(keys=keys, args=args)
+        except Exception as e:
+            logger.error(f"执行Lua脚本失败: {str(e)}")
+            return None
@@ -4,7 +4,6 @@ import time
 from typing import Any, Callable, Coroutine
 from fastapi import Request, Response
 from fastapi.routing import APIRoute
-from user_agents import parse
 import json
 
 from app.core.database import session_connect
@@ -58,6 +57,9 @@ class OperationLogRoute(APIRoute):
             if route.name in settings.IGNORE_OPERATION_FUNCTION:
                 return response
             
+            # user_agents 加载内置正则库较慢, 首次记录日志时再导入
+            from user_agents import parse
+
             user_agent = parse(request.headers.get("user-agent"))
             payload = b"{}"
             req_content_type = request.headers.get("Content-Type", "")
@@ -1,30 +1,42 @@
 # -*- coding: utf-8 -*-
 
-from pydantic import BaseModel
-from typing import TypeVar, Dict, Any, Type, Generic
+import copy
+import inspect
+import types
+from functools import lru_cache, reduce
+from operator import or_
+from pydantic import (
+    AfterValidator, BaseModel, EmailStr, NameEmail, TypeAdapter,
+    create_model, field_serializer, model_serializer, model_validator
+)
+from typing import Annotated, Iterable, List, TypeVar, Dict, Any, Type, Generic, Union, get_args, get_origin
 from sqlalchemy.orm import DeclarativeBase
+import annotated_types
 
 ModelType = TypeVar("ModelType", bound=DeclarativeBase)
 SchemaType = TypeVar("SchemaType", bound=BaseModel)
 
+# dump_list 每批校验的行数
+DUMP_CHUNK_SIZE = 500
+
 
 class Serialize(Generic[ModelType, SchemaType]):
     """
     序列化工具类，提供模型、Schema 和字典之间的转换功能
     """
-    
+
     @classmethod
     def schema_to_model(cls,schema: Type[SchemaType], model: Type[ModelType]) -> ModelType:
         """
         将 Pydantic Schema 转换为 SQLAlchemy 模型
-        
+
         参数:
         - schema (Type[SchemaType]): Pydantic Schema 实例。
         - model (Type[ModelType]): SQLAlchemy 模型类。
-            
+
         返回:
         - ModelType: SQLAlchemy 模型实例。
-            
+
         异常:
         - ValueError: 转换过程中可能抛出的异常。
         """
@@ -37,14 +49,14 @@ class Serialize(Generic[ModelType, SchemaType]):
     def model_to_dict(cls, model: Type[ModelType], schema: Type[SchemaType]) -> Dict[str, Any]:
         """
         将 SQLAlchemy 模型转换为 Pydantic Schema
-        
+
         参数:
         - model (Type[ModelType]): SQLAlchemy 模型实例。
         - schema (Type[SchemaType]): Pydantic Schema 类。
-            
+
         返回:
         - Dict[str, Any]: 包含模型数据的字典。
-            
+
         异常:
         - ValueError: 转换过程中可能抛出的异常。
         """
@@ -53,3 +65,158 @@ class Serialize(Generic[ModelType, SchemaType]):
         except Exception as e:
             raise ValueError(f"反序列化失败: {str(e)}")
 
+    @classmethod
+    def dump_list(cls, schema: Type[SchemaType], objs: Iterable[Any]) -> List[Dict[str, Any]]:
+        """
+        批量将ORM对象(或查询结果行、字典)转换为字典列表, 结果与逐行 schema.model_validate(obj).model_dump() 一致
+
+        按 DUMP_CHUNK_SIZE 行分批校验: 整个列表一次校验会同时持有全部中间模型对象, 大列表(上万行)时频繁触发
+        完整垃圾回收, 反而比逐行转换更慢。
+
+        参数:
+        - schema (Type[SchemaType]): 输出 Schema 类。
+        - objs (Iterable[Any]): ORM对象、Row 或字典序列。
+
+        返回:
+        - List[Dict[str, Any]]: 字典列表。
+        """
+        adapter = cls.adapter(schema)
+        objs = list(objs)
+        result: List[Dict[str, Any]] = []
+        for start in range(0, len(objs), DUMP_CHUNK_SIZE):
+            chunk = objs[start:start + DUMP_CHUNK_SIZE]
+            result.extend(adapter.dump_python(adapter.validate_python(chunk, from_attributes=True)))
+        return result
+
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def adapter(schema: Type[SchemaType]) -> TypeAdapter:
+        """
+        获取输出 Schema 的列表 TypeAdapter(每个 Schema 只编译一次)
+
+        参数:
+        - schema (Type[SchemaType]): 输出 Schema 类。
+
+        返回:
+        - TypeAdapter: List[输出视图模型] 的 TypeAdapter。
+        """
+        return TypeAdapter(List[_output_model(schema)])
+
+
+# Schema -> 输出视图模型
+_output_models: Dict[Type[BaseModel], Type[BaseModel]] = {}
+
+
+def _output_model(schema: Type[BaseModel]) -> Type[BaseModel]:
+    """
+    生成 Schema 的输出视图模型: 数据来自数据库, 无需重复执行输入校验。
+
+    与原 Schema 相比去掉了字段上的校验(长度等约束、AfterValidator、field_validator, EmailStr 按字符串处理),
+    保留字段默认值、别名、序列化器与模型校验器(其中可能包含输出字段的计算)。
+
+    参数:
+    - schema (Type[BaseModel]): 原 Schema 类。
+
+    返回:
+    - Type[BaseModel]: 输出视图模型。
+    """
+    if schema in _output_models:
+        return _output_models[schema]
+    # 构建期间引用自身的字段(如子表)沿用原 Schema
+    _output_models[schema] = schema
+    decorators = schema.__pydantic_decorators__
+    if decorators.computed_fields:
+        # 计算字段无法直接复制到新模型, 保持原 Schema
+        return schema
+
+    fields = {}
+    for name, field in schema.model_fields.items():
+        field = copy.copy(field)
+        field.metadata = [meta for meta in field.metadata if not _is_validation(meta)]
+        fields[name] = (_output_type(field.annotation), field)
+    validators = {
+        name: model_validator(mode=decorator.info.mode)(_unbind(decorator.func))
+        for name, decorator in decorators.model_validators.items()
+    }
+    validators.update({
+        name: field_serializer(
+            *decorator.info.fields,
+            mode=decorator.info.mode,
+            return_type=decorator.info.return_type,
+            when_used=decorator.info.when_used,
+            check_fields=False
+        )(_unbind(decorator.func))
+        for name, decorator in decorators.field_serializers.items()
+    })
+    validators.update({
+        name: model_serializer(mode=decorator.info.mode, when_used=decorator.info.when_used, return_type=decorator.info.return_type)(_unbind(decorator.func))
+        for name, decorator in decorators.model_serializers.items()
+    })
+    _output_models[schema] = create_model(
+        schema.__name__,
+        __config__=schema.model_config,
+        __doc__=schema.__doc__,
+        __module__=schema.__module__,
+        __validators__=validators,
+        **fields
+    )
+    return _output_models[schema]
+
+
+def _output_type(annotation: Any) -> Any:
+    """
+    递归转换字段类型: 去掉类型上的校验元数据, 嵌套的 Schema 替换为其输出视图模型。
+
+    参数:
+    - annotation (Any): 字段类型。
+
+    返回:
+    - Any: 转换后的字段类型。
+    """
+    origin = get_origin(annotation)
+    if origin is Annotated:
+        base, *metadata = get_args(annotation)
+        metadata = [meta for meta in metadata if not _is_validation(meta)]
+        return Annotated[(_output_type(base), *metadata)] if metadata else _output_type(base)
+    if isinstance(annotation, type):
+        if issubclass(annotation, (EmailStr, NameEmail)):
+            return str
+        if issubclass(annotation, BaseModel):
+            return _output_model(annotation)
+        return annotation
+    args = get_args(annotation)
+    if not args or origin is None:
+        return annotation
+    if origin is Union:
+        return Union[tuple(_output_type(arg) for arg in args)]
+    if origin is types.UnionType:
+        return reduce(or_, (_output_type(arg) for arg in args))
+    if origin in (list, set, frozenset, tuple, dict):
+        return origin[tuple(_output_type(arg) for arg in args)]
+    return annotation
+
+
+def _unbind(func: Any) -> Any:
+    """
+    原 Schema 上的类方法校验器已绑定到原类, 复制到输出视图模型时重新包装为类方法
+
+    参数:
+    - func (Any): 装饰器记录的函数。
+
+    返回:
+    - Any: 可用于新模型的函数或类方法。
+    """
+    return classmethod(func.__func__) if inspect.ismethod(func) else func
+
+
+def _is_validation(metadata: Any) -> bool:
+    """
+    判断字段元数据是否为只做校验的元数据(约束或 AfterValidator)
+
+    参数:
+    - metadata (Any): 字段元数据。
+
+    返回:
+    - bool: 是否为校验元数据。
+    """
+    return isinstance(metadata, (AfterValidator, annotated_types.BaseMetadata))
@@ -0,0 +1,230 @@
+# -*- coding: utf-8 -*-
+
+import mimetypes
+import os
+import re
+import threading
+from pathlib import Path
+from typing import Dict, Tuple
+
+import anyio
+from fastapi.staticfiles import StaticFiles
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse
+from starlette.types import Scope
+
+from app.config.setting import settings
+from app.core import compression
+from app.core.logger import logger
+
+# 预压缩文件编码 -> (文件后缀, 命令行预压缩级别, 首次请求时的压缩级别), 按服务端优先顺序排列;
+# brotli 最高级别 11 比级别 5 慢约 70 倍, 只在命令行预压缩时使用
+ENCODINGS: Dict[str, Tuple[str, int, int]] = {
+    encoding: variant
+    for encoding, variant in {'br': ('.br', 11, 5), 'gzip': ('.gz', 9, 9)}.items()
+    if encoding in compression.ENCODINGS
+}
+
+
+class CompressedStaticFiles(StaticFiles):
+    """
+    支持预压缩文件的静态文件服务
+
+    - 可压缩的文件(STATIC_COMPRESS_EXTENSIONS)优先返回 .br/.gz 预压缩文件, 预压缩文件由 `python main.py static`
+      生成, 缺失或与源文件不一致时在首次请求时生成, 不再由压缩中间件逐次压缩;
+    - 预压缩文件保存在静态目录之外的 STATIC_CACHE_ROOT 中, 不能被直接访问, 源文件被删除、移动或重命名后也不会再返回;
+    - 每种编码是独立的文件, 各自带有强 ETag, 均支持 304 与 Range 请求;
+    - 文件名带内容哈希或上传时间戳随机码的资源(STATIC_IMMUTABLE_PATTERN)长期缓存, 其余资源每次使用 ETag 协商。
+    """
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        # 源文件路径 -> ((修改时间, 大小), {编码: (预压缩文件路径, stat)})
+        self.__variants: Dict[str, Tuple[Tuple[float, int], Dict[str, Tuple[str, os.stat_result]]]] = {}
+        self.__lock = threading.Lock()
+        self.__immutable = re.compile(settings.STATIC_IMMUTABLE_PATTERN)
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        """
+        返回静态文件响应, 客户端接受压缩且文件可压缩时先准备好预压缩文件
+
+        参数:
+        - path (str): 文件相对路径。
+        - scope (Scope): 请求 scope。
+
+        返回:
+        - Response: 响应对象。
+        """
+        if is_compressible(path) and set(compression.accepted_encodings(Headers(scope=scope))) & ENCODINGS.keys():
+            await anyio.to_thread.run_sync(self.__prepare, path)
+        return await super().get_response(path, scope)
+
+    def file_response(self, full_path: os.PathLike, stat_result: os.stat_result, scope: Scope, status_code: int = 200) -> Response:
+        """
+        生成文件响应: 选择客户端接受的预压缩文件, 并设置缓存相关响应头
+
+        参数:
+        - full_path (os.PathLike): 源文件路径。
+        - stat_result (os.stat_result): 源文件 stat。
+        - scope (Scope): 请求 scope。
+        - status_code (int): 状态码。
+
+        返回:
+        - Response: 文件响应或 304 响应。
+        """
+        request_headers = Headers(scope=scope)
+        full_path = str(full_path)
+        headers = {'Cache-Control': 'public, max-age=31536000, immutable' if self.__immutable.search(full_path) else 'no-cache'}
+        path, variant_stat = full_path, stat_result
+        if is_compressible(full_path):
+            headers['Vary'] = 'Accept-Encoding'
+            cached = self.__variants.get(full_path)
+            if cached and cached[0] == (stat_result.st_mtime, stat_result.st_size):
+                accepted = compression.accepted_encodings(request_headers)
+                for encoding, (variant_path, stat) in cached[1].items():
+                    if encoding in accepted:
+                        path, variant_stat = variant_path, stat
+                        headers['Content-Encoding'] = encoding
+                        break
+
+        response = FileResponse(
+            path,
+            status_code=status_code,
+            headers=headers,
+            media_type=mimetypes.guess_type(full_path)[0] or 'text/plain',
+            stat_result=variant_stat
+        )
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+        return response
+
+    def __prepare(self, path: str) -> None:
+        """
+        查找(必要时生成)文件的预压缩文件并缓存其路径和 stat
+
+        参数:
+        - path (str): 文件相对路径。
+        """
+        full_path, stat_result = self.lookup_path(path)
+        if stat_result is None or not os.path.isfile(full_path):
+            return
+        key = (stat_result.st_mtime, stat_result.st_size)
+        cached = self.__variants.get(full_path)
+        if cached and cached[0] == key:
+            return
+        with self.__lock:
+            cached = self.__variants.get(full_path)
+            if cached and cached[0] == key:
+                return
+            try:
+                variants = compress_file(Path(full_path), stat_result)
+            except OSError as e:
+                # 目录只读等情况下退回由压缩中间件压缩
+                logger.warning(f"生成预压缩文件失败: {full_path}, {str(e)}")
+                variants = {}
+            self.__variants[full_path] = (key, variants)
+
+
+def is_compressible(path: str) -> bool:
+    """
+    判断文件是否需要预压缩
+
+    参数:
+    - path (str): 文件路径。
+
+    返回:
+    - bool: 文件后缀在 STATIC_COMPRESS_EXTENSIONS 中时为 True。
+    """
+    return os.path.splitext(path)[1].lower() in settings.STATIC_COMPRESS_EXTENSIONS
+
+
+def variant_path(path: Path, suffix: str) -> Path:
+    """
+    获取源文件的预压缩文件路径(STATIC_CACHE_ROOT 下与静态目录相同的相对路径)
+
+    参数:
+    - path (Path): 源文件路径(位于 STATIC_ROOT 下)。
+    - suffix (str): 预压缩文件后缀。
+
+    返回:
+    - Path: 预压缩文件路径。
+    """
+    relative = os.path.relpath(os.path.realpath(path), os.path.realpath(settings.STATIC_ROOT))
+    return settings.STATIC_CACHE_ROOT.joinpath(relative + suffix)
+
+
+def compress_file(path: Path, stat_result: os.stat_result | None = None, best: bool = False) -> Dict[str, Tuple[str, os.stat_result]]:
+    """
+    生成文件的预压缩文件, 已存在且与源文件修改时间一致的预压缩文件直接复用(使用最高压缩级别时总是重新生成)
+
+    小于 COMPRESS_MIN_SIZE 或压缩后没有变小的文件不生成预压缩文件。
+
+    参数:
+    - path (Path): 源文件路径。
+    - stat_result (os.stat_result | None): 源文件 stat, 为空时重新获取。
+    - best (bool): 是否使用最高压缩级别(耗时较长, 用于命令行预压缩)。
+
+    返回:
+    - Dict[str, Tuple[str, os.stat_result]]: 编码 -> (预压缩文件路径, stat)。
+    """
+    stat_result = stat_result or path.stat()
+    variants: Dict[str, Tuple[str, os.stat_result]] = {}
+    if stat_result.st_size < settings.COMPRESS_MIN_SIZE:
+        return variants
+    data = None
+    for encoding, (suffix, best_level, level) in ENCODINGS.items():
+        target = variant_path(path, suffix)
+        try:
+            variant_stat = target.stat()
+        except FileNotFoundError:
+            variant_stat = None
+        # 预压缩文件的修改时间与源文件一致才有效, 源文件被替换(即使换成更早的文件)后重新生成
+        if best or variant_stat is None or variant_stat.st_mtime_ns != stat_result.st_mtime_ns:
+            data = path.read_bytes() if data is None else data
+            content = compression.compress(encoding, data, best_level if best else level)
+            if len(content) >= len(data):
+                target.unlink(missing_ok=True)
+                continue
+            # 先写临时文件再替换, 避免并发请求读到写了一半的文件
+            target.parent.mkdir(parents=True, exist_ok=True)
+            temp_path = target.with_name(f'{target.name}.{os.getpid()}.tmp')
+            temp_path.write_bytes(content)
+            os.utime(temp_path, ns=(stat_result.st_atime_ns, stat_result.st_mtime_ns))
+            os.replace(temp_path, target)
+            variant_stat = target.stat()
+        variants[encoding] = (str(target), variant_stat)
+    return variants
+
+
+def compress_directory(directory: Path) -> Tuple[int, int, int]:
+    """
+    为目录下所有可压缩的文件以最高压缩级别生成预压缩文件, 并删除源文件已不存在的预压缩文件
+
+    参数:
+    - directory (Path): 目录。
+
+    返回:
+    - Tuple[int, int, int]: (文件数, 源文件总字节数, 最小预压缩文件总字节数)。
+    """
+    count, original, compressed = 0, 0, 0
+    for path in sorted(directory.rglob('*')):
+        if not path.is_file() or not is_compressible(path.name):
+            continue
+        stat_result = path.stat()
+        variants = compress_file(path, stat_result, best=True)
+        if variants:
+            count += 1
+            original += stat_result.st_size
+            compressed += min(stat.st_size for _, stat in variants.values())
+
+    suffixes = tuple(suffix for suffix, *_ in ENCODINGS.values())
+    for path in sorted(settings.STATIC_CACHE_ROOT.rglob('*'), reverse=True):
+        relative = path.relative_to(settings.STATIC_CACHE_ROOT)
+        if path.is_dir():
+            # 逆序遍历, 子目录先于父目录处理
+            if not any(path.iterdir()):
+                path.rmdir()
+        elif not path.name.endswith(suffixes) or not settings.STATIC_ROOT.joinpath(str(relative)[:-len(path.suffix)]).is_file():
+            path.unlink()
+    return count, original, compressed
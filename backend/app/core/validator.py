@@ -9,6 +9,12 @@ from app.common.constant import RET
 from app.core.exceptions import CustomException
 
 
+# 手机号格式
+MOBILE_REGEX = r'^1(3\d|4[4-9]|5[0-35-9]|6[67]|7[013-8]|8[0-9]|9[0-9])\d{8}$'
+# 邮箱格式(宽松校验)
+EMAIL_REGEX = r'^[^@\s]+@[^@\s]+\.[^@\s]+$'
+
+
 # 自定义日期时间字符串类型
 DateTimeStr = Annotated[
     datetime,
@@ -102,9 +108,7 @@ def mobile_validator(value: Optional[str]) -> Optional[str]:
     if len(value) != 11 or not value.isdigit():
         raise CustomException(code=RET.ERROR.code, msg="手机号格式不正确")
 
-    regex = r'^1(3\d|4[4-9]|5[0-35-9]|6[67]|7[013-8]|8[0-9]|9[0-9])\d{8}$'
-
-    if not re.match(regex, value):
+    if not re.match(MOBILE_REGEX, value):
         raise CustomException(code=RET.ERROR.code, msg="手机号格式不正确")
 
     return value
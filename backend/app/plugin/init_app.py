@@ -1,9 +1,12 @@
 # -*- coding: utf-8 -*-
 
-from starlette.responses import HTMLResponse
+import asyncio
+from contextlib import suppress
+from functools import partial
+from starlette.requests import Request
+from starlette.responses import HTMLResponse, Response
 from typing import Any, AsyncGenerator
 from fastapi import FastAPI
-from fastapi.staticfiles import StaticFiles
 from fastapi.concurrency import asynccontextmanager
 from fastapi.openapi.docs import (
     get_redoc_html,
@@ -13,14 +16,21 @@ from fastapi.openapi.docs import (
 
 from app.config.setting import settings
 from app.core.ap_scheduler import SchedulerUtil
+from app.core.database import warmup_db_pool, warmup_redis_pool
 from app.core.logger import logger
+from app.core.static_files import CompressedStaticFiles
 from app.utils.common_util import import_module, import_modules_async
 from app.core.exceptions import handle_exception
 from app.scripts.initialize import InitializeData
 from app.api.v1.module_system.params.service import ParamsService
 from app.api.v1.module_system.dict.service import DictDataService
+from app.api.v1.module_monitor.online.service import OnlineService
 from app.api.v1 import router
 from app.utils.console import run as console_run
+from app.utils.captcha_util import CaptchaPool
+from app.utils.hash_bcrpy_util import PwdUtil
+from app.plugin.startup import StartupOrchestrator
+from app.plugin.openapi import get_openapi_document
 
 
 @asynccontextmanager
@@ -35,17 +45,27 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[Any, Any]:
     - AsyncGenerator[Any, Any]: 生命周期上下文生成器。
     """
     logger.info(settings.BANNER + '\n' + f'{settings.TITLE} 服务开始启动...')
-    
-    await InitializeData().init_db()
-    logger.info(f"✅️ 初始化 {settings.DATABASE_TYPE} 数据库初始化完成...")
-    await import_modules_async(modules=settings.EVENT_LIST, desc="全局事件", app=app, status=True)
-    logger.info("✅️ 初始化全局事件完成...")
-    await ParamsService().init_config_service(redis=app.state.redis)
-    logger.info("✅️ 初始化Redis系统配置完成...")
-    await DictDataService().init_dict_service(redis=app.state.redis)
-    logger.info('✅️ 初始化Redis数据字典完成...')
-    await SchedulerUtil.init_system_scheduler()
-    logger.info('✅️ 初始化定时任务完成...')
+
+    # 启动阶段按依赖并发执行: Redis 与 MongoDB 同时连接, 系统配置与数据字典同时写入缓存
+    startup = StartupOrchestrator()
+    for event in settings.EVENT_LIST:
+        if event:
+            startup.add(event.rsplit('.', 1)[-1], partial(import_module(event, desc="全局事件"), app=app, status=True))
+    redis_depends = ['redis_connect'] if settings.REDIS_ENABLE else []
+    startup.add('warmup_db_pool', partial(warmup_db_pool, size=settings.WARMUP_CONNECTIONS))
+    if settings.REDIS_ENABLE:
+        startup.add('warmup_redis_pool', lambda: warmup_redis_pool(redis=app.state.redis, size=settings.WARMUP_CONNECTIONS), depends=redis_depends)
+    # 多 worker 时借助 Redis 锁只由一个进程执行初始化
+    startup.add('init_db', lambda: InitializeData().init_db(redis=getattr(app.state, 'redis', None)), depends=redis_depends)
+    startup.add('init_config', lambda: ParamsService().init_config_service(redis=app.state.redis), depends=['init_db', *redis_depends])
+    startup.add('init_dict', lambda: DictDataService().init_dict_service(redis=app.state.redis), depends=['init_db', *redis_depends])
+    startup.add('init_scheduler', SchedulerUtil.init_system_scheduler, depends=['init_db'])
+    startup.add('activity_flusher', partial(start_activity_flusher, app=app), depends=redis_depends)
+    await startup.run()
+    # 验证码池后台线程持续占用 CPU 渲染图片, 在其余阶段完成后再启动
+    if settings.CAPTCHA_ENABLE:
+        CaptchaPool.start()
+        logger.info('✅️ 初始化验证码池完成...')
 
     logger.info(f'✅️ {settings.TITLE} 服务成功启动...')
     # 控制台输出优化：展示服务信息与文档地址
@@ -53,10 +73,24 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[Any, Any]:
 
     yield
 
+    app.state.activity_task.cancel()
+    with suppress(asyncio.CancelledError):
+        await app.state.activity_task
     await import_modules_async(modules=settings.EVENT_LIST, desc="全局事件", app=app, status=False)
     await SchedulerUtil.close_system_scheduler()
+    CaptchaPool.stop()
+    PwdUtil.shutdown()
     logger.info(f'{settings.TITLE} 服务关闭...')
 
+def start_activity_flusher(app: FastAPI) -> None:
+    """
+    启动会话活跃时间写入任务。
+
+    参数:
+    - app (FastAPI): FastAPI 应用实例。
+    """
+    app.state.activity_task = asyncio.create_task(OnlineService.run_activity_flusher_service(redis=app.state.redis))
+
 def register_middlewares(app: FastAPI) -> None:
     """
     注册全局中间件。
@@ -95,7 +129,8 @@ def register_routers(app: FastAPI) -> None:
     返回:
     - None
     """
-    app.include_router(router=router)
+    # 根路由没有前缀和依赖, 直接复用已构建的路由对象, 避免 include_router 再次重建全部路由
+    app.router.routes.extend(router.routes)
 
 def register_files(app: FastAPI) -> None:
     """
@@ -111,11 +146,11 @@ def register_files(app: FastAPI) -> None:
     if settings.STATIC_ENABLE:
         # 确保日志目录存在
         settings.STATIC_ROOT.mkdir(parents=True, exist_ok=True)
-        app.mount(path=settings.STATIC_URL, app=StaticFiles(directory=settings.STATIC_ROOT), name=settings.STATIC_DIR)
+        app.mount(path=settings.STATIC_URL, app=CompressedStaticFiles(directory=settings.STATIC_ROOT), name=settings.STATIC_DIR)
 
 def reset_api_docs(app: FastAPI) -> None:
     """
-    使用本地静态资源自定义 API 文档页面（Swagger UI 与 ReDoc）。
+    使用本地静态资源自定义 API 文档页面（Swagger UI 与 ReDoc）, 并改为返回预生成的 OpenAPI 文档。
 
     参数:
     - app (FastAPI): FastAPI 应用实例。
@@ -123,6 +158,15 @@ def reset_api_docs(app: FastAPI) -> None:
     返回:
     - None
     """
+    if app.openapi_url:
+        # 替换 FastAPI 默认的 OpenAPI 路由: 默认路由每次请求都重新序列化(并由 GZip 中间件重新压缩)整个文档
+        app.router.routes[:] = [
+            route for route in app.router.routes if getattr(route, "path", None) != app.openapi_url
+        ]
+
+        @app.get(app.openapi_url, include_in_schema=False)
+        async def openapi(request: Request) -> Response:
+            return get_openapi_document(app).response(request)
 
     @app.get(settings.DOCS_URL, include_in_schema=False)
     async def custom_swagger_ui_html() -> HTMLResponse:
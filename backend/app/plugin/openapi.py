@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+
+import gzip
+import hashlib
+import json
+from pathlib import Path
+import fastapi
+from fastapi import FastAPI
+from fastapi.routing import APIRoute
+from starlette.requests import Request
+from starlette.responses import Response
+
+from app.config.setting import settings
+from app.core.logger import logger
+
+
+class OpenAPIDocument:
+    """
+    预生成的 OpenAPI 文档
+
+    文档只生成一次并以 gzip 压缩后的字节串保存, 请求时直接返回(客户端不支持 gzip 时才解压, 且只解压一次),
+    并附带 ETag, 客户端缓存未过期时返回 304。文档 info 中的 x-fingerprint 记录生成时应用的路由指纹,
+    用于判断构建产物是否过期。
+    """
+
+    def __init__(self, content: bytes) -> None:
+        """
+        初始化 OpenAPI 文档
+
+        参数:
+        - content (bytes): gzip 压缩后的 OpenAPI JSON 字节串。
+        """
+        self.content = content
+        self.etag = f'"{hashlib.sha256(content).hexdigest()[:32]}"'
+        self.__raw: bytes | None = None
+
+    @property
+    def raw(self) -> bytes:
+        """未压缩的 OpenAPI JSON 字节串"""
+        if self.__raw is None:
+            self.__raw = gzip.decompress(self.content)
+        return self.__raw
+
+    @property
+    def fingerprint(self) -> str | None:
+        """生成文档时应用的路由指纹"""
+        try:
+            return json.loads(self.raw).get("info", {}).get("x-fingerprint")
+        except ValueError:
+            return None
+
+    @classmethod
+    def build(cls, app: FastAPI) -> "OpenAPIDocument":
+        """
+        由应用生成 OpenAPI 文档, 序列化方式与 FastAPI 默认的 /openapi.json 一致
+
+        参数:
+        - app (FastAPI): FastAPI 应用实例。
+
+        返回:
+        - OpenAPIDocument: OpenAPI 文档。
+        """
+        # 与默认路由一致: 设置了 root_path 时将其加入 servers
+        if app.root_path and app.root_path_in_servers and app.root_path not in {server.get("url") for server in app.servers}:
+            app.servers.insert(0, {"url": app.root_path})
+            app.openapi_schema = None
+        schema = app.openapi()
+        schema = {**schema, "info": {**schema["info"], "x-fingerprint": route_fingerprint(app)}}
+        raw = json.dumps(
+            schema, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")
+        ).encode("utf-8")
+        # mtime 固定为 0, 相同内容生成的压缩文件及 ETag 不变
+        document = cls(gzip.compress(raw, compresslevel=9, mtime=0))
+        document.__raw = raw
+        return document
+
+    def save(self, path: Path) -> None:
+        """
+        保存为构建产物
+
+        参数:
+        - path (Path): 文件路径。
+        """
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(self.content)
+
+    def response(self, request: Request) -> Response:
+        """
+        生成文档响应
+
+        参数:
+        - request (Request): 请求对象。
+
+        返回:
+        - Response: 304 响应或 OpenAPI JSON 响应。
+        """
+        headers = {"ETag": self.etag, "Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+        if_none_match = request.headers.get("if-none-match", "")
+        if self.etag in [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")] or if_none_match.strip() == "*":
+            return Response(status_code=304, headers=headers)
+        if "gzip" in request.headers.get("accept-encoding", ""):
+            headers["Content-Encoding"] = "gzip"
+            return Response(content=self.content, media_type="application/json", headers=headers)
+        return Response(content=self.raw, media_type="application/json", headers=headers)
+
+
+def route_fingerprint(app: FastAPI) -> str:
+    """
+    计算应用的路由指纹: 应用版本、FastAPI 版本及每个路由的方法、路径、名称、处理函数和响应模型
+
+    参数:
+    - app (FastAPI): FastAPI 应用实例。
+
+    返回:
+    - str: 指纹(sha256 前 16 位)。
+    """
+    items = [app.version, fastapi.__version__]
+    for route in app.routes:
+        if isinstance(route, APIRoute) and route.include_in_schema:
+            endpoint = f"{route.endpoint.__module__}.{route.endpoint.__qualname__}"
+            items.append(f"{','.join(sorted(route.methods))} {route.path} {route.name} {endpoint} {route.response_model!r}")
+    return hashlib.sha256("\n".join(items).encode("utf-8")).hexdigest()[:16]
+
+
+def get_openapi_document(app: FastAPI) -> OpenAPIDocument:
+    """
+    获取应用的 OpenAPI 文档(每个进程只加载或生成一次)
+
+    非调试模式下优先读取构建产物 OPENAPI_FILE(由 `python main.py openapi` 生成), 不存在或路由指纹与当前应用
+    不一致(升级后未重新生成)时在首次请求时生成; 调试模式下路由经常变化, 始终由当前应用生成, 避免返回过期的文档。
+
+    参数:
+    - app (FastAPI): FastAPI 应用实例。
+
+    返回:
+    - OpenAPIDocument: OpenAPI 文档。
+    """
+    document = getattr(app.state, "openapi_document", None)
+    if document is None:
+        if not settings.DEBUG and settings.OPENAPI_FILE.is_file():
+            document = OpenAPIDocument(settings.OPENAPI_FILE.read_bytes())
+            if document.fingerprint == route_fingerprint(app):
+                logger.info(f"已加载预生成的 OpenAPI 文档: {settings.OPENAPI_FILE}")
+            else:
+                logger.warning(f"预生成的 OpenAPI 文档与当前路由不一致, 已重新生成, 请执行 `python main.py openapi` 更新: {settings.OPENAPI_FILE}")
+                document = None
+        if document is None:
+            document = OpenAPIDocument.build(app)
+        app.state.openapi_document = document
+    return document
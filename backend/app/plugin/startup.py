@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+
+import asyncio
+import inspect
+import time
+from typing import Any, Callable, Dict, List, Sequence
+
+from app.core.logger import logger
+
+
+class StartupPhase:
+    """启动阶段"""
+
+    def __init__(self, name: str, func: Callable[[], Any], depends: Sequence[str] = ()) -> None:
+        """
+        初始化启动阶段
+
+        参数:
+        - name (str): 阶段名称。
+        - func (Callable[[], Any]): 阶段函数, 同步函数或协程函数。
+        - depends (Sequence[str]): 依赖的阶段名称。
+        """
+        self.name = name
+        self.func = func
+        self.depends = tuple(depends)
+        self.started = 0.0  # 开始时间(相对启动开始, 秒)
+        self.elapsed = 0.0  # 耗时(秒)
+
+
+class StartupOrchestrator:
+    """
+    启动编排器
+
+    按声明的依赖关系执行启动阶段: 每个阶段在其依赖全部完成后立即开始, 互不依赖的阶段并发执行;
+    任一阶段失败时取消其余阶段并抛出异常。执行结束后输出各阶段耗时。
+    """
+
+    def __init__(self) -> None:
+        """初始化启动编排器"""
+        self.__phases: Dict[str, StartupPhase] = {}
+
+    def add(self, name: str, func: Callable[[], Any], depends: Sequence[str] = ()) -> None:
+        """
+        注册启动阶段
+
+        参数:
+        - name (str): 阶段名称。
+        - func (Callable[[], Any]): 阶段函数, 同步函数或协程函数。
+        - depends (Sequence[str]): 依赖的阶段名称, 必须已注册。
+
+        异常:
+        - ValueError: 阶段重名或依赖的阶段未注册时抛出。
+        """
+        if name in self.__phases:
+            raise ValueError(f"启动阶段重复注册: {name}")
+        missing = [depend for depend in depends if depend not in self.__phases]
+        if missing:
+            raise ValueError(f"启动阶段 {name} 依赖的阶段未注册: {', '.join(missing)}")
+        self.__phases[name] = StartupPhase(name=name, func=func, depends=depends)
+
+    async def run(self) -> List[StartupPhase]:
+        """
+        执行全部启动阶段
+
+        返回:
+        - List[StartupPhase]: 按注册顺序排列的阶段及其耗时。
+        """
+        start = time.perf_counter()
+        tasks: Dict[str, asyncio.Task] = {}
+
+        async def run_phase(phase: StartupPhase) -> None:
+            # 依赖只能是先注册的阶段, 对应任务已创建
+            await asyncio.gather(*(tasks[depend] for depend in phase.depends))
+            phase.started = time.perf_counter() - start
+            result = phase.func()
+            if inspect.isawaitable(result):
+                await result
+            phase.elapsed = time.perf_counter() - start - phase.started
+
+        for name, phase in self.__phases.items():
+            tasks[name] = asyncio.create_task(run_phase(phase), name=f'startup:{name}')
+        try:
+            await asyncio.gather(*tasks.values())
+        except BaseException:
+            for task in tasks.values():
+                task.cancel()
+            await asyncio.gather(*tasks.values(), return_exceptions=True)
+            raise
+        phases = list(self.__phases.values())
+        self.__log_timing(phases, time.perf_counter() - start)
+        return phases
+
+    @staticmethod
+    def __log_timing(phases: List[StartupPhase], total: float) -> None:
+        """
+        输出各阶段耗时
+
+        参数:
+        - phases (List[StartupPhase]): 启动阶段列表。
+        - total (float): 总耗时(秒)。
+        """
+        lines = [f"{'阶段':<20}{'开始(ms)':>10}{'耗时(ms)':>10}  依赖"]
+        for phase in phases:
+            lines.append(
+                f"{phase.name:<22}{phase.started * 1000:>10.1f}{phase.elapsed * 1000:>10.1f}  {', '.join(phase.depends) or '-'}"
+            )
+        lines.append(f"{'合计':<20}{'':>10}{total * 1000:>10.1f}")
+        logger.info("⏱️ 启动阶段耗时:\n" + "\n".join(lines))
@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+
+"""
+登录验证码基准: 单张渲染耗时与验证码池的取用耗时
+
+    python -m app.scripts.bench_captcha [--renders 500] [--seconds 2]
+
+对比项:
+- 原实现: 每次从磁盘加载字体, PNG 以 optimize=True 编码(在本脚本中通过替换字体加载与 PNG 编码参数还原);
+- 当前实现: 缓存字体, PNG 以 compress_level=1 编码;
+- 从已补满的验证码池取用;
+- 持续取用: 渲染子进程同时补充, 池为空时当场渲染。
+"""
+
+import argparse
+import time
+from contextlib import contextmanager
+from typing import Iterator
+from unittest import mock
+
+from PIL import Image, ImageFont
+
+from app.config.setting import settings
+from app.utils.captcha_util import CaptchaPool, CaptchaUtil
+
+
+@contextmanager
+def legacy_render() -> Iterator[None]:
+    """还原原实现的渲染方式: 每次加载字体, PNG 以 optimize=True 编码"""
+    save = Image.Image.save
+
+    def optimized_save(image, fp, format=None, **params):
+        params.pop('compress_level', None)
+        return save(image, fp, format=format, optimize=True, **params)
+
+    with mock.patch.object(CaptchaUtil, 'get_font', lambda path, size: ImageFont.truetype(font=path, size=size)), \
+            mock.patch.object(Image.Image, 'save', optimized_save):
+        yield
+
+
+def render_rate(renders: int) -> float:
+    """
+    连续渲染验证码
+
+    参数:
+    - renders (int): 渲染次数。
+
+    返回:
+    - float: 单张平均耗时毫秒。
+    """
+    CaptchaUtil.captcha_arithmetic()
+    start = time.perf_counter()
+    for _ in range(renders):
+        CaptchaUtil.captcha_arithmetic()
+    return (time.perf_counter() - start) / renders * 1000
+
+
+def main(renders: int, seconds: float) -> None:
+    with legacy_render():
+        legacy = render_rate(renders)
+    current = render_rate(renders)
+    print(f'渲染(原实现: 每次加载字体, optimize=True)  {legacy:7.3f} ms/张  {1000 / legacy:9.0f} 张/秒')
+    print(f'渲染(缓存字体, compress_level=1)           {current:7.3f} ms/张  {1000 / current:9.0f} 张/秒')
+
+    CaptchaPool.start()
+    try:
+        while CaptchaPool.size() < settings.CAPTCHA_POOL_SIZE:
+            time.sleep(0.05)
+        count, start = 0, time.perf_counter()
+        while count < settings.CAPTCHA_POOL_SIZE and CaptchaPool.pop() is not None:
+            count += 1
+        elapsed = time.perf_counter() - start
+        print(f'从已补满的池中取用 {count} 张                 {elapsed / count * 1e6:7.3f} us/张  {count / elapsed:9.0f} 张/秒')
+
+        # 等待补满后持续取用, 池为空时与服务一样当场渲染
+        while CaptchaPool.size() < settings.CAPTCHA_POOL_SIZE:
+            time.sleep(0.05)
+        count, misses, start = 0, 0, time.perf_counter()
+        while time.perf_counter() - start < seconds:
+            if CaptchaPool.pop() is None:
+                misses += 1
+                CaptchaUtil.captcha_arithmetic()
+            count += 1
+        print(f'持续取用 {seconds:.0f} 秒(子进程补充)               {count / seconds:9.0f} 张/秒, 池为空 {misses} 次')
+    finally:
+        CaptchaPool.stop()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='登录验证码基准')
+    parser.add_argument('--renders', type=int, default=500)
+    parser.add_argument('--seconds', type=float, default=2)
+    args = parser.parse_args()
+    main(args.renders, args.seconds)
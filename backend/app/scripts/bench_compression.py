@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*-
+
+"""
+响应压缩基准: 每个请求经过压缩中间件的 CPU 耗时与传输大小
+
+    python -m app.scripts.bench_compression [--repeat 20]
+
+原实现为 GZipMiddleware(minimum_size=1000, compresslevel=9), 当前实现为 CustomCompressionMiddleware;
+分别以仅支持 gzip、支持 br、支持 zstd 的客户端请求, 直接调用 ASGI 应用, 不经过网络与 HTTP 客户端。
+流式对话接口按 stream 策略逐块压缩, 输出各分块到达的时间。
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import time
+from typing import Any, Dict, List, Tuple
+
+from fastapi import FastAPI
+from fastapi.responses import Response, StreamingResponse
+from starlette.middleware.gzip import GZipMiddleware
+from starlette.types import ASGIApp
+
+from app.config.setting import settings
+from app.core.middlewares import CustomCompressionMiddleware
+
+CLIENTS = ['gzip', 'br, gzip', 'zstd, br, gzip']
+
+
+def user_rows(count: int) -> bytes:
+    """生成用户列表 JSON 响应体"""
+    rows = [
+        {
+            'id': i, 'username': f'user{i}', 'name': f'用户{i}', 'email': f'user{i}@example.com', 'mobile': f'138{i:08d}',
+            'status': '0', 'dept': {'id': i % 20, 'name': f'部门{i % 20}'}, 'created_at': '2025-10-19 12:00:00',
+            'description': None, 'roles': [{'id': 1, 'name': '普通用户'}]
+        }
+        for i in range(count)
+    ]
+    return json.dumps({'code': 0, 'msg': '成功', 'data': rows}, ensure_ascii=False).encode()
+
+
+def create_inner_app() -> FastAPI:
+    """
+    创建被测应用: 不同大小的 JSON、已压缩格式的下载与图片、流式对话
+
+    返回:
+    - FastAPI: 应用实例。
+    """
+    payloads = {'json_5k': user_rows(20), 'json_190k': user_rows(750), 'json_1.3m': user_rows(5000)}
+    # xlsx(zip 容器)与 PNG 已经压缩, 熵接近随机数据
+    binary = os.urandom(300_000)
+    app = FastAPI()
+
+    @app.get('/json/{name}')
+    async def json_payload(name: str) -> Response:
+        return Response(payloads[name], media_type='application/json')
+
+    @app.get('/xlsx')
+    async def xlsx() -> StreamingResponse:
+        chunks = (binary[i:i + 65536] for i in range(0, len(binary), 65536))
+        return StreamingResponse(chunks, media_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
+
+    @app.get('/png')
+    async def png() -> Response:
+        return Response(binary, media_type='image/png')
+
+    @app.get('/chat')
+    async def chat() -> StreamingResponse:
+        async def generate():
+            for i in range(20):
+                yield f'token{i} '.encode() * 3
+                await asyncio.sleep(0.01)
+        return StreamingResponse(generate(), media_type='text/plain; charset=utf-8')
+
+    return app
+
+
+async def request(app: ASGIApp, path: str, accept_encoding: str) -> Tuple[Dict[str, str], List[Tuple[float, int]]]:
+    """
+    直接调用 ASGI 应用完成一次 GET 请求
+
+    参数:
+    - app (ASGIApp): ASGI 应用。
+    - path (str): 请求路径。
+    - accept_encoding (str): Accept-Encoding 请求头。
+
+    返回:
+    - Tuple[Dict[str, str], List[Tuple[float, int]]]: (响应头, [(分块到达时间秒, 分块字节数)])。
+    """
+    headers: Dict[str, str] = {}
+    chunks: List[Tuple[float, int]] = []
+    start = time.perf_counter()
+
+    async def receive() -> Dict[str, Any]:
+        await asyncio.sleep(3600)
+        return {'type': 'http.disconnect'}
+
+    async def send(message: Dict[str, Any]) -> None:
+        if message['type'] == 'http.response.start':
+            headers.update({key.decode(): value.decode() for key, value in message['headers']})
+        elif message.get('body'):
+            chunks.append((time.perf_counter() - start, len(message['body'])))
+
+    scope = {
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET', 'scheme': 'http',
+        'path': path, 'raw_path': path.encode(), 'root_path': '', 'query_string': b'',
+        'headers': [(b'host', b'bench'), (b'accept-encoding', accept_encoding.encode())],
+        'client': ('127.0.0.1', 1), 'server': ('bench', 80)
+    }
+    await app(scope, receive, send)
+    return headers, chunks
+
+
+async def main(repeat: int) -> None:
+    settings.COMPRESS_ROUTE_POLICY = {'/chat': 'stream'}
+    inner = create_inner_app()
+    apps = {
+        '原实现(gzip 9)': GZipMiddleware(inner, minimum_size=1000, compresslevel=9),
+        '当前实现': CustomCompressionMiddleware(inner),
+    }
+    for path in ['/json/json_5k', '/json/json_190k', '/json/json_1.3m', '/xlsx', '/png']:
+        for name, app in apps.items():
+            for client in CLIENTS if name == '当前实现' else CLIENTS[:1]:
+                await request(app, path, client)
+                start = time.process_time()
+                for _ in range(repeat):
+                    headers, chunks = await request(app, path, client)
+                elapsed = (time.process_time() - start) / repeat * 1000
+                encoding = headers.get('content-encoding', '-')
+                print(f'{path:16s} {name:12s} Accept-Encoding: {client:15s} {encoding:5s} {sum(size for _, size in chunks):8d} 字节  CPU {elapsed:6.2f} ms/请求')
+
+    for name, app in apps.items():
+        headers, chunks = await request(app, '/chat', CLIENTS[-1])
+        print(
+            f'/chat            {name:12s} 编码 {headers.get("content-encoding", "-"):5s} 分块 {len(chunks):2d} 个, '
+            f'首块 {chunks[0][0] * 1000:4.0f} ms, 末块 {chunks[-1][0] * 1000:4.0f} ms'
+        )
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='响应压缩基准')
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(main(args.repeat))
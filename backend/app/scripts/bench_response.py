@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+
+"""
+JSON 响应序列化基准: 分页用户列表的 SuccessResponse 渲染耗时
+
+    python -m app.scripts.bench_response [--rows 10000] [--repeat 10]
+
+原实现先构造 ResponseSchema 模型再 model_dump 为字典, 由 Starlette JSONResponse(json.dumps)序列化, 本脚本中按原方式
+还原; 当前实现直接构造响应字典, 由 pydantic-core 一次序列化。两者输出比较一致后再输出耗时。
+"""
+
+import argparse
+import json
+from typing import Any, Dict
+
+from fastapi.responses import JSONResponse
+
+from app.common.response import ResponseSchema, SuccessResponse
+from app.scripts.benchmark import measure
+
+
+class LegacySuccessResponse(JSONResponse):
+    """原实现的成功响应"""
+
+    def __init__(self, data: Any) -> None:
+        super().__init__(content=ResponseSchema(data=data).model_dump())
+
+
+def user_page(rows: int) -> Dict[str, Any]:
+    """
+    生成用户列表分页数据(字段与用户列表接口一致)
+
+    参数:
+    - rows (int): 行数。
+
+    返回:
+    - Dict[str, Any]: 分页数据。
+    """
+    items = [
+        {
+            'id': i, 'username': f'user{i}', 'name': '用户名称', 'email': f'user{i}@example.com', 'mobile': '13800000000',
+            'gender': '0', 'status': True, 'is_superuser': False, 'avatar': None, 'last_login': None,
+            'created_at': '2024-01-01 00:00:00', 'updated_at': '2024-01-01 00:00:00', 'description': '描述' * 5,
+            'dept': {'id': 1, 'name': '集团总公司'}, 'roles': [{'id': 1, 'name': '管理员'}], 'positions': []
+        }
+        for i in range(rows)
+    ]
+    return {'items': items, 'total': rows, 'page_no': 1, 'page_size': rows, 'has_next': False}
+
+
+def main(rows: int, repeat: int) -> None:
+    page = user_page(rows)
+    legacy, legacy_body = measure(lambda: LegacySuccessResponse(page).body, repeat)
+    current, body = measure(lambda: SuccessResponse(data=page).body, repeat)
+    assert json.loads(legacy_body) == json.loads(body), '输出与原实现不一致'
+    identical = '字节一致' if legacy_body == body else '内容一致'
+    print(f'原实现 SuccessResponse   {legacy:8.1f} ms  {len(legacy_body)} 字节')
+    print(f'当前 SuccessResponse     {current:8.1f} ms  {len(body)} 字节 ({identical})')
+    try:
+        import orjson
+    except ImportError:
+        return
+    content = {'code': 0, 'msg': '成功', 'data': page, 'status_code': 200, 'success': True}
+    reference, _ = measure(lambda: orjson.dumps(content), repeat)
+    print(f'orjson(仅作参考)        {reference:8.1f} ms')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='JSON 响应序列化基准')
+    parser.add_argument('--rows', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=10)
+    args = parser.parse_args()
+    main(args.rows, args.repeat)
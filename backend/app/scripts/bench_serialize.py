@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+
+"""
+列表序列化基准: 逐行 schema.model_validate(obj).model_dump() 与 Serialize.dump_list 对比
+
+    python -m app.scripts.bench_serialize [--users 5000] [--logs 10000] [--repeat 5]
+
+首次运行时在临时 SQLite 数据库中初始化数据并写入测试用户与操作日志, 两种方式的输出逐项比较一致后再输出耗时。
+"""
+
+import argparse
+import asyncio
+
+from app.scripts.benchmark import measure, use_bench_database
+
+use_bench_database()
+
+from sqlalchemy import func, insert, select  # noqa: E402
+
+from app.core.database import AsyncSessionLocal  # noqa: E402
+from app.core.serialize import Serialize  # noqa: E402
+from app.scripts.initialize import InitializeData  # noqa: E402
+from app.api.v1.module_system.auth.schema import AuthSchema  # noqa: E402
+from app.api.v1.module_system.log.crud import OperationLogCRUD  # noqa: E402
+from app.api.v1.module_system.log.model import OperationLogModel  # noqa: E402
+from app.api.v1.module_system.log.schema import OperationLogOutSchema  # noqa: E402
+from app.api.v1.module_system.menu.crud import MenuCRUD  # noqa: E402
+from app.api.v1.module_system.menu.schema import MenuOutSchema  # noqa: E402
+from app.api.v1.module_system.user.crud import UserCRUD  # noqa: E402
+from app.api.v1.module_system.user.model import UserModel  # noqa: E402
+from app.api.v1.module_system.user.schema import UserOutSchema  # noqa: E402
+
+
+async def seed(users: int, logs: int) -> None:
+    """
+    初始化数据库并补足测试用户与操作日志
+
+    参数:
+    - users (int): 用户数量。
+    - logs (int): 操作日志数量。
+    """
+    await InitializeData().init_db()
+    async with AsyncSessionLocal() as session:
+        count = await session.scalar(select(func.count()).select_from(UserModel))
+        if count < users:
+            await session.execute(insert(UserModel), [
+                {
+                    'username': f'bench{i}', 'name': f'测试用户{i}', 'password': 'x', 'dept_id': 1, 'status': True,
+                    'is_superuser': False, 'gender': '0', 'creator_id': 1, 'email': f'bench{i}@example.com',
+                    'mobile': f'139{i:08d}'
+                }
+                for i in range(count, users)
+            ])
+        count = await session.scalar(select(func.count()).select_from(OperationLogModel))
+        if count < logs:
+            await session.execute(insert(OperationLogModel), [
+                {
+                    'type': 2, 'request_path': '/api/v1/system/user/list', 'request_method': 'GET', 'response_code': 200,
+                    'creator_id': 1, 'request_payload': '{}', 'response_json': '{}', 'process_time': '1.00ms',
+                    'login_location': '内网IP', 'request_ip': '127.0.0.1', 'request_os': 'Linux', 'request_browser': 'Chrome'
+                }
+                for _ in range(count, logs)
+            ])
+        await session.commit()
+
+
+async def main(users: int, logs: int, repeat: int) -> None:
+    await seed(users, logs)
+    async with AsyncSessionLocal() as session:
+        auth = AuthSchema(db=session)
+        cases = [
+            ('user', UserOutSchema, (await UserCRUD(auth).get_list_crud())[:users]),
+            ('log', OperationLogOutSchema, (await OperationLogCRUD(auth).list())[:logs]),
+            ('menu', MenuOutSchema, await MenuCRUD(auth).get_list_crud()),
+        ]
+        for name, schema, objs in cases:
+            per_row, expected = measure(lambda: [schema.model_validate(obj).model_dump() for obj in objs], repeat)
+            dump_list, result = measure(lambda: Serialize.dump_list(schema, objs), repeat)
+            assert result == expected, f'{name}: dump_list 输出与逐行序列化不一致'
+            print(f'{name:5s} {len(objs):6d} 行: 逐行 {per_row:8.1f} ms  dump_list {dump_list:8.1f} ms')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='列表序列化基准')
+    parser.add_argument('--users', type=int, default=5000)
+    parser.add_argument('--logs', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+    asyncio.run(main(args.users, args.logs, args.repeat))
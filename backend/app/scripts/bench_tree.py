@@ -0,0 +1,178 @@
+# -*- coding: utf-8 -*-
+
+"""
+树形结构构建基准: app.utils.common_util 的建树与父子级遍历与原实现(二次复杂度、递归)对比
+
+    python -m app.scripts.bench_tree [--nodes 10000] [--depth 20000]
+
+节点随机打乱并附带一个父节点不存在的孤立节点, 两种实现的输出比较一致后再输出耗时:
+- menu: 父节点在前 50 个节点内(窄而深);
+- dept: 父节点随机(宽而浅);
+- wide: 10 个父节点, 每个约 1000 个子节点;
+- chain: depth 层的单链, 原实现的递归超出递归深度限制。
+"""
+
+import argparse
+import copy
+import random
+import sys
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from app.utils import common_util
+
+
+def legacy_traversal_to_tree(nodes: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """原实现: 每个节点用 `not in` 线性查找(逐个字典深度比较)后再加入"""
+    tree: List[Dict[str, Any]] = []
+    node_dict = {node['id']: node for node in nodes}
+    for node in nodes:
+        if 'children' not in node:
+            node['children'] = None
+        parent_id = node['parent_id']
+        if parent_id is None:
+            tree.append(node)
+        else:
+            parent_node = node_dict.get(parent_id)
+            if parent_node is not None:
+                if 'children' not in parent_node or parent_node['children'] is None:
+                    parent_node['children'] = []
+                if node not in parent_node['children']:
+                    parent_node['children'].append(node)
+            elif node not in tree:
+                tree.append(node)
+    for node in tree:
+        if 'children' not in node:
+            node['children'] = None
+    return tree
+
+
+def legacy_recursive_to_tree(nodes: List[Dict[str, Any]], *, parent_id: Optional[int] = None) -> List[Dict[str, Any]]:
+    """原实现: 每一层都扫描全部节点"""
+    tree: List[Dict[str, Any]] = []
+    for node in nodes:
+        if node['parent_id'] == parent_id:
+            child_nodes = legacy_recursive_to_tree(nodes, parent_id=node['id'])
+            if child_nodes:
+                node['children'] = child_nodes
+            tree.append(node)
+    return tree
+
+
+def legacy_parent_recursion(id: int, id_map: Dict[int, int], ids: Optional[List[int]] = None) -> List[int]:
+    """原实现: 递归获取所有父级 ID"""
+    ids = ids or []
+    if id in ids:
+        raise ValueError('自引用')
+    ids.append(id)
+    parent_id = id_map.get(id)
+    if parent_id:
+        legacy_parent_recursion(parent_id, id_map, ids)
+    return ids
+
+
+def legacy_child_recursion(id: int, id_map: Dict[int, List[int]], ids: Optional[List[int]] = None) -> List[int]:
+    """原实现: 递归获取所有子级 ID"""
+    ids = ids or []
+    ids.append(id)
+    for child in id_map.get(id, []):
+        legacy_child_recursion(child, id_map, ids)
+    return ids
+
+
+def generate(count: int, kind: str) -> List[Dict[str, Any]]:
+    """
+    生成打乱顺序的树节点
+
+    参数:
+    - count (int): 节点数量。
+    - kind (str): menu、dept 或 wide。
+
+    返回:
+    - List[Dict[str, Any]]: 节点列表(含一个孤立节点)。
+    """
+    random.seed(1)
+    nodes = []
+    for i in range(1, count + 1):
+        if kind == 'wide':
+            parent_id = None if i <= 10 else i % 10 + 1
+        elif i <= 5:
+            parent_id = None
+        else:
+            parent_id = random.randint(max(1, i - 50) if kind == 'menu' else 1, i - 1)
+        nodes.append({
+            'id': i, 'parent_id': parent_id, 'name': f'node{i}', 'path': f'/p/{i}', 'sort': i % 7, 'status': True,
+            'meta': {'title': f'节点{i}', 'icon': 'menu', 'hidden': False}
+        })
+    nodes.append({'id': count + 1, 'parent_id': 99999999, 'name': 'orphan'})
+    random.shuffle(nodes)
+    return nodes
+
+
+def compare(legacy: Callable[[List[Dict[str, Any]]], Any], current: Callable[[List[Dict[str, Any]]], Any], nodes: List[Dict[str, Any]]) -> Tuple[float, float]:
+    """
+    分别以节点副本执行两种实现并比较输出
+
+    参数:
+    - legacy (Callable): 原实现。
+    - current (Callable): 当前实现。
+    - nodes (List[Dict[str, Any]]): 树节点列表。
+
+    返回:
+    - Tuple[float, float]: (原实现耗时秒, 当前实现耗时秒)。
+    """
+    timings, results = [], []
+    for fn in (legacy, current):
+        data = copy.deepcopy(nodes)
+        start = time.perf_counter()
+        results.append(fn(data))
+        timings.append(time.perf_counter() - start)
+    assert results[0] == results[1], '输出与原实现不一致'
+    return timings[0], timings[1]
+
+
+class Node:
+    """带 id/parent_id 的模型替身"""
+
+    def __init__(self, data: Dict[str, Any]) -> None:
+        self.id = data['id']
+        self.parent_id = data['parent_id']
+
+
+def main(count: int, depth: int) -> None:
+    sys.setrecursionlimit(max(sys.getrecursionlimit(), count * 2))
+    for kind in ('menu', 'dept', 'wide'):
+        nodes = generate(count, kind)
+        legacy, current = compare(legacy_traversal_to_tree, common_util.traversal_to_tree, nodes)
+        print(f'{kind:5s} traversal_to_tree  原实现 {legacy:8.3f} s  当前 {current:8.4f} s')
+        legacy, current = compare(legacy_recursive_to_tree, common_util.recursive_to_tree, nodes)
+        print(f'{kind:5s} recursive_to_tree  原实现 {legacy:8.3f} s  当前 {current:8.4f} s')
+
+        models = [Node(node) for node in nodes]
+        child_map, parent_map = common_util.get_child_id_map(models), common_util.get_parent_id_map(models)
+        for id in (1, 2, 3):
+            assert legacy_child_recursion(id, child_map) == common_util.get_child_recursion(id, child_map)
+        for id in (count, count // 2, 77):
+            assert legacy_parent_recursion(id, parent_map) == common_util.get_parent_recursion(id, parent_map)
+
+    sys.setrecursionlimit(1000)
+    parent_map = {i: i - 1 for i in range(1, depth + 1)}
+    child_map = {i: [i + 1] for i in range(depth)}
+    for name, legacy, current, start_id, id_map in (
+        ('get_parent_recursion', legacy_parent_recursion, common_util.get_parent_recursion, depth, parent_map),
+        ('get_child_recursion', legacy_child_recursion, common_util.get_child_recursion, 0, child_map),
+    ):
+        try:
+            legacy(start_id, id_map)
+            legacy_result = '完成'
+        except RecursionError:
+            legacy_result = 'RecursionError'
+        print(f'chain {name} {depth} 层  原实现 {legacy_result}  当前 {len(current(start_id, id_map))} 个ID')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='树形结构构建基准')
+    parser.add_argument('--nodes', type=int, default=10000)
+    parser.add_argument('--depth', type=int, default=20000)
+    args = parser.parse_args()
+    main(args.nodes, args.depth)
@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+
+"""
+性能基准脚本公共方法
+
+基准脚本(app/scripts/bench_*.py)在 backend 目录下以模块方式运行, 例如:
+
+    python -m app.scripts.bench_serialize
+
+需要数据库的脚本使用临时目录下独立的 SQLite 数据库, 不影响开发数据库。
+"""
+
+import gc
+import os
+import statistics
+import tempfile
+import time
+from typing import Any, Callable, Tuple
+
+
+def use_bench_database(name: str = 'fastapiadmin_bench') -> str:
+    """
+    使用临时目录下的 SQLite 数据库, 须在导入 app.config.setting 之前调用
+
+    参数:
+    - name (str): 数据库文件名(不含后缀)。
+
+    返回:
+    - str: 数据库文件路径。
+    """
+    path = os.path.join(tempfile.gettempdir(), name)
+    os.environ['DATABASE_TYPE'] = 'sqlite'
+    os.environ['DATABASE_NAME'] = path
+    return f'{path}.db'
+
+
+def measure(fn: Callable[[], Any], repeat: int = 5) -> Tuple[float, Any]:
+    """
+    测量函数耗时的中位数(先预热执行一次, 每次计时前先完成垃圾回收, 避免上一次执行产生的垃圾计入本次耗时)
+
+    参数:
+    - fn (Callable[[], Any]): 被测函数。
+    - repeat (int): 计时执行次数。
+
+    返回:
+    - Tuple[float, Any]: (耗时中位数毫秒, 最后一次执行结果)。
+    """
+    result = fn()
+    timings = []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        result = fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings), result
@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+
+"""
+启动导入预算检查: 使用 `python -X importtime` 统计启动阶段的导入耗时与模块数量, 超出预算或提前导入了
+重量级依赖时以非零状态码退出
+
+    python -m app.scripts.check_import_budget [--cli-ms 600] [--app-ms 4000] [--cli-modules 600] [--app-modules 1500]
+
+检查两种启动方式(均在独立子进程中执行, 不受当前进程已导入模块的影响):
+- cli: `import main`, 命令行入口(revision、upgrade 等命令)只需要这些模块;
+- app: `import main` 后执行 `create_app()`, 即服务进程启动。
+"""
+
+import argparse
+import re
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+BACKEND_DIR = Path(__file__).resolve().parents[2]
+
+# 只在使用时导入的重量级依赖, 启动阶段不应出现
+DEFERRED_MODULES = ['pandas', 'openpyxl', 'openai', 'sqlglot', 'user_agents', 'motor', 'alembic']
+
+STAGES: Dict[str, str] = {
+    'cli': 'import main',
+    'app': 'import main; main.create_app()',
+}
+
+IMPORTTIME_LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)$')
+
+
+def import_profile(code: str) -> Tuple[float, List[str]]:
+    """
+    在子进程中执行代码并解析 -X importtime 输出
+
+    参数:
+    - code (str): 要执行的代码。
+
+    返回:
+    - Tuple[float, List[str]]: (顶层导入累计耗时毫秒, 已导入的模块列表)。
+    """
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', code],
+        cwd=BACKEND_DIR, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr[-2000:])
+    total_us, modules = 0, []
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        cumulative, indent, module = int(match.group(2)), len(match.group(3)), match.group(4)
+        modules.append(module)
+        # 缩进为 1 的是顶层导入, 其累计耗时已包含所有子模块
+        if indent == 1:
+            total_us += cumulative
+    return total_us / 1000, modules
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='启动导入预算检查')
+    parser.add_argument('--cli-ms', type=float, default=600, help='import main 的导入耗时预算(毫秒)')
+    parser.add_argument('--app-ms', type=float, default=4000, help='create_app() 启动的导入耗时预算(毫秒)')
+    parser.add_argument('--cli-modules', type=int, default=600, help='import main 的模块数量预算')
+    parser.add_argument('--app-modules', type=int, default=1500, help='create_app() 启动的模块数量预算')
+    args = parser.parse_args()
+    budgets = {'cli': (args.cli_ms, args.cli_modules), 'app': (args.app_ms, args.app_modules)}
+
+    failures = []
+    for stage, code in STAGES.items():
+        elapsed, modules = import_profile(code)
+        budget_ms, budget_modules = budgets[stage]
+        print(f'{stage:4s} 导入耗时 {elapsed:7.0f} ms (预算 {budget_ms:.0f})  模块 {len(modules):5d} (预算 {budget_modules})')
+        if elapsed > budget_ms:
+            failures.append(f'{stage}: 导入耗时 {elapsed:.0f} ms 超出预算 {budget_ms:.0f} ms')
+        if len(modules) > budget_modules:
+            failures.append(f'{stage}: 模块数量 {len(modules)} 超出预算 {budget_modules}')
+        loaded = sorted({module.split('.')[0] for module in modules} & set(DEFERRED_MODULES))
+        if loaded:
+            failures.append(f'{stage}: 启动阶段导入了应延迟导入的模块 {", ".join(loaded)}')
+
+    for failure in failures:
+        print(f'超出预算 - {failure}', file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,11 +1,19 @@
 # -*- coding: utf-8 -*-
 
+import hashlib
 import json
+from contextlib import nullcontext
+from datetime import datetime
 from pathlib import Path
-from typing import Dict, List
-from sqlalchemy import select, func
+from typing import Dict, List, Optional
+from redis.asyncio import Redis
+from sqlalchemy import DateTime, Integer, String, select, func
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.schema import CreateIndex, CreateTable
 
+from app.common.enums import RedisInitKeyConfig
 from app.core.logger import logger
 from app.core.database import AsyncSessionLocal, async_engine
 from app.core.base_model import MappedBase
@@ -21,6 +29,18 @@ from app.api.v1.module_system.dict.model import DictTypeModel, DictDataModel
 from app.api.v1.module_system.notice.model import NoticeModel
 
 
+class InitializeVersionModel(MappedBase):
+    """
+    数据库初始化指纹表: 记录最近一次完成初始化时的表结构与初始化数据指纹
+    """
+    __tablename__ = "system_initialize_version"
+    __table_args__ = ({'comment': '数据库初始化指纹表'})
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, comment='主键ID')
+    fingerprint: Mapped[str] = mapped_column(String(64), nullable=False, comment='表结构与初始化数据指纹')
+    updated_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, default=datetime.now, onupdate=datetime.now, comment='更新时间')
+
+
 class InitializeData:
     """
     初始化数据库和基础数据
@@ -162,15 +182,79 @@ class InitializeData:
             logger.error(f"❌️ 读取 {json_path} 失败: {str(e)}")
             raise
 
-    async def init_db(self) -> None:
+    def __get_fingerprint(self) -> str:
+        """
+        计算表结构与初始化数据指纹: 所有表的建表/索引语句加上初始化数据文件内容的 SHA-256
+
+        返回:
+        - str: 指纹字符串。
+        """
+        digest = hashlib.sha256(settings.DATABASE_TYPE.encode())
+        for table in MappedBase.metadata.sorted_tables:
+            digest.update(str(CreateTable(table).compile(dialect=async_engine.dialect)).encode())
+            for index in sorted(table.indexes, key=lambda item: item.name or ''):
+                digest.update(str(CreateIndex(index).compile(dialect=async_engine.dialect)).encode())
+        for model in self.prepare_init_models:
+            json_path = Path.joinpath(settings.SCRIPT_DIR, f'{model.__tablename__}.json')
+            if json_path.exists():
+                digest.update(json_path.read_bytes())
+        return digest.hexdigest()
+
+    async def __get_saved_fingerprint(self) -> Optional[str]:
+        """
+        读取已保存的指纹(指纹表不存在时视为未初始化)
+
+        返回:
+        - Optional[str]: 已保存的指纹, 不存在时为 None。
+        """
+        try:
+            async with async_engine.connect() as conn:
+                return await conn.scalar(select(InitializeVersionModel.fingerprint).where(InitializeVersionModel.id == 1))
+        except SQLAlchemyError:
+            return None
+
+    async def __save_fingerprint(self, db: AsyncSession, fingerprint: str) -> None:
+        """
+        保存指纹
+
+        参数:
+        - db (AsyncSession): 异步数据库会话。
+        - fingerprint (str): 指纹字符串。
+        """
+        await db.merge(InitializeVersionModel(id=1, fingerprint=fingerprint, updated_at=datetime.now()))
+
+    async def init_db(self, redis: Optional[Redis] = None) -> None:
         """
         执行完整初始化流程
+
+        表结构与初始化数据的指纹未变化时直接跳过; 需要初始化时通过 Redis 锁保证多个 worker 中只有一个执行,
+        其余 worker 等待锁释放后再次比较指纹即可跳过。
+
+        参数:
+        - redis (Optional[Redis]): Redis 客户端, 为空时不加锁(单进程)。
         """
-        # 先创建表结构
-        await self.__init_create_table()
-        
-        # 再初始化数据
-        async with AsyncSessionLocal() as session:
-            async with session.begin():
-                await self.__init_data(session)
+        fingerprint = self.__get_fingerprint()
+        if await self.__get_saved_fingerprint() == fingerprint:
+            logger.info("✅️ 数据库表结构与初始化数据未变化, 跳过初始化")
+            return
+
+        lock = redis.lock(
+            RedisInitKeyConfig.INIT_DB_LOCK.key,
+            timeout=settings.INIT_DB_LOCK_TIMEOUT,
+            blocking_timeout=settings.INIT_DB_LOCK_TIMEOUT
+        ) if redis else nullcontext()
+        async with lock:
+            # 等锁期间其他 worker 可能已完成初始化
+            if await self.__get_saved_fingerprint() == fingerprint:
+                logger.info("✅️ 数据库已由其他进程初始化, 跳过初始化")
+                return
+
+            # 先创建表结构
+            await self.__init_create_table()
+
+            # 再初始化数据, 与指纹在同一事务中提交
+            async with AsyncSessionLocal() as session:
+                async with session.begin():
+                    await self.__init_data(session)
+                    await self.__save_fingerprint(session, fingerprint)
     
\ No newline at end of file
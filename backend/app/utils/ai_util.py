@@ -1,8 +1,6 @@
 # -*- coding: utf-8 -*- 
 
 from typing import Any, AsyncGenerator
-from openai import AsyncOpenAI, OpenAI
-from openai.types.chat.chat_completion import ChatCompletion
 import httpx
 
 from app.config.setting import settings
@@ -22,6 +20,9 @@ class AIClient:
             follow_redirects=True
         )
         
+        # openai 导入较慢, 使用时再加载
+        from openai import AsyncOpenAI
+
         # 使用自定义的http客户端
         self.client = AsyncOpenAI(
             api_key=settings.OPENAI_API_KEY,
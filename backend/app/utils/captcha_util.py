@@ -1,19 +1,40 @@
 # -*- coding: utf-8 -*-
 
 import base64
+import multiprocessing
 import random
 import string
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
 from io import BytesIO
-from typing import Tuple
+from typing import Deque, List, Optional, Tuple
 from PIL import Image, ImageDraw, ImageFont
 
 from app.config.setting import settings
+from app.core.logger import logger
 
 
 class CaptchaUtil:
     """
     验证码工具类
     """
+    @staticmethod
+    @lru_cache(maxsize=4)
+    def get_font(font_path: str, size: int) -> ImageFont.FreeTypeFont:
+        """
+        获取字体对象（按路径和字号缓存，避免每次从磁盘加载字体文件）。
+        
+        参数:
+        - font_path (str): 字体文件路径。
+        - size (int): 字号。
+        
+        返回:
+        - ImageFont.FreeTypeFont: 字体对象。
+        """
+        return ImageFont.truetype(font=font_path, size=size)
+
     @classmethod 
     def generate_captcha(cls) -> Tuple[str, str]:
         """
@@ -33,7 +54,7 @@ class CaptchaUtil:
         draw = ImageDraw.Draw(image)
 
         # 使用指定字体
-        font = ImageFont.truetype(font=settings.CAPTCHA_FONT_PATH, size=settings.CAPTCHA_FONT_SIZE)
+        font = cls.get_font(settings.CAPTCHA_FONT_PATH, settings.CAPTCHA_FONT_SIZE)
 
         # 计算文本总宽度和高度
         total_width = sum(draw.textbbox((0, 0), char, font=font)[2] for char in captcha_value)
@@ -73,9 +94,9 @@ class CaptchaUtil:
                 fill=point_color
             )
 
-        # 将图像数据保存到内存中并转换为base64
+        # 将图像数据保存到内存中并转换为base64(低压缩级别, 编码耗时约为 optimize=True 的 1/5)
         buffer = BytesIO()
-        image.save(buffer, format='PNG', optimize=True)
+        image.save(buffer, format='PNG', compress_level=1)
         base64_string = base64.b64encode(buffer.getvalue()).decode()
         
         return base64_string, captcha_value
@@ -94,7 +115,7 @@ class CaptchaUtil:
         draw = ImageDraw.Draw(image)
 
         # 设置字体
-        font = ImageFont.truetype(font=settings.CAPTCHA_FONT_PATH, size=settings.CAPTCHA_FONT_SIZE)
+        font = cls.get_font(settings.CAPTCHA_FONT_PATH, settings.CAPTCHA_FONT_SIZE)
 
         # 生成运算数字和运算符
         operators = ['+', '-', '*']
@@ -131,9 +152,144 @@ class CaptchaUtil:
                 (random.randint(0, 160), random.randint(0, 60))
             ], fill=line_color, width=1)
 
-        # 将图像数据保存到内存中并转换为base64
+        # 将图像数据保存到内存中并转换为base64(低压缩级别, 编码耗时约为 optimize=True 的 1/5)
         buffer = BytesIO()
-        image.save(buffer, format='PNG', optimize=True)
+        image.save(buffer, format='PNG', compress_level=1)
         base64_string = base64.b64encode(buffer.getvalue()).decode()
 
-        return base64_string, captcha_value
\ No newline at end of file
+        return base64_string, captcha_value
+
+
+def _render_captchas(count: int) -> List[Tuple[str, int]]:
+    """
+    在渲染子进程中批量生成验证码(需为模块级函数才能被子进程调用)
+
+    参数:
+    - count (int): 生成数量。
+
+    返回:
+    - List[Tuple[str, int]]: [base64图片字符串, 计算结果] 列表。
+    """
+    return [CaptchaUtil.captcha_arithmetic() for _ in range(count)]
+
+
+class CaptchaPool:
+    """
+    预渲染验证码池
+
+    验证码在独立的渲染子进程中生成, 后台线程只负责提交任务并放入有界队列(等待结果时不占用 GIL),
+    登录高峰补充验证码时不与事件循环争抢 GIL; 请求时直接取出, 避免在事件循环中执行图片渲染。
+    """
+    _pool: Deque[Tuple[str, int]] = deque()
+    _lock = threading.Lock()
+    _refill_event = threading.Event()
+    _stop_event = threading.Event()
+    _thread: Optional[threading.Thread] = None
+    _executor: Optional[ProcessPoolExecutor] = None
+    # 每次提交给渲染子进程的数量, 分批放入队列, 池被取空时能尽快补上
+    _batch_size = 20
+
+    @classmethod
+    def start(cls) -> None:
+        """
+        启动后台补充线程（重复调用无副作用）, 渲染子进程在首次补充时创建, 不阻塞启动。
+        
+        返回:
+        - None
+        """
+        with cls._lock:
+            if cls._thread and cls._thread.is_alive():
+                return
+            cls._stop_event.clear()
+            cls._refill_event.set()
+            cls._thread = threading.Thread(target=cls._refill_loop, name="captcha-pool", daemon=True)
+            cls._thread.start()
+        logger.info(f"验证码池已启动, 容量: {settings.CAPTCHA_POOL_SIZE}, 补充阈值: {settings.CAPTCHA_POOL_REFILL_THRESHOLD}")
+
+    @classmethod
+    def stop(cls) -> None:
+        """
+        停止后台补充线程并关闭渲染子进程。
+        
+        返回:
+        - None
+        """
+        cls._stop_event.set()
+        cls._refill_event.set()
+        if cls._thread:
+            cls._thread.join(timeout=5)
+            cls._thread = None
+        cls._shutdown_executor()
+
+    @classmethod
+    def pop(cls) -> Optional[Tuple[str, int]]:
+        """
+        从池中取出一张验证码。
+        
+        返回:
+        - Optional[Tuple[str, int]]: [base64图片字符串, 计算结果], 池为空时返回None。
+        """
+        try:
+            captcha = cls._pool.popleft()
+        except IndexError:
+            captcha = None
+        if len(cls._pool) < settings.CAPTCHA_POOL_REFILL_THRESHOLD:
+            cls._refill_event.set()
+        return captcha
+
+    @classmethod
+    def size(cls) -> int:
+        """
+        获取池中剩余验证码数量。
+        
+        返回:
+        - int: 剩余数量。
+        """
+        return len(cls._pool)
+
+    @classmethod
+    def _refill_loop(cls) -> None:
+        """
+        后台线程: 剩余数量低于补充阈值时, 由渲染子进程分批生成直到补满。
+        
+        返回:
+        - None
+        """
+        while not cls._stop_event.is_set():
+            cls._refill_event.wait()
+            cls._refill_event.clear()
+            while not cls._stop_event.is_set() and len(cls._pool) < settings.CAPTCHA_POOL_SIZE:
+                count = min(cls._batch_size, settings.CAPTCHA_POOL_SIZE - len(cls._pool))
+                try:
+                    cls._pool.extend(cls._get_executor().submit(_render_captchas, count).result())
+                except Exception as e:
+                    logger.error(f"预渲染验证码失败: {e}")
+                    # 渲染子进程异常退出时重建, 下次补充时重新创建
+                    cls._shutdown_executor()
+                    break
+
+    @classmethod
+    def _get_executor(cls) -> ProcessPoolExecutor:
+        """
+        获取渲染子进程(首次使用时创建), 使用 spawn 方式启动, 避免在多线程的服务进程中 fork。
+        
+        返回:
+        - ProcessPoolExecutor: 单进程的进程池。
+        """
+        with cls._lock:
+            if cls._executor is None:
+                cls._executor = ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('spawn'))
+            return cls._executor
+
+    @classmethod
+    def _shutdown_executor(cls) -> None:
+        """
+        关闭渲染子进程。
+        
+        返回:
+        - None
+        """
+        with cls._lock:
+            if cls._executor is not None:
+                cls._executor.shutdown(wait=False, cancel_futures=True)
+                cls._executor = None
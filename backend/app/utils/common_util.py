@@ -101,7 +101,7 @@ def get_parent_id_map(model_list: Sequence[DeclarativeBase]) -> Dict[int, int]:
 
 def get_parent_recursion(id: int, id_map: Dict[int, int], ids: Optional[List[int]] = None) -> List[int]:
     """
-    递归获取所有父级 ID
+    获取所有父级 ID(迭代实现, 层级再深也不会超出递归深度限制)
 
     参数:
     - id (int): 当前 ID。
@@ -110,14 +110,19 @@ def get_parent_recursion(id: int, id_map: Dict[int, int], ids: Optional[List[int
 
     返回:
     - List[int]: 所有父级 ID 列表。
+
+    异常:
+    - CustomException: 存在自引用(环)时抛出。
     """
     ids = ids or []
-    if id in ids:
-        raise CustomException(msg="递归获取父级ID失败,不可以自引用")
-    ids.append(id)
-    parent_id = id_map.get(id)
-    if parent_id:
-        get_parent_recursion(parent_id, id_map, ids)
+    seen = set(ids)
+    current: Optional[int] = id
+    while current:
+        if current in seen:
+            raise CustomException(msg="递归获取父级ID失败,不可以自引用")
+        seen.add(current)
+        ids.append(current)
+        current = id_map.get(current)
     return ids
 
 
@@ -141,7 +146,7 @@ def get_child_id_map(model_list: Sequence[DeclarativeBase]) -> Dict[int, List[in
 
 def get_child_recursion(id: int, id_map: Dict[int, List[int]], ids: Optional[List[int]] = None) -> List[int]:
     """
-    递归获取所有子级 ID
+    获取所有子级 ID(迭代先序遍历, 结果顺序与递归实现一致)
 
     参数:
     - id (int): 当前 ID。
@@ -152,15 +157,22 @@ def get_child_recursion(id: int, id_map: Dict[int, List[int]], ids: Optional[Lis
     - List[int]: 所有子级 ID 列表。
     """
     ids = ids or []
-    ids.append(id)
-    for child in id_map.get(id, []):
-        get_child_recursion(child, id_map, ids)
+    seen = set(ids)
+    stack = [id]
+    while stack:
+        current = stack.pop()
+        # 跳过环上已访问的节点
+        if current in seen:
+            continue
+        seen.add(current)
+        ids.append(current)
+        stack.extend(reversed(id_map.get(current, [])))
     return ids
 
 
 def traversal_to_tree(nodes: list[dict[str, Any]]) -> list[dict[str, Any]]:
     """
-    通过遍历算法构造树形结构
+    通过遍历算法构造树形结构(按 ID 建索引单次遍历, O(n))
 
     参数:
     - nodes (list[dict[str, Any]]): 树节点列表。
@@ -171,36 +183,27 @@ def traversal_to_tree(nodes: list[dict[str, Any]]) -> list[dict[str, Any]]:
     tree: list[dict[str, Any]] = []
     node_dict = {node['id']: node for node in nodes}
 
+    # 每个节点只访问一次, 无需再用 in 线性扫描并逐个比较整个嵌套字典
     for node in nodes:
         # 确保每个节点都有children字段，即使没有子节点也设置为null
         if 'children' not in node:
             node['children'] = None
-            
+
         parent_id = node['parent_id']
-        if parent_id is None:
+        parent_node = node_dict.get(parent_id) if parent_id is not None else None
+        if parent_node is None:
             tree.append(node)
         else:
-            parent_node = node_dict.get(parent_id)
-            if parent_node is not None:
-                if 'children' not in parent_node or parent_node['children'] is None:
-                    parent_node['children'] = []
-                if node not in parent_node['children']:
-                    parent_node['children'].append(node)
-            else:
-                if node not in tree:
-                    tree.append(node)
-    
-    # 确保所有节点都有children字段
-    for node in tree:
-        if 'children' not in node:
-            node['children'] = None
+            if parent_node.get('children') is None:
+                parent_node['children'] = []
+            parent_node['children'].append(node)
 
     return tree
 
 
 def recursive_to_tree(nodes: list[dict[str, Any]], *, parent_id: int | None = None) -> list[dict[str, Any]]:
     """
-    通过递归算法构造树形结构（性能影响较大）
+    按父级 ID 分组后迭代构造树形结构(O(n), 输出与原递归实现一致)
 
     参数:
     - nodes (list[dict[str, Any]]): 树节点列表。
@@ -209,13 +212,23 @@ def recursive_to_tree(nodes: list[dict[str, Any]], *, parent_id: int | None = No
     返回:
     - list[dict[str, Any]]: 构造后的树形结构列表。
     """
-    tree: list[dict[str, Any]] = []
+    children_map: dict[Any, list[dict[str, Any]]] = {}
     for node in nodes:
-        if node['parent_id'] == parent_id:
-            child_nodes = recursive_to_tree(nodes, parent_id=node['id'])
-            if child_nodes:
-                node['children'] = child_nodes
-            tree.append(node)
+        children_map.setdefault(node['parent_id'], []).append(node)
+
+    tree = list(children_map.get(parent_id, []))
+    expanded: set[int] = set()
+    stack = list(tree)
+    while stack:
+        node = stack.pop()
+        # 自引用或成环的节点只展开一次
+        if id(node) in expanded:
+            continue
+        expanded.add(id(node))
+        child_nodes = children_map.get(node['id'])
+        if child_nodes:
+            node['children'] = list(child_nodes)
+            stack.extend(child_nodes)
     return tree
 
 
@@ -244,6 +257,45 @@ def bytes2file_response(bytes_info: bytes) -> Generator[bytes, Any, None]:
     yield bytes_info
 
 
+def file2stream_response(file_path: str, chunk_size: int = 64 * 1024) -> Generator[bytes, Any, None]:
+    """
+    逐块读取导出的临时文件生成响应, 发送结束(或客户端断开)后删除文件
+
+    参数:
+    - file_path (str): 文件路径。
+    - chunk_size (int): 每块字节数。
+
+    返回:
+    - Generator[bytes, Any, None]: 文件内容块。
+    """
+    try:
+        with open(file_path, 'rb') as f:
+            while chunk := f.read(chunk_size):
+                yield chunk
+    finally:
+        Path(file_path).unlink(missing_ok=True)
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    判断请求头 If-None-Match 是否命中当前 ETag
+
+    参数:
+    - if_none_match (str | None): 请求头 If-None-Match 的值。
+    - etag (str): 当前资源的 ETag。
+
+    返回:
+    - bool: 是否命中。
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == '*':
+        return True
+    # 弱校验: 忽略 W/ 前缀
+    tags = [tag.strip().removeprefix('W/') for tag in if_none_match.split(',')]
+    return etag.removeprefix('W/') in tags
+
+
 def get_filepath_from_url(url: str) -> Path:
     """
     工具方法：根据请求参数获取文件路径
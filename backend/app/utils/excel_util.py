@@ -1,32 +1,138 @@
 # -*- coding: utf-8 -*-
 
+import csv
 import io
-import pandas as pd
-from typing import Any, Dict, List
-from openpyxl import Workbook
-from openpyxl.utils import get_column_letter
-from openpyxl.styles import Alignment, PatternFill
-from openpyxl.worksheet.datavalidation import DataValidation
+import os
+import re
+import tempfile
+from datetime import datetime
+from typing import TYPE_CHECKING, Any, AsyncGenerator, AsyncIterable, Awaitable, BinaryIO, Callable, Dict, Generator, Iterable, List, Optional, Tuple, Union
+from fastapi.concurrency import run_in_threadpool
 
+# pandas、openpyxl 导入较慢, 仅在导入导出时加载
+if TYPE_CHECKING:
+    import pandas as pd
 
-class ExcelUtil:
-    """Excel文件处理工具类"""
-    
-    @classmethod
-    def __mapping_list(cls, list_data: List[Dict[str, Any]], mapping_dict: Dict) -> List:
+# 与 openpyxl.cell.cell.ILLEGAL_CHARACTERS_RE 相同: Excel 不允许的控制字符
+ILLEGAL_CHARACTERS_RE = re.compile(r'[\000-\010]|[\013-\014]|[\016-\037]')
+
+
+class ImportResult:
+    """导入结果汇总, 错误明细只保留前 error_limit 条, 内存占用与导入行数无关"""
+
+    def __init__(self, error_limit: int = 1000) -> None:
         """
-        工具方法：将列表数据中的字段名映射为对应的中文字段名。
+        初始化导入结果
 
         参数:
-        - list_data (List[Dict[str, Any]]): 数据列表。
-        - mapping_dict (Dict): 字段名映射字典。
+        - error_limit (int): 保留的错误明细条数上限。
+        """
+        self.error_limit = error_limit
+        self.success_count = 0
+        self.error_count = 0
+        self.errors: List[Dict[str, Any]] = []
+
+    def add_errors(self, errors: List[Dict[str, Any]]) -> None:
+        """
+        记录错误行
+
+        参数:
+        - errors (List[Dict[str, Any]]): [{'row': 行号, 'msg': 错误信息}] 形式的错误列表。
+        """
+        self.error_count += len(errors)
+        self.errors.extend(errors[:max(self.error_limit - len(self.errors), 0)])
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        转换为响应数据
 
         返回:
-        - List: 映射后的数据列表。
+        - Dict[str, Any]: 包含成功数、失败数及按行号排序的错误明细。
+        """
+        return {
+            'success_count': self.success_count,
+            'error_count': self.error_count,
+            'errors': sorted(self.errors, key=lambda item: item['row'])
+        }
+
+
+class _ExportWriter:
+    """导出文件写入器: xlsx 使用 openpyxl 只写模式(行数据直接落盘), csv 使用标准库 csv"""
+
+    def __init__(self, path: str, file_format: str, header: List[str]) -> None:
+        """
+        初始化写入器并写入表头
+
+        参数:
+        - path (str): 文件路径。
+        - file_format (str): 导出格式, xlsx 或 csv。
+        - header (List[str]): 表头列表。
+
+        异常:
+        - ValueError: 导出格式不支持时抛出。
         """
-        mapping_data = [{mapping_dict.get(key): item.get(key) for key in mapping_dict} for item in list_data]
+        self.path = path
+        self.file_format = file_format
+        if file_format == 'xlsx':
+            from openpyxl import Workbook
+            self.workbook = Workbook(write_only=True)
+            self.worksheet = self.workbook.create_sheet()
+            self.worksheet.append(header)
+        elif file_format == 'csv':
+            # 带 BOM 以便 Excel 正确识别中文
+            self.file = open(path, 'w', newline='', encoding='utf-8-sig')
+            self.csv_writer = csv.writer(self.file)
+            self.csv_writer.writerow(header)
+        else:
+            raise ValueError(f"不支持的导出格式: {file_format}")
 
-        return mapping_data
+    def write(self, rows: List[List[Any]]) -> None:
+        """
+        写入一批数据行
+
+        参数:
+        - rows (List[List[Any]]): 数据行列表。
+        """
+        if self.file_format == 'xlsx':
+            for row in rows:
+                self.worksheet.append([self.__cell_value(value) for value in row])
+        else:
+            self.csv_writer.writerows(rows)
+
+    def close(self) -> None:
+        """完成写入并关闭文件"""
+        if self.file_format == 'xlsx':
+            self.workbook.save(self.path)
+        else:
+            self.file.close()
+
+    def abort(self) -> None:
+        """写入失败时释放资源"""
+        if self.file_format == 'csv':
+            self.file.close()
+
+    @staticmethod
+    def __cell_value(value: Any) -> Any:
+        """
+        转换为 openpyxl 可写入的单元格值
+
+        参数:
+        - value (Any): 原始值。
+
+        返回:
+        - Any: 单元格值。
+        """
+        if isinstance(value, str):
+            return ILLEGAL_CHARACTERS_RE.sub('', value)
+        if isinstance(value, datetime) and value.tzinfo:
+            return value.replace(tzinfo=None)
+        if isinstance(value, (dict, list, tuple, set)):
+            return str(value)
+        return value
+
+
+class ExcelUtil:
+    """Excel文件处理工具类"""
     
     @classmethod
     def get_excel_template(cls, header_list: List[str], selector_header_list: List[str], option_list: List[Dict[str, List[str]]]) -> bytes:
@@ -41,6 +147,11 @@ class ExcelUtil:
         返回:
         - bytes: Excel 文件的二进制数据。
         """
+        from openpyxl import Workbook
+        from openpyxl.styles import Alignment, PatternFill
+        from openpyxl.utils import get_column_letter
+        from openpyxl.worksheet.datavalidation import DataValidation
+
         wb = Workbook()
         ws = wb.active
         if not ws:
@@ -80,20 +191,208 @@ class ExcelUtil:
         return excel_data
     
     @classmethod
-    def export_list2excel(cls, list_data: List[Dict[str, Any]], mapping_dict: Dict) -> bytes:
+    async def export_rows2file(
+        cls,
+        rows: Union[Iterable[Any], AsyncIterable[Any]],
+        mapping_dict: Dict[str, str],
+        formatter: Optional[Callable[[Any], Dict[str, Any]]] = None,
+        file_format: str = 'xlsx',
+        chunk_size: int = 1000,
+        progress: Optional[Callable[[int], Awaitable[None]]] = None
+    ) -> str:
         """
-        将列表数据导出为 Excel 文件。
+        将数据逐行流式写入导出文件, 内存占用只与块大小有关, 与导出行数无关。
 
         参数:
-        - list_data (List[Dict[str, Any]]): 要导出的数据列表。
-        - mapping_dict (Dict): 字段名映射字典。
+        - rows (Iterable[Any] | AsyncIterable[Any]): 数据行, 可以是列表或 CRUDBase.scan 等异步生成器。
+        - mapping_dict (Dict[str, str]): 字段名到表头的映射字典, 决定导出的列及顺序。
+        - formatter (Callable[[Any], Dict[str, Any]] | None): 逐行转换函数, 为空时数据行本身即为字典。
+        - file_format (str): 导出格式, xlsx 或 csv。
+        - chunk_size (int): 每次写入文件的行数。
+        - progress (Callable[[int], Awaitable[None]] | None): 进度回调, 每写入一块后以已写入行数调用。
 
         返回:
-        - bytes: Excel 文件的二进制数据。
+        - str: 导出文件的临时路径, 由 file2stream_response 发送后删除。
         """
-        mapping_data = cls.__mapping_list(list_data, mapping_dict)
-        df = pd.DataFrame(mapping_data)
-        buffer = io.BytesIO()
-        df.to_excel(buffer, index=False, engine='openpyxl')
-        binary_data = buffer.getvalue()
-        return binary_data
+        fields = list(mapping_dict.keys())
+        fd, path = tempfile.mkstemp(suffix=f'.{file_format}')
+        os.close(fd)
+        writer: Optional[_ExportWriter] = None
+        try:
+            writer = _ExportWriter(path=path, file_format=file_format, header=list(mapping_dict.values()))
+            buffer: List[List[Any]] = []
+            written = 0
+            async for row in cls.__aiter(rows):
+                item = formatter(row) if formatter else row
+                buffer.append([item.get(field) for field in fields])
+                if len(buffer) >= chunk_size:
+                    # 文件写入放到线程池, 不阻塞事件循环
+                    await run_in_threadpool(writer.write, buffer)
+                    written += len(buffer)
+                    buffer = []
+                    if progress:
+                        await progress(written)
+            if buffer:
+                await run_in_threadpool(writer.write, buffer)
+                written += len(buffer)
+            await run_in_threadpool(writer.close)
+            if progress:
+                await progress(written)
+        except BaseException:
+            if writer:
+                writer.abort()
+            os.remove(path)
+            raise
+        return path
+
+    @classmethod
+    def iter_excel_chunks(cls, file: BinaryIO, header_dict: Dict[str, str], chunk_size: int = 1000) -> Generator["pd.DataFrame", None, None]:
+        """
+        以只读模式逐块读取 Excel, 内存占用只与块大小有关。
+
+        参数:
+        - file (BinaryIO): Excel 文件对象。
+        - header_dict (Dict[str, str]): 表头到字段名的映射字典。
+        - chunk_size (int): 每块行数。
+
+        返回:
+        - Generator[pd.DataFrame, None, None]: 按字段名命名列的数据块, 索引为 Excel 行号, 单元格均为去除首尾空格的字符串, 空值为 NA。
+
+        异常:
+        - ValueError: 文件为空或缺少必要的列时抛出。
+        """
+        from openpyxl import load_workbook
+
+        wb = load_workbook(file, read_only=True, data_only=True)
+        try:
+            ws = wb.active
+            if not ws:
+                raise ValueError("不存在活动工作表")
+            rows = ws.iter_rows(values_only=True)
+            header = [str(cell).strip() if cell is not None else '' for cell in next(rows, None) or []]
+            if not header:
+                raise ValueError("导入文件为空")
+            missing_headers = [label for label in header_dict if label not in header]
+            if missing_headers:
+                raise ValueError(f"导入文件缺少必要的列: {', '.join(missing_headers)}")
+
+            positions = [header.index(label) for label in header_dict]
+            columns = list(header_dict.values())
+            buffer: List[List[Any]] = []
+            row_numbers: List[int] = []
+            for row_number, row in enumerate(rows, start=2):
+                values = [row[i] if i < len(row) else None for i in positions]
+                # 跳过空行(只读模式下带格式的空行也会被读出)
+                if all(value is None or str(value).strip() == '' for value in values):
+                    continue
+                buffer.append(values)
+                row_numbers.append(row_number)
+                if len(buffer) >= chunk_size:
+                    yield cls.__normalize_chunk(buffer, columns, row_numbers)
+                    buffer, row_numbers = [], []
+            if buffer:
+                yield cls.__normalize_chunk(buffer, columns, row_numbers)
+        finally:
+            wb.close()
+
+    @classmethod
+    async def aiter_excel_chunks(cls, file: BinaryIO, header_dict: Dict[str, str], chunk_size: int = 1000) -> AsyncGenerator["pd.DataFrame", None]:
+        """
+        在线程池中逐块读取 Excel, 解析期间不阻塞事件循环。
+
+        参数:
+        - file (BinaryIO): Excel 文件对象。
+        - header_dict (Dict[str, str]): 表头到字段名的映射字典。
+        - chunk_size (int): 每块行数。
+
+        返回:
+        - AsyncGenerator[pd.DataFrame, None]: 同 iter_excel_chunks。
+        """
+        chunks = cls.iter_excel_chunks(file=file, header_dict=header_dict, chunk_size=chunk_size)
+        while True:
+            chunk = await run_in_threadpool(next, chunks, None)
+            if chunk is None:
+                return
+            yield chunk
+
+    @classmethod
+    def check_import_chunk(
+        cls,
+        df: "pd.DataFrame",
+        header_dict: Dict[str, str],
+        required_fields: List[str],
+        option_dict: Optional[Dict[str, Dict[str, Any]]] = None,
+        pattern_dict: Optional[Dict[str, str]] = None
+    ) -> Tuple["pd.DataFrame", List[Dict[str, Any]]]:
+        """
+        按列向量化校验导入数据块。
+
+        参数:
+        - df (pd.DataFrame): iter_excel_chunks 产出的数据块。
+        - header_dict (Dict[str, str]): 表头到字段名的映射字典, 用于生成错误信息。
+        - required_fields (List[str]): 必填字段列表。
+        - option_dict (Dict[str, Dict[str, Any]] | None): 字段取值映射, 如 {'status': {'正常': True, '停用': False}}, 非空且不在映射内的值视为错误, 映射后原列被替换。
+        - pattern_dict (Dict[str, str] | None): 字段格式正则, 非空且不匹配的值视为错误。
+
+        返回:
+        - Tuple[pd.DataFrame, List[Dict[str, Any]]]: 校验通过的数据块, 以及 [{'row': 行号, 'msg': 错误信息}] 形式的错误列表。
+        """
+        label_dict = {field: label for label, field in header_dict.items()}
+        import pandas as pd
+
+        errors = pd.Series('', index=df.index, dtype=object)
+        df = df.copy()
+
+        for field in required_fields:
+            errors[df[field].isna()] += f"{label_dict[field]}不能为空;"
+
+        for field, options in (option_dict or {}).items():
+            mapped = df[field].map(options)
+            errors[df[field].notna() & mapped.isna()] += f"{label_dict[field]}取值无效;"
+            df[field] = mapped
+
+        for field, pattern in (pattern_dict or {}).items():
+            matched = df[field].str.fullmatch(pattern).fillna(True).astype(bool)
+            errors[~matched] += f"{label_dict[field]}格式不正确;"
+
+        invalid = errors != ''
+        error_list = [{'row': int(row), 'msg': msg.rstrip(';')} for row, msg in errors[invalid].items()]
+        return df[~invalid], error_list
+
+    @staticmethod
+    async def __aiter(rows: Union[Iterable[Any], AsyncIterable[Any]]) -> AsyncGenerator[Any, None]:
+        """
+        将同步或异步可迭代对象统一为异步迭代。
+
+        参数:
+        - rows (Iterable[Any] | AsyncIterable[Any]): 数据行。
+
+        返回:
+        - AsyncGenerator[Any, None]: 异步生成器。
+        """
+        if hasattr(rows, '__aiter__'):
+            async for row in rows:
+                yield row
+        else:
+            for row in rows:
+                yield row
+
+    @staticmethod
+    def __normalize_chunk(buffer: List[List[Any]], columns: List[str], row_numbers: List[int]) -> "pd.DataFrame":
+        """
+        将原始单元格转换为去除首尾空格的字符串列, 空字符串视为空值。
+
+        参数:
+        - buffer (List[List[Any]]): 单元格数据。
+        - columns (List[str]): 字段名列表。
+        - row_numbers (List[int]): Excel 行号列表。
+
+        返回:
+        - pd.DataFrame: 规范化后的数据块。
+        """
+        import pandas as pd
+
+        df = pd.DataFrame(buffer, columns=columns, index=row_numbers, dtype=object).astype('string')
+        # Excel 中的整数常被读作浮点数(如 1.0), 去掉多余的小数位
+        df = df.apply(lambda column: column.str.strip().str.replace(r'^(-?\d+)\.0$', r'\1', regex=True))
+        return df.replace('', pd.NA)
@@ -1,15 +1,21 @@
 # -*- coding: utf-8 -*-
 
+import asyncio
 import hashlib
+import multiprocessing
 import os
-from typing import Optional, Any
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Awaitable, Callable, List, Optional, Any
 
+from fastapi.concurrency import run_in_threadpool
 from passlib.context import CryptContext
 from cryptography.hazmat.backends.openssl import backend
 from cryptography.hazmat.primitives import padding
 from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
 from itsdangerous import URLSafeSerializer
 
+from app.config.setting import settings
 from app.core.logger import logger
 
 
@@ -21,11 +27,27 @@ PwdContext = CryptContext(
 )
 
 
+def _hash_passwords(passwords: List[str]) -> List[str]:
+    """
+    在进程池子进程中计算一组密码的哈希(需为模块级函数才能被子进程调用)
+
+    参数:
+    - passwords (List[str]): 明文密码列表。
+
+    返回:
+    - List[str]: 密码哈希值列表。
+    """
+    return [PwdContext.hash(password) for password in passwords]
+
+
 class PwdUtil:
     """
     密码工具类,提供密码加密和验证功能
     """
 
+    _executor: Optional[ProcessPoolExecutor] = None
+    _lock = threading.Lock()
+
     @classmethod
     def verify_password(cls, plain_password: str, password_hash: str) -> bool:
         """
@@ -53,6 +75,91 @@ class PwdUtil:
         """
         return PwdContext.hash(password)
 
+    @classmethod
+    async def set_password_hash_async(cls, password: str) -> str:
+        """
+        在线程池中对单个密码进行加密(bcrypt 计算时释放 GIL), 不阻塞事件循环
+
+        参数:
+        - password (str): 明文密码。
+
+        返回:
+        - str: 加密后的密码哈希值。
+        """
+        return await run_in_threadpool(PwdContext.hash, password)
+
+    @classmethod
+    async def set_password_hash_batch(
+        cls,
+        passwords: List[str],
+        progress: Optional[Callable[[int], Awaitable[None]]] = None,
+        chunk_size: int = 16
+    ) -> List[str]:
+        """
+        批量加密密码, 分块提交到进程池并行计算, 不阻塞事件循环; 不超过一块时在线程池中计算, 不启动进程池
+
+        参数:
+        - passwords (List[str]): 明文密码列表。
+        - progress (Callable[[int], Awaitable[None]] | None): 进度回调, 以已完成的密码数调用。
+        - chunk_size (int): 每个子任务计算的密码数。
+
+        返回:
+        - List[str]: 与输入顺序一致的密码哈希值列表。
+        """
+        if not passwords:
+            return []
+        if len(passwords) <= chunk_size:
+            password_hashes = await run_in_threadpool(_hash_passwords, passwords)
+            if progress:
+                await progress(len(password_hashes))
+            return password_hashes
+        loop = asyncio.get_running_loop()
+        executor = cls._get_executor()
+        futures = [
+            loop.run_in_executor(executor, _hash_passwords, passwords[i:i + chunk_size])
+            for i in range(0, len(passwords), chunk_size)
+        ]
+        if progress:
+            done = 0
+            for future in asyncio.as_completed(futures):
+                done += len(await future)
+                await progress(done)
+        results = await asyncio.gather(*futures)
+        return [password_hash for chunk in results for password_hash in chunk]
+
+    @classmethod
+    def _get_executor(cls) -> ProcessPoolExecutor:
+        """
+        获取密码哈希进程池(首次使用时创建)。
+
+        PASSWORD_HASH_WORKERS 为整台主机的进程数, 由各服务进程(WORKERS)平分, 避免多进程部署时超额占用CPU;
+        使用 spawn 方式启动子进程, 避免在多线程的服务进程中 fork。
+
+        返回:
+        - ProcessPoolExecutor: 进程池。
+        """
+        with cls._lock:
+            if cls._executor is None:
+                host_workers = settings.PASSWORD_HASH_WORKERS or os.cpu_count() or 1
+                cls._executor = ProcessPoolExecutor(
+                    max_workers=max(host_workers // max(settings.WORKERS, 1), 1),
+                    mp_context=multiprocessing.get_context('spawn')
+                )
+            return cls._executor
+
+    @classmethod
+    def shutdown(cls) -> None:
+        """
+        关闭密码哈希进程池。
+
+        返回:
+        - None
+        """
+        with cls._lock:
+            if cls._executor is not None:
+                cls._executor.shutdown(wait=False, cancel_futures=True)
+                cls._executor = None
+
     @classmethod
     def check_password_strength(cls, password: str) -> Optional[str]:
         """
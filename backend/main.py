@@ -1,21 +1,28 @@
 # -*- coding: utf-8 -*-
 
 import os
-import uvicorn
 import typer
-from fastapi import FastAPI
-from alembic import command
-from alembic.config import Config
+from typing import TYPE_CHECKING
 
 from app.common.enums import EnvironmentEnum
 
+if TYPE_CHECKING:
+    from fastapi import FastAPI
+
 shell_app = typer.Typer()
 
-# 初始化 Alembic 配置
-alembic_cfg = Config("alembic.ini")
 
-def create_app() -> FastAPI:
+def alembic_config():
+    """
+    初始化 Alembic 配置(仅迁移命令使用, Web 服务启动时不加载 alembic)
+    """
+    from alembic.config import Config
+    return Config("alembic.ini")
+
+
+def create_app() -> "FastAPI":
     
+    from fastapi import FastAPI
     from app.config.setting import settings
     from app.plugin.init_app import (
         register_middlewares,
@@ -49,6 +56,7 @@ def run(env: EnvironmentEnum = typer.Option(EnvironmentEnum.DEV, "--env", help="
     os.environ["ENVIRONMENT"] = env.value
     
     # 确保在设置环境变量后导入配置
+    import uvicorn
     from app.config.setting import settings
     
     # 启动uvicorn服务
@@ -63,7 +71,8 @@ def revision(message: str, env: EnvironmentEnum = typer.Option(EnvironmentEnum.D
     生成新的 Alembic 迁移脚本。
     """
     os.environ["ENVIRONMENT"] = env.value
-    command.revision(alembic_cfg, message=message, autogenerate=True)
+    from alembic import command
+    command.revision(alembic_config(), message=message, autogenerate=True)
     typer.echo(f"迁移脚本已生成: {message}")
 
 @shell_app.command()
@@ -72,9 +81,33 @@ def upgrade(env: EnvironmentEnum = typer.Option(EnvironmentEnum.DEV, "--env", he
     应用最新的 Alembic 迁移。
     """
     os.environ["ENVIRONMENT"] = env.value
-    command.upgrade(alembic_cfg, "head")
+    from alembic import command
+    command.upgrade(alembic_config(), "head")
     typer.echo("所有迁移已应用。")
 
+@shell_app.command()
+def openapi(env: EnvironmentEnum = typer.Option(EnvironmentEnum.PROD, "--env", help="运行环境 (dev, prod)")):
+    """
+    预生成 OpenAPI 文档(gzip 压缩), 非调试模式下直接返回该文档。
+    """
+    os.environ["ENVIRONMENT"] = env.value
+    from app.config.setting import settings
+    from app.plugin.openapi import OpenAPIDocument
+    document = OpenAPIDocument.build(create_app())
+    document.save(settings.OPENAPI_FILE)
+    typer.echo(f"OpenAPI 文档已生成: {settings.OPENAPI_FILE} ({len(document.content)} 字节, ETag {document.etag})")
+
+@shell_app.command()
+def static(env: EnvironmentEnum = typer.Option(EnvironmentEnum.PROD, "--env", help="运行环境 (dev, prod)")):
+    """
+    为静态文件目录下可压缩的文件生成 .br/.gz 预压缩文件(保存在 STATIC_CACHE_ROOT), 并清理失效的预压缩文件。
+    """
+    os.environ["ENVIRONMENT"] = env.value
+    from app.config.setting import settings
+    from app.core.static_files import ENCODINGS, compress_directory
+    count, original, compressed = compress_directory(settings.STATIC_ROOT)
+    typer.echo(f"预压缩完成({'/'.join(ENCODINGS)}): {count} 个文件, {original} -> {compressed} 字节")
+
 
 if __name__ == '__main__':
     # 启动服务
@@ -83,5 +116,9 @@ if __name__ == '__main__':
     # python3 main.py revision "数据迁移" --env=dev(不加默认为dev)
     # 应用迁移
     # python3 main.py upgrade --env=dev(不加默认为dev)
+    # 生成OpenAPI文档
+    # python3 main.py openapi --env=prod(不加默认为prod)
+    # 生成静态文件预压缩文件
+    # python3 main.py static --env=prod(不加默认为prod)
     
     shell_app()
@@ -49,4 +49,6 @@ export interface OnlineUserTable {
   browser: string;
   login_time: string;
   login_type: string;
+  last_active?: string;
+  idle_seconds?: number;
 }
@@ -58,10 +58,20 @@ export interface SysFile {
   usage: number;
 }
 
+export interface DbPool {
+  name: string;
+  size: number;
+  checked_in: number;
+  checked_out: number;
+  overflow: number;
+  status: string;
+}
+
 export interface ServerInfo {
   cpu: Cpu;
   mem: Memory;
   sys: System;
   py: Python;
   disks: SysFile[];
+  db_pools: DbPool[];
 }